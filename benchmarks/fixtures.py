@@ -0,0 +1,116 @@
+"""ベンチマーク用の価格データ（フィクスチャ）を作成するモジュール。
+
+乱数で生成した合成データと、CSV / Parquet に保存した実データ（LocalFileSource 形式）の
+どちらからでも、1時間足を基準に 4時間足・日足・週足・月足をまとめたフィクスチャを作成します。
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# プロジェクトルートをパスに追加してモジュールをインポート可能にする
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metal_analyzer.backtest.walk_forward import resample_4h
+from metal_analyzer.data import LocalFileSource
+
+_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# 長期トレンド分析に使う関連銘柄の (ティッカー, 初期価格)
+RELATED_TICKERS = {
+    'silver': ('SI=F', 25.0),
+    'platinum': ('PL=F', 950.0),
+    'dxy': ('DX-Y.NYB', 104.0),
+    'tips': ('TIP', 108.0),
+}
+
+
+def synthetic_ohlcv(n, freq='1h', start='2000-01-03', price=2000.0, volatility=0.003, seed=0):
+    """幾何ランダムウォークで OHLCV データを生成する。
+
+    Args:
+        n (int): バーの本数。
+        freq (str): バーの間隔。デフォルト '1h'。
+        start (str): 最初のバーの時刻。
+        price (float): 初期価格。デフォルト 2000（金価格の水準）。
+        volatility (float): 1本あたりの対数収益率の標準偏差。
+        seed (int): 乱数のシード。
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close, Volume 列を持つデータフレーム。
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq=freq)
+    close = price * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+    open_ = np.r_[price, close[:-1]]
+    wick = np.abs(rng.normal(0.0, volatility / 2, (2, n)))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.integers(100, 10000, n).astype(np.float64)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
+
+
+def resample_ohlcv(df, rule):
+    """OHLCV データを指定した間隔で再集計する。"""
+    return df.resample(rule).agg(_AGG).dropna()
+
+
+def make_fixture(h1_df, seed=0):
+    """1時間足から各時間足と関連銘柄の月足をまとめたフィクスチャを作成する。
+
+    Args:
+        h1_df (pd.DataFrame): 1時間足データ。
+        seed (int): 関連銘柄の合成データに使う乱数のシード。
+
+    Returns:
+        dict: 'h1', 'h4', 'daily', 'weekly', 'monthly' と、
+            RELATED_TICKERS の各キー（月足）を持つ辞書。
+    """
+    daily = resample_ohlcv(h1_df, '1D')
+    monthly = resample_ohlcv(daily, 'MS')
+    fixture = {
+        'h1': h1_df,
+        'h4': resample_4h(h1_df),
+        'daily': daily,
+        'weekly': resample_ohlcv(daily, 'W'),
+        'monthly': monthly,
+    }
+    for i, (key, (_, price)) in enumerate(RELATED_TICKERS.items()):
+        related = synthetic_ohlcv(len(monthly), freq='MS', start=monthly.index[0], price=price,
+                                  volatility=0.04, seed=seed + i + 1)
+        fixture[key] = related.set_axis(monthly.index)
+    return fixture
+
+
+def synthetic_fixture(n, seed=0):
+    """合成データから n 本の1時間足を基準としたフィクスチャを作成する。"""
+    return make_fixture(synthetic_ohlcv(n, seed=seed), seed=seed)
+
+
+def recorded_fixture(data_dir, n, ticker='GC=F'):
+    """保存済みの1時間足データの直近 n 本からフィクスチャを作成する。
+
+    `LocalFileSource` と同じファイル名 ("{ticker}_1h.csv" など) で保存されたデータを読み込みます。
+    関連銘柄の月足も同じディレクトリにあれば使用し、なければ合成データを使用します。
+
+    Args:
+        data_dir (str): データを保存したディレクトリ。
+        n (int): 使用する1時間足の本数。
+        ticker (str): 金のティッカーシンボル。デフォルト 'GC=F'。
+
+    Returns:
+        dict or None: フィクスチャ。保存済みのバーが n 本に満たない場合は None。
+    """
+    source = LocalFileSource(data_dir)
+    h1_df = source.fetch(ticker, '1h')
+    if len(h1_df) < n:
+        return None
+
+    fixture = make_fixture(h1_df.tail(n))
+    for key, (related_ticker, _) in RELATED_TICKERS.items():
+        if os.path.exists(source.path(related_ticker, '1mo')):
+            fixture[key] = source.fetch(related_ticker, '1mo')
+    return fixture
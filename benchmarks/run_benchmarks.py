@@ -0,0 +1,305 @@
+"""インジケーター・パターン検知・分析モデルの実行時間を計測するベンチマークスクリプト。
+
+1時間足のバー数を変えたフィクスチャ（合成データ、または保存済みの実データ）に対して
+各処理の実行時間を計測し、結果を JSON に保存します。
+以前の結果 (--baseline) と比較して、一定以上遅くなった処理があれば終了コード 1 で終了します。
+
+使い方:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000,1000000 --output results.json
+    python benchmarks/run_benchmarks.py --data-dir data/ --baseline benchmarks/results/baseline.json
+    python benchmarks/run_benchmarks.py --filter indicators --repeat 3
+"""
+
+import argparse
+import contextlib
+import datetime
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from fixtures import synthetic_fixture, recorded_fixture
+
+from metal_analyzer import MetalAnalyzer
+from metal_analyzer.core.cache import IndicatorCache
+from metal_analyzer.core.derive import TimeframeGraph, FUTURES_SESSION_START
+from metal_analyzer.core.store import cast_prices
+from metal_analyzer.indicators import (
+    calculate_sma, calculate_ema, calculate_emas, calculate_rsi, calculate_bollinger_bands,
+    rsi_array, bollinger_array
+)
+from metal_analyzer.patterns import detect_double_top, detect_double_bottom, detect_patterns, scan_double_tops
+from metal_analyzer.models import analyze_short_trend, analyze_top_down
+from metal_analyzer.models.short_trend_predictor import analyze_timeframe_details
+from metal_analyzer.models.middle_trend_predictor import analyze_middle_trend
+from metal_analyzer.models.long_trend_predictor import analyze_long_trend
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def _plot_candlestick(fx):
+    """plot_candlestick の計測対象を作成する（データの登録は計測に含めない）。"""
+    analyzer = MetalAnalyzer()
+    analyzer.add_timeframe_data('1h', fx['h1'])
+    filename = os.path.join(tempfile.mkdtemp(prefix='metal_bench_'), 'chart.png')
+    return lambda: analyzer.plot_candlestick('1h', filename=filename)
+
+
+def _close_array(fx):
+    """NumPy 配列版の指標に渡す1時間足の終値の配列を返す（計測の対象外）。"""
+    return fx['h1']['Close'].to_numpy(dtype=float)
+
+
+def _float32(fx, key='h1'):
+    """価格列を float32 にしたフィクスチャのデータフレームを返す（計測の対象外）。"""
+    return cast_prices(fx[key], np.float32)
+
+
+def _float32_model(model, keys):
+    """float32 の価格データとインジケーターで分析モデルを計測する対象を作成する。
+
+    キャッシュにはデータフレームを対応付けないため、呼び出しごとにインジケーターを計算します。
+    """
+    def factory(fx):
+        frames = [_float32(fx, key) for key in keys]
+        cache = IndicatorCache(dtype=np.float32)
+        return lambda: model(*frames, cache=cache)
+    return factory
+
+
+def _derive_timeframes(fx):
+    """1時間足から4時間足・日足・週足・月足を全て集計し直す計測対象を作成する。"""
+    graph = TimeframeGraph('1h', session_start=FUTURES_SESSION_START)
+
+    def run():
+        graph.set_base(fx['h1'])
+        return [graph.get(tf) for tf in graph.timeframes]
+    return run
+
+
+def _derive_append(fx):
+    """1時間足の最終バーの更新後に、変更された足だけを集計し直す計測対象を作成する。"""
+    h1 = fx['h1']
+    graph = TimeframeGraph('1h', session_start=FUTURES_SESSION_START)
+    graph.set_base(h1)
+    for tf in graph.timeframes:
+        graph.get(tf)
+
+    def run():
+        graph.set_base(h1, len(h1) - 1)
+        return [graph.get(tf) for tf in graph.timeframes]
+    return run
+
+
+# 分析モデル全体で使用している EMA の期間
+MODEL_EMA_SPANS = (12, 13, 20, 24, 26, 50, 52, 200)
+
+# (ベンチマーク名, フィクスチャを受け取り計測対象の関数を返す関数)
+BENCHMARKS = [
+    ('indicators.calculate_sma', lambda fx: lambda: calculate_sma(fx['h1'], 20)),
+    ('indicators.calculate_ema', lambda fx: lambda: calculate_ema(fx['h1'], 20)),
+    ('indicators.calculate_emas', lambda fx: lambda: calculate_emas(fx['h1'], MODEL_EMA_SPANS)),
+    ('indicators.calculate_rsi', lambda fx: lambda: calculate_rsi(fx['h1'], 14)),
+    ('indicators.calculate_bollinger_bands', lambda fx: lambda: calculate_bollinger_bands(fx['h1'], 20, 2)),
+    ('indicators.rsi_array', lambda fx: functools.partial(rsi_array, _close_array(fx), 14)),
+    ('indicators.rsi_array_wilder', lambda fx: functools.partial(rsi_array, _close_array(fx), 14, 'wilder')),
+    ('indicators.bollinger_array', lambda fx: functools.partial(bollinger_array, _close_array(fx), 20, 2)),
+    ('indicators.calculate_emas_float32', lambda fx: functools.partial(
+        calculate_emas, _float32(fx), MODEL_EMA_SPANS, np.float32)),
+    ('indicators.calculate_rsi_float32', lambda fx: functools.partial(calculate_rsi, _float32(fx), 14, np.float32)),
+    ('indicators.calculate_bollinger_bands_float32', lambda fx: functools.partial(
+        calculate_bollinger_bands, _float32(fx), 20, 2, np.float32)),
+    ('patterns.detect_double_top', lambda fx: lambda: detect_double_top(fx['h1'])),
+    ('patterns.detect_double_bottom', lambda fx: lambda: detect_double_bottom(fx['h1'])),
+    ('patterns.detect_patterns', lambda fx: lambda: detect_patterns(fx['h1'])),
+    ('patterns.scan_double_tops', lambda fx: lambda: scan_double_tops(fx['h1'])),
+    ('models.analyze_short_trend', lambda fx: lambda: analyze_short_trend(fx['daily'], fx['h4'], fx['h1'])),
+    ('models.analyze_short_trend_float32', _float32_model(analyze_short_trend, ('daily', 'h4', 'h1'))),
+    ('models.analyze_middle_trend', lambda fx: lambda: analyze_middle_trend(fx['weekly'], fx['daily'])),
+    ('models.analyze_middle_trend_float32', _float32_model(analyze_middle_trend, ('weekly', 'daily'))),
+    ('models.analyze_long_trend', lambda fx: lambda: analyze_long_trend(
+        fx['monthly'], fx['silver'], fx['platinum'], fx['dxy'], fx['tips'])),
+    ('models.analyze_top_down', lambda fx: lambda: analyze_top_down(fx['daily'], fx['h1'])),
+    ('models.analyze_timeframe_details', lambda fx: lambda: analyze_timeframe_details(
+        {'Monthly': fx['monthly'], 'Weekly': fx['weekly'], 'Daily': fx['daily'], '4H': fx['h4'], '1H': fx['h1']})),
+    ('core.derive_timeframes', _derive_timeframes),
+    ('core.derive_timeframes_append', _derive_append),
+    ('charts.plot_candlestick', _plot_candlestick),
+]
+
+
+def measure(func, repeat=5, min_time=0.2):
+    """関数1回あたりの実行時間を計測する。
+
+    `timeit.Timer.autorange` で1回の計測が min_time 秒以上になる呼び出し回数を決め、
+    それを repeat 回繰り返します。
+
+    Args:
+        func (callable): 計測対象の引数なしの関数。
+        repeat (int): 計測の繰り返し回数。
+        min_time (float): 1回の計測の最小時間（秒）。
+
+    Returns:
+        dict: 1回あたりの実行時間（秒）の min, median, mean, stdev と、loops, repeat。
+    """
+    timer = timeit.Timer(func)
+    loops = 1
+    for loops in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000):
+        if timer.timeit(loops) >= min_time:
+            break
+    times = np.array(timer.repeat(repeat=repeat, number=loops)) / loops
+    return {
+        'min': float(times.min()),
+        'median': float(np.median(times)),
+        'mean': float(times.mean()),
+        'stdev': float(times.std()),
+        'loops': loops,
+        'repeat': repeat,
+    }
+
+
+def _git_commit():
+    """実行中のリポジトリのコミット ID を返す（取得できない場合は None）。"""
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(sizes, data_dir=None, repeat=5, name_filter=None, seed=0):
+    """全てのベンチマークを実行する。
+
+    Args:
+        sizes (iterable): フィクスチャの1時間足のバー数。
+        data_dir (str, optional): 保存済みの実データのディレクトリ。省略時は合成データ。
+        repeat (int): 計測の繰り返し回数。
+        name_filter (str, optional): ベンチマーク名にこの文字列を含むものだけを実行します。
+        seed (int): 合成データの乱数のシード。
+
+    Returns:
+        list: 計測結果 (name, size, 実行時間の統計) の辞書のリスト。
+    """
+    results = []
+    for size in sizes:
+        fx = recorded_fixture(data_dir, size) if data_dir else synthetic_fixture(size, seed=seed)
+        if fx is None:
+            print(f"[skip] {size} 本の保存済みデータがありません。")
+            continue
+        for name, setup in BENCHMARKS:
+            if name_filter and name_filter not in name:
+                continue
+            func = setup(fx)
+            # モデルが出力するメッセージは計測中は表示しない
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                stats = measure(func, repeat=repeat)
+            results.append(dict(name=name, size=size, **stats))
+            print(f"{name:<40} {size:>9,} bars  {_format_time(stats['median'])}")
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """計測結果を以前の結果と比較する。
+
+    Args:
+        results (list): `run` の戻り値。
+        baseline (dict): 以前に保存した JSON の内容。
+        tolerance (float): 許容する実行時間の増加率。デフォルト 0.2 (20%)。
+
+    Returns:
+        list: (name, size, 以前の中央値, 今回の中央値, 比率) のうち、
+            tolerance を超えて遅くなったもののリスト。
+    """
+    previous = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    print(f"\n{'benchmark':<40} {'bars':>9}  {'baseline':>10}  {'current':>10}  ratio")
+    for r in results:
+        prev = previous.get((r['name'], r['size']))
+        if prev is None:
+            continue
+        ratio = r['median'] / prev['median'] if prev['median'] > 0 else float('inf')
+        mark = ''
+        if ratio > 1 + tolerance:
+            mark = '  << REGRESSION'
+            regressions.append((r['name'], r['size'], prev['median'], r['median'], ratio))
+        print(f"{r['name']:<40} {r['size']:>9,}  {_format_time(prev['median'])}  "
+              f"{_format_time(r['median'])}  {ratio:5.2f}x{mark}")
+    return regressions
+
+
+def _format_time(seconds):
+    """秒を読みやすい単位の文字列にする。"""
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Metal Analyzer のベンチマークを実行します。")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="1時間足のバー数（カンマ区切り）。例: 1000,10000,100000,1000000")
+    parser.add_argument('--data-dir', default=None,
+                        help="保存済みの実データ (GC=F_1h.csv など) のディレクトリ。省略時は合成データ。")
+    parser.add_argument('--repeat', type=int, default=5, help="計測の繰り返し回数。")
+    parser.add_argument('--filter', default=None, help="名前にこの文字列を含むベンチマークだけを実行します。")
+    parser.add_argument('--output', default=None,
+                        help="結果を保存する JSON ファイル。省略時は benchmarks/results/ に日時付きで保存します。")
+    parser.add_argument('--baseline', default=None, help="比較する以前の結果の JSON ファイル。")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="許容する実行時間の増加率。")
+    parser.add_argument('--seed', type=int, default=0, help="合成データの乱数のシード。")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    results = run(sizes, data_dir=args.data_dir, repeat=args.repeat, name_filter=args.filter, seed=args.seed)
+
+    report = {
+        'meta': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'fixture': args.data_dir or f"synthetic(seed={args.seed})",
+            'sizes': sizes,
+        },
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"bench-{stamp}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存しました: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} 件の処理が {args.tolerance:.0%} 以上遅くなりました。")
+            return 1
+        print("\n性能の低下はありません。")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,16 @@
 """過去の急騰・急落局面における予測精度を検証するスクリプト。
 
 直近3ヶ月（2025/11/01 - 2026/02/04）の価格変動率2.0%以上の全12ケースを検証します。
+データは全ケース分を1回だけ取得し、`analyze_as_of` で各基準日の引け時点の分析をまとめて行います。
 """
 
-import yfinance as yf
-from metal_analyzer import MetalAnalyzer
+from metal_analyzer import analyze_as_of
+from metal_analyzer.data import YFinanceSource
+from metal_analyzer.patterns.result import PATTERN_NAMES
 import pandas as pd
-import datetime
-import os
 
 def run_backtest():
     ticker = "GC=F"
-    analyzer = MetalAnalyzer(ticker=ticker)
     
     # 検証するシナリオ: (ラベル, ターゲット日付(この日の終わり時点のデータを使う), 翌日の実際の結果)
     test_cases = [
@@ -57,49 +56,45 @@ def run_backtest():
 
     print(f"=== Metal Analyzer 過去検証バックテスト (Ticker: {ticker}) ===\n")
 
-    for label, target_date_str, actual_result in test_cases:
+    # 全シナリオに必要な期間のデータを1回だけ取得する
+    # (日足: 最も古い基準日の730日前から、1時間足: 59日前から、最新の基準日の翌日まで)
+    target_dates = pd.to_datetime([target for _, target, _ in test_cases])
+    end_str = (target_dates.max() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    source = YFinanceSource()
+    data = {
+        'Daily': source.fetch(ticker, '1d', start=(target_dates.min() - pd.Timedelta(days=730)).strftime('%Y-%m-%d'),
+                              end=end_str),
+        '1h': source.fetch(ticker, '1h', start=(target_dates.min() - pd.Timedelta(days=59)).strftime('%Y-%m-%d'),
+                           end=end_str),
+    }
+    if data['Daily'].empty or data['1h'].empty:
+        print("  [Error] データが取得できませんでした（期間外の可能性があります）。\n")
+        return
+
+    # 各基準日の引けまでのデータで、全シナリオをまとめて分析する
+    results = analyze_as_of(target_dates, data)
+
+    for (label, target_date_str, actual_result), target_dt in zip(test_cases, target_dates):
         print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
         print(f"■ {label} (分析基準日: {target_date_str})")
         print(f"   >> 実際の結果: {actual_result}")
         print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        
-        target_dt = pd.to_datetime(target_date_str)
-        end_dt = target_dt + pd.Timedelta(days=1)
-        end_str = end_dt.strftime('%Y-%m-%d')
-        
-        start_str = (target_dt - pd.Timedelta(days=730)).strftime('%Y-%m-%d')
-        
-        d_df = yf.download(ticker, start=start_str, end=end_str, interval="1d", progress=False)
-        h1_start_str = (target_dt - pd.Timedelta(days=59)).strftime('%Y-%m-%d')
-        h1_df = yf.download(ticker, start=h1_start_str, end=end_str, interval="1h", progress=False)
 
-        if d_df.empty or h1_df.empty:
-            print("  [Error] データが取得できませんでした（期間外の可能性があります）。\n")
+        if target_dt not in results.index:
+            print("  [Error] 分析に必要なデータが不足しています。\n")
             continue
 
-        for df in [d_df, h1_df]:
-            if isinstance(df.columns, pd.MultiIndex):
-                if 'Close' in df.columns.get_level_values(0):
-                    df.columns = df.columns.get_level_values(0)
-                elif len(df.columns.levels) > 1 and 'Close' in df.columns.get_level_values(1):
-                    df.columns = df.columns.get_level_values(1)
-            
-            if not isinstance(df.index, pd.DatetimeIndex):
-                df.index = pd.to_datetime(df.index)
-
-        if not h1_df.empty:
-            h4_df = h1_df.resample('4h').agg({
-                'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-            }).dropna()
-        else:
-            h4_df = pd.DataFrame()
-
-        analyzer.timeframe_data = {}
-        analyzer.add_timeframe_data("Daily", d_df)
-        analyzer.add_timeframe_data("1h", h1_df)
-        analyzer.add_timeframe_data("4h", h4_df)
-
-        analyzer.analyze_short_trend()
+        row = results.loc[target_dt]
+        print(f"長期トレンド： {row['dashboard_1_trend']}")
+        print(f"EMA乖離： {row['dashboard_2_momentum']}")
+        print(f"加速/ボラ： {row['dashboard_3_volatility']}")
+        print(f"センチメント： {row['dashboard_4_sentiment']}")
+        patterns = ', '.join(PATTERN_NAMES.get(k, k) for k in row['detected_patterns'])
+        print(f"パターン： {patterns or '検知なし'}")
+        print("-" * 20)
+        print(f"最終予測: {row['final_prediction']} (スコア: {row['score']:.1f})")
+        print(f"リスク: {row['risk_level']}")
+        print(f"コメント: {row['comment']}")
         print("\n")
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@
 結果のEmbedと最新のチャート画像（6枚）をDiscord Webhookに送信します。
 
 Usage:
-    python examples/send_gold_trend.py [--dry-run] [--webhook_url URL]
+    python examples/send_gold_trend.py [--dry-run] [--webhook_url URL] [--archive DIR [--offline]]
 """
 
 import os
@@ -12,7 +12,6 @@ import sys
 import argparse
 import json
 import requests
-import yfinance as yf
 import pandas as pd
 from datetime import datetime
 import glob
@@ -24,10 +23,13 @@ from metal_analyzer import MetalAnalyzer
 from metal_analyzer.models.middle_trend_predictor import analyze_middle_trend
 from metal_analyzer.models.long_trend_predictor import analyze_long_trend
 from metal_analyzer.models.short_trend_predictor import analyze_timeframe_details
+from metal_analyzer.data import YFinanceSource, ArchiveSource, fetch_many
+from metal_analyzer.core.report import format_short_trend_discord
 
-def get_market_data():
-    """分析に必要な全データを取得する"""
+def get_market_data(source=None):
+    """分析に必要な全データを取得する（全系列を並列に取得）"""
     print("データ取得中...")
+    source = source or YFinanceSource()
     tickers = {
         "Gold": "GC=F",
         "Silver": "SI=F",
@@ -35,30 +37,22 @@ def get_market_data():
         "DXY": "DX-Y.NYB",
         "TIPS": "TIP"
     }
-    
-    data = {}
-    
-    print("  Gold (Tick Data)...")
-    # 短期分析 & チャート生成用
-    data['gold_daily'] = yf.download(tickers['Gold'], period="2y", interval="1d", progress=False)
-    data['gold_hourly'] = yf.download(tickers['Gold'], period="2mo", interval="1h", progress=False)
-    data['gold_15m'] = yf.download(tickers['Gold'], period="1mo", interval="15m", progress=False)
-    
-    print("  Gold (Long Term)...")
-    data['gold_weekly'] = yf.download(tickers['Gold'], period="5y", interval="1wk", progress=False)
-    data['gold_monthly'] = yf.download(tickers['Gold'], period="15y", interval="1mo", progress=False)
 
-    print("  Silver (Long)...")
-    data['silver_monthly'] = yf.download(tickers['Silver'], period="15y", interval="1mo", progress=False)
-    
-    print("  Platinum (Long)...")
-    data['platinum_monthly'] = yf.download(tickers['Platinum'], period="15y", interval="1mo", progress=False)
-    
-    print("  Macro (DXY, TIPS)...")
-    data['dxy_monthly'] = yf.download(tickers['DXY'], period="15y", interval="1mo", progress=False)
-    data['tips_monthly'] = yf.download(tickers['TIPS'], period="15y", interval="1mo", progress=False)
-    
-    return data
+    series = {
+        # 短期分析 & チャート生成用
+        'gold_daily': (tickers['Gold'], "1d", "2y"),
+        'gold_hourly': (tickers['Gold'], "1h", "2mo"),
+        'gold_15m': (tickers['Gold'], "15m", "1mo"),
+        # 中長期分析用
+        'gold_weekly': (tickers['Gold'], "1wk", "5y"),
+        'gold_monthly': (tickers['Gold'], "1mo", "15y"),
+        'silver_monthly': (tickers['Silver'], "1mo", "15y"),
+        'platinum_monthly': (tickers['Platinum'], "1mo", "15y"),
+        # マクロ (DXY, TIPS)
+        'dxy_monthly': (tickers['DXY'], "1mo", "15y"),
+        'tips_monthly': (tickers['TIPS'], "1mo", "15y"),
+    }
+    return fetch_many(source, series)
 
 def generate_charts(analyzer, output_dir):
     """チャート画像を生成して保存する"""
@@ -76,15 +70,14 @@ def generate_charts(analyzer, output_dir):
         ("15m", "chart_06_15m.png"),
     ]
     
-    generated_files = []
-    for tf, fname in charts:
-        fpath = os.path.join(output_dir, fname)
-        # titleはデフォルトに任せるか指定するか
-        analyzer.plot_candlestick(tf, filename=fpath, title=f"Gold {tf}")
-        if os.path.exists(fpath):
-            generated_files.append(fpath)
-            
-    return generated_files
+    # 6枚のチャートをプロセスプールで並列に描画する
+    saved = analyzer.render_charts(
+        output_dir,
+        timeframes=[tf for tf, _ in charts],
+        filenames=dict(charts),
+        titles={tf: f"Gold {tf}" for tf, _ in charts},
+    )
+    return [fpath for fpath in saved.values() if os.path.exists(fpath)]
 
 def run_analyses(data, analyzer):
     """3つのトレンド分析を実行する"""
@@ -93,22 +86,25 @@ def run_analyses(data, analyzer):
     # 1. 短期トレンド
     print("短期トレンド分析実行中...")
     # analyzerには既にデータがセットされている前提
-    results['short'] = analyzer.analyze_short_trend()
+    results['short'] = analyzer.analyze_short_trend(verbose=False)
     
+    # analyzer に登録済みのデータフレームを渡す（インジケーター計算結果はこれらに対してキャッシュされる）。
     # 4時間足データは analyze_short_trend 内で生成されるため、ここで取得可能
+    frames = analyzer.timeframe_data
     tf_data = {
-        'Monthly': data['gold_monthly'],
-        'Weekly': data['gold_weekly'],
-        'Daily': data['gold_daily'],
-        '4H': analyzer.timeframe_data.get('4h'),
-        '1H': data['gold_hourly'],
-        '15M': data['gold_15m']
+        'Monthly': frames['Monthly'],
+        'Weekly': frames['Weekly'],
+        'Daily': frames['Daily'],
+        '4H': frames.get('4h'),
+        '1H': frames['1h'],
+        '15M': frames['15m']
     }
-    results['short_details'] = analyze_timeframe_details(tf_data)
+    results['short_details'] = analyze_timeframe_details(tf_data, cache=analyzer.indicator_cache)
     
     # 2. 中期トレンド
     print("中期トレンド分析実行中...")
-    results['middle'] = analyze_middle_trend(data['gold_weekly'], data['gold_daily'])
+    results['middle'] = analyze_middle_trend(frames['Weekly'], frames['Daily'],
+                                             cache=analyzer.indicator_cache)
     
     # 3. 長期トレンド
     print("長期トレンド分析実行中...")
@@ -153,17 +149,7 @@ def create_discord_payload(results):
     }
     
     # --- Short Trend ---
-    short_val = f"**予測**: `{short['final_prediction']}`\n"
-    short_val += f"**リスク**: {short['risk_level']}\n"
-    short_val += f"**センチメント**: {short['dashboard_4_sentiment']}\n"
-    short_val += f"> {short['comment']}\n\n"
-    short_val += f"👇 **時間足別詳細**\n{results['short_details']}"
-    
-    embed['fields'].append({
-        "name": "🟢 短期トレンド (Short)",
-        "value": short_val,
-        "inline": False
-    })
+    embed['fields'].append(format_short_trend_discord(short, details=results['short_details']))
     
     # --- Middle Trend ---
     mid_val = f"**構造**: {middle['dashboard_1_weekly']}\n"
@@ -231,6 +217,8 @@ def main():
     parser = argparse.ArgumentParser(description='Send Gold Trend Report with Charts to Discord')
     parser.add_argument('--dry-run', action='store_true', help='Webhookを送信せずにペイロードと生成ファイルを表示します')
     parser.add_argument('--webhook_url', type=str, default=os.getenv('DISCORD_WEBHOOK_URL'), help='Discord Webhook URL')
+    parser.add_argument('--archive', type=str, default=None, help='取得したデータを保存するアーカイブのディレクトリ（新しいバーのみ追記）')
+    parser.add_argument('--offline', action='store_true', help='ネットワークを使わず --archive の保存済みデータのみで分析します')
     
     args = parser.parse_args()
     
@@ -239,7 +227,13 @@ def main():
         return
 
     # 1. データ取得
-    data = get_market_data()
+    source = YFinanceSource()
+    if args.archive:
+        source = ArchiveSource(args.archive, upstream=None if args.offline else source)
+    elif args.offline:
+        print("エラー: --offline には --archive の指定が必要です。")
+        return
+    data = get_market_data(source)
     if data['gold_daily'].empty:
         print("データ取得失敗")
         return
@@ -7,14 +7,22 @@
 __version__ = '0.0.2'
 
 from .core.analyzer import MetalAnalyzer
+from .core.store import OHLCVStore
+from .core.portfolio import PortfolioAnalyzer
+from .core.report import ShortTrendReport
 from . import indicators
 from . import patterns
 from . import models
+from . import backtest
+from . import storage
+from . import data
 
 # 短期トレンド分析モデルの直接インポート
-from .models.short_trend_predictor import analyze_short_trend
+from .models.short_trend_predictor import analyze_short_trend, analyze_short_trend_series
+from .backtest.walk_forward import analyze_as_of
 
 # 後方互換性のためのエイリアス
 GoldAnalyzer = MetalAnalyzer
 
-__all__ = ['MetalAnalyzer', 'GoldAnalyzer', 'indicators', 'patterns', 'models', 'analyze_short_trend']
+__all__ = ['MetalAnalyzer', 'GoldAnalyzer', 'OHLCVStore', 'PortfolioAnalyzer', 'ShortTrendReport', 'indicators', 'patterns', 'models', 'backtest', 'storage', 'data', 'analyze_short_trend',
+           'analyze_short_trend_series', 'analyze_as_of']
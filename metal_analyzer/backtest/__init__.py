@@ -0,0 +1,12 @@
+"""バックテスト（過去検証）機能を提供するパッケージ。
+
+全期間のインジケーターを事前計算し、各時点の分析結果をインデックス参照で
+評価するウォークフォワード検証エンジン、複数の時点の分析をまとめて行う `analyze_as_of`、
+最終スコアの判定基準の検証機能が含まれます。
+"""
+
+from .walk_forward import WalkForwardBacktest, analyze_as_of, grade_prediction, resample_4h
+from .calibration import classify_scores, grade_scores, grade_prediction_codes, calibrate_thresholds
+
+__all__ = ['WalkForwardBacktest', 'analyze_as_of', 'grade_prediction', 'resample_4h', 'classify_scores',
+           'grade_scores', 'grade_prediction_codes', 'calibrate_thresholds']
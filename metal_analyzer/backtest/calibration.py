@@ -0,0 +1,169 @@
+"""短期トレンド分析の最終スコアの判定基準を過去データで検証するモジュール。
+
+`evaluate_short_trend` は最終スコアが CRASH_THRESHOLD (-6) 以下で「大暴落加速」、
+SURGE_THRESHOLD (5) 以上で「急騰加速」と判定します。このモジュールは、
+過去のスコアと翌日の変動率から、判定基準の全ての組み合わせの的中率を1回の集計で計算します。
+
+Examples:
+    >>> results = WalkForwardBacktest(daily_df, h1_df).run()
+    >>> grid = calibrate_thresholds(results['score'], results['next_day_pct'])
+    >>> crash_threshold, surge_threshold = grid['accuracy'].idxmax()
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..models.short_trend_predictor import CRASH_THRESHOLD, SURGE_THRESHOLD
+
+# classify_scores が返す判定コード（analyze_short_trend_series の final_prediction の順）
+PREDICTION_CRASH = 0
+PREDICTION_SURGE = 1
+PREDICTION_BEARISH = 2
+PREDICTION_BULLISH = 3
+
+
+def classify_scores(scores, crash_threshold=CRASH_THRESHOLD, surge_threshold=SURGE_THRESHOLD):
+    """最終スコアを判定コードに変換する。
+
+    Args:
+        scores (array-like): 最終スコア。
+        crash_threshold (float): この値以下を「大暴落加速」とする基準。
+        surge_threshold (float): この値以上を「急騰加速」とする基準。
+
+    Returns:
+        np.ndarray: 判定コード (PREDICTION_CRASH, PREDICTION_SURGE, PREDICTION_BEARISH, PREDICTION_BULLISH)。
+    """
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores <= crash_threshold, scores >= surge_threshold, scores < 0],
+                     [PREDICTION_CRASH, PREDICTION_SURGE, PREDICTION_BEARISH], default=PREDICTION_BULLISH)
+
+
+def grade_scores(scores, next_day_pct, crash_threshold=CRASH_THRESHOLD, surge_threshold=SURGE_THRESHOLD,
+                 move_threshold=2.0):
+    """最終スコアによる予測が翌日の値動きに対して正解かを判定する。
+
+    `grade_prediction` と同じ基準を、予測の文字列ではなくスコアに対して列演算で適用します。
+    急騰 (next_day_pct >= move_threshold) は「急騰加速」「底堅い/反発」、
+    急落 (next_day_pct <= -move_threshold) は「大暴落加速」「続落注意」、
+    それ以外は「続落注意」「底堅い/反発」を正解とします。
+
+    Args:
+        scores (array-like): 最終スコア。
+        next_day_pct (array-like): 翌日の変動率 (%)。
+        crash_threshold (float): 「大暴落加速」とする基準。
+        surge_threshold (float): 「急騰加速」とする基準。
+        move_threshold (float): 急騰・急落とみなす変動率 (%)。
+
+    Returns:
+        np.ndarray: 正解かどうかの真偽値の配列。
+    """
+    codes = classify_scores(scores, crash_threshold, surge_threshold)
+    return grade_prediction_codes(codes, next_day_pct, move_threshold)
+
+
+def grade_prediction_codes(codes, next_day_pct, move_threshold=2.0):
+    """判定コードによる予測が翌日の値動きに対して正解かを判定する。
+
+    Args:
+        codes (array-like): `classify_scores` が返す判定コード。形状 (k, n) の配列も指定できます。
+        next_day_pct (array-like): 翌日の変動率 (%)。codes の最後の軸と同じ長さ。
+        move_threshold (float): 急騰・急落とみなす変動率 (%)。
+
+    Returns:
+        np.ndarray: codes と同じ形状の、正解かどうかの真偽値の配列。
+    """
+    codes = np.asarray(codes)
+    pct = np.asarray(next_day_pct, dtype=float)
+    bullish = (codes == PREDICTION_SURGE) | (codes == PREDICTION_BULLISH)
+    bearish = (codes == PREDICTION_CRASH) | (codes == PREDICTION_BEARISH)
+    quiet = (codes == PREDICTION_BEARISH) | (codes == PREDICTION_BULLISH)
+    return np.select([pct >= move_threshold, pct <= -move_threshold], [bullish, bearish], default=quiet)
+
+
+def _count_at_or_below(sorted_values, thresholds):
+    """sorted_values のうち各閾値以下の個数を返す。"""
+    return np.searchsorted(sorted_values, thresholds, side='right')
+
+
+def calibrate_thresholds(scores, next_day_pct, crash_thresholds=None, surge_thresholds=None,
+                         move_threshold=2.0):
+    """判定基準 (crash_threshold, surge_threshold) の全ての組み合わせについて的中率を計算する。
+
+    負のスコアの判定は crash_threshold だけに、0 以上のスコアの判定は surge_threshold だけに
+    依存するため、それぞれの正解数をスコアの整列と累積個数から1回で求め、
+    組み合わせの結果は和で計算します（計算量は O(n log n + 組み合わせ数)）。
+    スコアまたは変動率が NaN の行は除外します。
+
+    Args:
+        scores (array-like): 最終スコア（例: `WalkForwardBacktest.run()` の 'score' 列）。
+        next_day_pct (array-like): 翌日の変動率 (%)（'next_day_pct' 列）。
+        crash_thresholds (array-like, optional): 検証する crash_threshold（負の値）。
+            省略時は観測された負のスコアの値と CRASH_THRESHOLD。
+        surge_thresholds (array-like, optional): 検証する surge_threshold（正の値）。
+            省略時は観測された正のスコアの値と SURGE_THRESHOLD。
+        move_threshold (float): 急騰・急落とみなす変動率 (%)。
+
+    Returns:
+        pd.DataFrame: (crash_threshold, surge_threshold) をインデックスとする検証結果。
+            - success: 正解数（`grade_scores` の合計）
+            - accuracy: 的中率
+            - crash_signals, crash_precision: 「大暴落加速」の判定数と、そのうち翌日に急落した割合
+            - surge_signals, surge_precision: 「急騰加速」の判定数と、そのうち翌日に急騰した割合
+
+    Raises:
+        ValueError: crash_thresholds に 0 以上、または surge_thresholds に 0 以下の値が含まれる場合。
+    """
+    scores = np.asarray(scores, dtype=float)
+    pct = np.asarray(next_day_pct, dtype=float)
+    valid = ~(np.isnan(scores) | np.isnan(pct))
+    scores, pct = scores[valid], pct[valid]
+
+    if crash_thresholds is None:
+        crash_thresholds = np.union1d(scores[scores < 0], [CRASH_THRESHOLD])
+    if surge_thresholds is None:
+        surge_thresholds = np.union1d(scores[scores > 0], [SURGE_THRESHOLD])
+    crash_thresholds = np.asarray(crash_thresholds, dtype=float)
+    surge_thresholds = np.asarray(surge_thresholds, dtype=float)
+    if (crash_thresholds >= 0).any():
+        raise ValueError("crash_thresholds には負の値を指定してください。")
+    if (surge_thresholds <= 0).any():
+        raise ValueError("surge_thresholds には正の値を指定してください。")
+
+    surge = pct >= move_threshold
+    crash = pct <= -move_threshold
+    quiet = ~surge & ~crash
+    neg = scores < 0
+
+    # 負のスコア: crash_threshold 以下は「大暴落加速」（急落のみ正解）、それ以外は「続落注意」（急落・レンジが正解）
+    neg_all = np.sort(scores[neg])
+    neg_crash = np.sort(scores[neg & crash])
+    neg_quiet = np.sort(scores[neg & quiet])
+    crash_signals = _count_at_or_below(neg_all, crash_thresholds)
+    crash_hits = _count_at_or_below(neg_crash, crash_thresholds)
+    neg_success = len(neg_crash) + len(neg_quiet) - _count_at_or_below(neg_quiet, crash_thresholds)
+
+    # 0 以上のスコア: surge_threshold 以上は「急騰加速」（急騰のみ正解）、それ以外は「底堅い/反発」（急騰・レンジが正解）
+    pos_all = np.sort(scores[~neg])
+    pos_surge = np.sort(scores[~neg & surge])
+    pos_quiet = np.sort(scores[~neg & quiet])
+    surge_signals = len(pos_all) - np.searchsorted(pos_all, surge_thresholds, side='left')
+    surge_hits = len(pos_surge) - np.searchsorted(pos_surge, surge_thresholds, side='left')
+    pos_success = len(pos_surge) + np.searchsorted(pos_quiet, surge_thresholds, side='left')
+
+    n_crash, n_surge = len(crash_thresholds), len(surge_thresholds)
+    success = neg_success[:, None] + pos_success[None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        crash_precision = crash_hits / crash_signals
+        surge_precision = surge_hits / surge_signals
+        accuracy = success / len(scores) if len(scores) else np.full(success.shape, np.nan)
+
+    index = pd.MultiIndex.from_product([crash_thresholds, surge_thresholds],
+                                       names=['crash_threshold', 'surge_threshold'])
+    return pd.DataFrame({
+        'success': success.ravel(),
+        'accuracy': np.asarray(accuracy, dtype=float).ravel(),
+        'crash_signals': np.repeat(crash_signals, n_surge),
+        'crash_precision': np.repeat(crash_precision, n_surge),
+        'surge_signals': np.tile(surge_signals, n_crash),
+        'surge_precision': np.tile(surge_precision, n_crash),
+    }, index=index)
@@ -0,0 +1,399 @@
+"""ウォークフォワード検証（バックテスト）エンジンを提供するモジュール。
+
+このモジュールは、全期間のインジケーターを1回だけ計算しておき、
+各分析基準時点の短期トレンド分析をインデックス参照だけで評価する
+WalkForwardBacktest クラスを提供します。日ごとにデータを切り出して
+インジケーターを再計算する方式に比べ、計算量は全期間の長さに比例するだけになります。
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..models.short_trend_predictor import (
+    SHORT_TREND_FEATURES,
+    build_short_trend_features,
+    evaluate_short_trend,
+    evaluate_short_trend_arrays,
+    _empty_results,
+    _results_frame,
+)
+from ..patterns import PATTERN_DETECTORS, detect_patterns, to_patterns_dict
+from ..core.store import as_frame
+from ..core.instrumentation import instrumented, stage
+
+# analyze_as_of で各時間足を探すキー（MetalAnalyzer と同じ候補）
+_DAILY_KEYS = ('Daily', '1d', '1D', 'daily')
+_H4_KEYS = ('4h', '4H', '4hourly')
+_H1_KEYS = ('1h', '1H', 'hourly')
+
+
+def _prepare_ohlcv(df):
+    """MultiIndex のカラムとタイムゾーンを取り除いたデータフレームを返す。"""
+    df = as_frame(df)
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df = df.copy()
+        df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df = df.copy()
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+def resample_4h(h1_df):
+    """1時間足から4時間足を生成する。
+
+    Args:
+        h1_df (pd.DataFrame): 1時間足データ。
+
+    Returns:
+        pd.DataFrame: 4時間足データ。
+    """
+    return h1_df.resample('4h').agg({
+        'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
+    }).dropna()
+
+
+def grade_prediction(prediction, next_day_pct, move_threshold=2.0):
+    """翌日の実際の値動きに対して予測結果を判定する。
+
+    Args:
+        prediction (str): `final_prediction` の文字列。
+        next_day_pct (float): 翌日の変動率 (%)。
+        move_threshold (float): 急騰・急落とみなす変動率 (%)。デフォルト 2.0。
+
+    Returns:
+        tuple: (actual_desc, judgement, is_success)
+            - actual_desc (str): 実際の値動きの説明（例: "+2.4% (Surge)"）。
+            - judgement (str): 判定結果（例: "⭕ Success"）。
+            - is_success (bool): 予測が正解とみなせるか。
+    """
+    if next_day_pct >= move_threshold:
+        actual_desc = f"+{next_day_pct:.1f}% (Surge)"
+        # 正解: 急騰、反発、底堅い
+        if "Surge" in prediction or "反発" in prediction or "底堅い" in prediction:
+            return actual_desc, "⭕ Success", True
+        if "Wait" in prediction or "様子見" in prediction:
+            return actual_desc, "⚠️ Missed (Neutral)", False
+        return actual_desc, "❌ Fail (Wrong Dir)", False
+
+    if next_day_pct <= -move_threshold:
+        actual_desc = f"{next_day_pct:.1f}% (Crash)"
+        # 正解: 暴落、続落、下落
+        if "Crash" in prediction or "続落" in prediction or "下落" in prediction or "注意" in prediction:
+            return actual_desc, "⭕ Success", True
+        if "Wait" in prediction or "様子見" in prediction:
+            return actual_desc, "⚠️ Missed (Neutral)", False
+        return actual_desc, "❌ Fail (Wrong Dir)", False
+
+    actual_desc = f"{next_day_pct:.1f}% (Range)"
+    # 強いシグナルが出たのに動かなかった場合はダマシとする
+    if "Acceleration" in prediction or "大暴落" in prediction or "急騰" in prediction:
+        return actual_desc, "❌ Fail (False Alarm)", False
+    return actual_desc, "⭕ Success (Quiet)", True
+
+
+class WalkForwardBacktest:
+    """短期トレンド分析のウォークフォワード検証エンジン。
+
+    初期化時に1時間足・4時間足の全インジケーターを1回だけ計算し、
+    `evaluate` では分析基準時点に対応する行を参照して判定のみを行います。
+    分析基準時点より後のデータは一切参照しません。
+
+    Attributes:
+        daily_df (pd.DataFrame): 日足データ。
+        h1_df (pd.DataFrame): 1時間足データ。
+        h4_df (pd.DataFrame): 4時間足データ。
+        features (pd.DataFrame): 1時間足の各バー時点の特徴量。
+    """
+
+    def __init__(self, daily_df, h1_df, h4_df=None, pattern_threshold=0.03,
+                 pattern_lookback=100, min_bars=50):
+        """WalkForwardBacktest を初期化する。
+
+        Args:
+            daily_df (pd.DataFrame or OHLCVStore): 日足データ（全期間）。
+            h1_df (pd.DataFrame or OHLCVStore): 1時間足データ（全期間）。
+            h4_df (pd.DataFrame or OHLCVStore, optional): 4時間足データ。省略時は1時間足から生成。
+            pattern_threshold (float): チャートパターン検知の許容誤差。
+            pattern_lookback (int): パターン検知で参照するバー数。
+            min_bars (int): 評価に必要な日足・1時間足の最小バー数。
+        """
+        self.daily_df = _prepare_ohlcv(daily_df)
+        self.h1_df = _prepare_ohlcv(h1_df)
+        self.h4_df = _prepare_ohlcv(h4_df) if h4_df is not None else resample_4h(self.h1_df)
+        self.pattern_threshold = pattern_threshold
+        self.pattern_lookback = pattern_lookback
+        self.min_bars = min_bars
+
+        self.features = build_short_trend_features(self.h4_df, self.h1_df)
+        self._columns = {name: self.features[name].to_numpy() for name in SHORT_TREND_FEATURES}
+
+    def _h1_position(self, as_of):
+        """分析基準時点以前で最後の1時間足の位置を返す（存在しない場合は -1）。"""
+        return int(self.h1_df.index.searchsorted(pd.Timestamp(as_of), side='right')) - 1
+
+    def _detect_patterns(self, pos):
+        """指定位置までの1時間足でチャートパターンを検知する。"""
+        start = max(0, pos + 1 - self.pattern_lookback)
+        window = self.h1_df.iloc[start:pos + 1]
+
+        results = detect_patterns(window, self.pattern_threshold, self.pattern_lookback)
+        return to_patterns_dict(*results.values())
+
+    def _positions(self, timestamps):
+        """各分析基準時点の1時間足の位置と、評価に必要なバー数があるかのマスクを返す。"""
+        timestamps = pd.DatetimeIndex(timestamps)
+        pos = self.h1_df.index.searchsorted(timestamps, side='right') - 1
+        n_daily = self.daily_df.index.searchsorted(timestamps, side='right')
+        valid = (pos + 1 >= self.min_bars) & (n_daily >= self.min_bars)
+        return pos, valid
+
+    @staticmethod
+    def _pattern_frame(pattern_rows, index):
+        """`_detect_patterns` の結果を、パターン情報の列を持つ表にする。
+
+        検知フラグは bool、ネックラインは float（未検知は 0）の列になります。
+        """
+        rows = pd.DataFrame.from_records(pattern_rows, index=index) if pattern_rows else pd.DataFrame(index=index)
+        patterns = pd.DataFrame(index=index)
+        for key in rows.columns:
+            if key in PATTERN_DETECTORS:
+                patterns[key] = rows[key].fillna(False).to_numpy(dtype=bool)
+            else:
+                patterns[key] = rows[key].fillna(0.0).to_numpy(dtype=float)
+        return patterns
+
+    def _evaluate_positions(self, positions, index, params=None):
+        """1時間足の位置ごとの判定を列演算でまとめて行う。
+
+        チャートパターンの検知は同じ位置について1回だけ行います。
+
+        Args:
+            positions (np.ndarray): 評価する1時間足の位置（データが十分な位置のみ）。
+            index (pd.Index): 結果のインデックス（positions と同じ長さ）。
+            params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+
+        Returns:
+            tuple: (results, patterns)
+                `analyze_short_trend_series` と同じ列を持つ分析結果の表と、パターン情報の表。
+        """
+        detected = {}
+        with stage('patterns'):
+            for pos in np.unique(positions):
+                detected[pos] = self._detect_patterns(pos)
+        patterns = self._pattern_frame([detected[pos] for pos in positions], index)
+
+        features = {name: values[positions] for name, values in self._columns.items()}
+        codes = evaluate_short_trend_arrays(features, patterns, params)
+        return _results_frame(codes, index), patterns
+
+    def _next_day_pct(self):
+        """日足の各営業日から翌営業日への終値変動率 (%) を返す（最終日は NaN）。"""
+        closes = self.daily_df['Close'].to_numpy(dtype=float)
+        next_day_pct = np.full(len(closes), np.nan)
+        if len(closes) > 1:
+            next_day_pct[:-1] = (closes[1:] - closes[:-1]) / closes[:-1] * 100
+        return next_day_pct
+
+    def _validation_days(self, start=None, end=None):
+        """検証対象とする日足の位置を返す。"""
+        daily = self.daily_df
+        mask = np.ones(len(daily), dtype=bool)
+        if start is not None: mask &= daily.index >= pd.Timestamp(start)
+        if end is not None: mask &= daily.index <= pd.Timestamp(end)
+        # 翌日のデータが存在しない最終日は検証できない
+        mask[-1:] = False
+        return np.flatnonzero(mask)
+
+    def feature_matrix(self, start=None, end=None):
+        """各検証日の分析基準時点における特徴量とチャートパターンを1つの表にまとめる。
+
+        `run` と同じ検証日・分析基準時点について、`evaluate_short_trend` に渡す特徴量と
+        パターン情報、および翌日の変動率を返します。`metal_analyzer.optimize` で
+        判定基準を変えながら繰り返し評価する際に、インジケーター計算とパターン検知を
+        1回で済ませるために使用します。
+
+        Args:
+            start (str or pd.Timestamp, optional): 検証開始日。
+            end (str or pd.Timestamp, optional): 検証終了日。
+
+        Returns:
+            pd.DataFrame: 検証日をインデックスとする表。列は SHORT_TREND_FEATURES の各特徴量、
+                パターンの種類ごとの検知フラグとネックライン（`to_patterns_dict` と同じキー、
+                未検知のネックラインは 0）、および next_day_pct。
+                データが不足している日は含まれません。
+        """
+        daily = self.daily_df
+        next_day_pct = self._next_day_pct()
+
+        dates, positions, pattern_rows = [], [], []
+        for i in self._validation_days(start, end):
+            target_day = daily.index[i]
+            as_of = target_day + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+            pos = self._h1_position(as_of)
+            n_daily = int(daily.index.searchsorted(as_of, side='right'))
+            if pos + 1 < self.min_bars or n_daily < self.min_bars:
+                continue
+            dates.append(target_day)
+            positions.append(pos)
+            pattern_rows.append(self._detect_patterns(pos))
+
+        index = pd.DatetimeIndex(dates, name='date')
+        matrix = pd.DataFrame({name: values[positions] for name, values in self._columns.items()}, index=index)
+        matrix = matrix.join(self._pattern_frame(pattern_rows, index))
+        matrix['next_day_pct'] = next_day_pct[np.searchsorted(daily.index, index)] if len(index) else []
+        return matrix
+
+    def evaluate(self, as_of):
+        """分析基準時点における短期トレンド分析を実行する。
+
+        `MetalAnalyzer.analyze_short_trend` に基準時点までのデータを
+        渡した場合と同じ判定を、再計算なしで返します。
+
+        Args:
+            as_of (str or pd.Timestamp): 分析基準時点（この時刻以前のバーのみ使用）。
+
+        Returns:
+            dict or None: 分析結果。データが不足している場合は None。
+        """
+        pos = self._h1_position(as_of)
+        n_daily = int(self.daily_df.index.searchsorted(pd.Timestamp(as_of), side='right'))
+        if pos + 1 < self.min_bars or n_daily < self.min_bars:
+            return None
+
+        row = {name: values[pos] for name, values in self._columns.items()}
+        return evaluate_short_trend(row, self._detect_patterns(pos))
+
+    def evaluate_many(self, timestamps, params=None):
+        """複数の分析基準時点をまとめて評価する。
+
+        各時点の特徴量を参照して、判定を列演算で1回にまとめて行います。
+        結果は各時点で `evaluate` を呼び出した場合と同じです。
+
+        Args:
+            timestamps (iterable): 分析基準時点のリスト。
+            params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+
+        Returns:
+            pd.DataFrame: 基準時点をインデックスとする分析結果（重複する時点は1行）。
+                データ不足の時点は含まれません。
+        """
+        index = pd.DatetimeIndex([pd.Timestamp(ts) for ts in timestamps])
+        index = index[~index.duplicated()]
+        pos, valid = self._positions(index)
+        if not valid.any():
+            return pd.DataFrame()
+        results, _ = self._evaluate_positions(pos[valid], index[valid], params)
+        return results
+
+    def run(self, start=None, end=None, move_threshold=2.0):
+        """日足の各営業日について翌日の値動きに対する予測精度を検証する。
+
+        各営業日 D について、D の引けまで（D + 1日 未満）のデータで分析を行い、
+        D の翌営業日の終値変動率と照合します。全検証日の判定は `evaluate_many` と同じく
+        列演算で1回にまとめて行い、結果は各日で `evaluate` を呼び出した場合と同じです。
+
+        Args:
+            start (str or pd.Timestamp, optional): 検証開始日。
+            end (str or pd.Timestamp, optional): 検証終了日。
+            move_threshold (float): 急騰・急落とみなす変動率 (%)。
+
+        Returns:
+            pd.DataFrame: 検証日ごとの結果。列は next_day_pct, actual,
+                final_prediction, risk_level, judgement, success および各ダッシュボード。
+        """
+        daily = self.daily_df
+        days = self._validation_days(start, end)
+        as_of = daily.index[days] + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+        pos, valid = self._positions(as_of)
+        if not valid.any():
+            return pd.DataFrame(columns=['next_day_pct', 'actual', 'final_prediction', 'judgement', 'success'])
+
+        # 全検証日の判定を evaluate_many と同じ列演算で1回にまとめて行う
+        days = days[valid]
+        index = pd.DatetimeIndex(daily.index[days], name='date')
+        results, _ = self._evaluate_positions(pos[valid], index)
+        results = results[list(_empty_results())]
+        labels = results.select_dtypes('category').columns
+        results = results.astype({col: object for col in labels})
+
+        next_day_pct = self._next_day_pct()[days]
+        graded = [grade_prediction(prediction, pct, move_threshold)
+                  for prediction, pct in zip(results['final_prediction'], next_day_pct)]
+        results.insert(0, 'next_day_pct', next_day_pct)
+        results.insert(1, 'actual', [actual for actual, _, _ in graded])
+        results['judgement'] = [judgement for _, judgement, _ in graded]
+        results['success'] = [is_success for _, _, is_success in graded]
+        return results
+
+
+def _find_timeframe(data, keys):
+    """候補キーのうち最初に見つかった空でない時間足のデータを返す。
+
+    MetalAnalyzer の場合は `get_timeframe` で取得します（基準時間足から生成した時間足も含む）。
+    """
+    get = getattr(data, 'get_timeframe', None) or data.get
+    for key in keys:
+        df = get(key)
+        if df is not None and len(df):
+            return df
+    return None
+
+
+@instrumented('backtest.analyze_as_of')
+def analyze_as_of(dates, data, end_of_day=True, params=None, **kwargs):
+    """読み込み済みの全期間のデータから、複数の時点の短期トレンド分析をまとめて実行する。
+
+    インジケーターは全期間に対して1回だけ計算し、各時点の判定は列演算で1回にまとめて行います。
+    各時点の結果は、その時点以前のバーだけを `MetalAnalyzer.analyze_short_trend` に
+    渡した場合と同じ判定です（未来のデータは参照しません）。日付ごとにデータを取得し直して
+    分析する必要はありません。
+
+    Args:
+        dates (iterable): 分析する日付または時刻のリスト。
+        data (Mapping or MetalAnalyzer): 時間足名 ('Daily', '1h', '4h' など
+            `MetalAnalyzer.add_timeframe_data` と同じキー) をキーとする全期間のデータ、
+            またはデータを登録済みの MetalAnalyzer。4時間足を省略した場合は1時間足から生成します。
+            基準時間足を設定した MetalAnalyzer では、追加していない日足・4時間足も基準時間足から生成します。
+        end_of_day (bool): True の場合、各日付の引け（その日の 23:59:59）までのデータで分析します。
+            False の場合は指定された時刻までのデータで分析します。
+        params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+        **kwargs: WalkForwardBacktest に渡す引数 (pattern_threshold, pattern_lookback, min_bars)。
+
+    Returns:
+        pd.DataFrame: 指定された日付をインデックス ('date') とする分析結果。
+            `analyze_short_trend_series` と同じ列に加え、分析に使用した最後の1時間足の時刻 ('as_of') と
+            検知されたパターンの種類のリスト ('detected_patterns') を持ちます。
+            データが不足している日付は含まれません。
+
+    Raises:
+        ValueError: 日足または1時間足のデータがない場合。
+
+    Examples:
+        >>> data = {'Daily': source.fetch('GC=F', '1d', period='2y'),
+        ...         '1h': source.fetch('GC=F', '1h', period='6mo')}
+        >>> results = analyze_as_of(['2026-01-29', '2026-02-02'], data)
+        >>> results[['final_prediction', 'score']]
+    """
+    daily_df, h1_df = _find_timeframe(data, _DAILY_KEYS), _find_timeframe(data, _H1_KEYS)
+    if daily_df is None or h1_df is None:
+        raise ValueError("分析には日足と1時間足のデータが必要です。")
+
+    backtest = WalkForwardBacktest(daily_df, h1_df, h4_df=_find_timeframe(data, _H4_KEYS), **kwargs)
+
+    index = pd.DatetimeIndex(pd.to_datetime(list(dates)), name='date')
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    index = index[~index.duplicated()]
+    as_of = index.normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) if end_of_day else index
+
+    pos, valid = backtest._positions(as_of)
+    results, patterns = backtest._evaluate_positions(pos[valid], index[valid], params)
+    results.insert(0, 'as_of', backtest.h1_df.index[pos[valid]])
+    kinds = [kind for kind in PATTERN_DETECTORS if kind in patterns.columns]
+    flags = patterns[kinds].to_numpy(dtype=bool)
+    results['detected_patterns'] = [[kind for kind, hit in zip(kinds, row) if hit] for row in flags]
+    return results
@@ -5,15 +5,19 @@
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-import os
-import mplfinance as mpf
-from matplotlib.lines import Line2D
-from ..indicators import calculate_sma, calculate_ema, calculate_rsi, calculate_bollinger_bands
-from ..patterns import detect_double_top, detect_double_bottom
+from ..indicators import calculate_sma, calculate_ema, calculate_rsi
+from ..indicators.dtypes import resolve_dtype
+from ..patterns import detect_double_top, detect_double_bottom, detect_patterns, to_patterns_dict
 from ..models import analyze_top_down as run_top_down
-from ..models.short_trend_predictor import analyze_short_trend
+from ..models.short_trend_predictor import analyze_short_trend, evaluate_short_trend
+from .live import LiveFeed, TIMEFRAME_ALIASES, bucket_start, canonical_timeframe
+from .derive import TimeframeGraph
+from .cache import IndicatorCache
+from .store import as_frame, cast_prices
+from .charts import prepare_chart_data, render_chart, render_charts
+from .instrumentation import stage, instrumented, profile
+from .report import ShortTrendReport, format_short_trend_text
 
 class MetalAnalyzer:
     """貴金属価格を分析するためのメインクラス。
@@ -24,23 +28,148 @@ class MetalAnalyzer:
         data (pd.DataFrame): 日足データ（後方互換性のために保持）。
         daily_data (pd.DataFrame): 日足データ。
         hourly_data (pd.DataFrame): 1時間足データ。
+        dtype (np.dtype): 価格データとインジケーターのデータ型 (np.float64 または np.float32)。
+        indicator_cache (IndicatorCache): 時間足ごとのインジケーター計算結果のキャッシュ。
+        timeframe_graph (TimeframeGraph or None): 基準時間足から上位時間足を生成する導出グラフ。
+            base_timeframe を指定しない場合は None。
     """
 
-    def __init__(self, ticker="GC=F"):
+    def __init__(self, ticker="GC=F", cache_size=128, dtype=np.float64, base_timeframe=None,
+                 session_start=None):
         """MetalAnalyzer を初期化する。
 
         Args:
             ticker (str): 分析対象のティッカーシンボル。デフォルトは "GC=F" (Gold)。
+            cache_size (int): インジケーターキャッシュに保持する計算結果の最大数。
+            dtype (np.dtype): 価格データとインジケーターのデータ型。デフォルトは np.float64。
+                np.float32 を指定すると、追加したデータの価格列を float32 で保持し、
+                インジケーターも float32 で計算します（多数の銘柄を走査する場合向け。
+                float64 との誤差は `metal_analyzer.indicators.dtypes` を参照）。
+            base_timeframe (str, optional): 基準時間足（例: "1h", "15m"）。指定すると、
+                それより長い時間足（4時間足・日足・週足・月足など）を追加しなくても
+                基準時間足のデータから参照時に生成します。`set_base_timeframe` を参照。
+            session_start (str, optional): 足の区切りに使う取引セッションの開始時刻
+                （例: "18:00"。先物は `metal_analyzer.core.derive.FUTURES_SESSION_START`）。
+                省略時は 0時区切り。
+
+        Raises:
+            ValueError: float64 / float32 以外のデータ型、または未対応の時間足が指定された場合。
         """
         self.ticker = ticker
-        self.timeframe_data = {}
+        self.dtype = resolve_dtype(dtype)
+        self._timeframe_data = {}
+        self._live = None
+        self._versions = {}
+        self._derived = {}
+        self.timeframe_graph = None
+        self.indicator_cache = IndicatorCache(maxsize=cache_size, dtype=self.dtype)
         self.data = None
         self.daily_data = None
         self.hourly_data = None
+        if base_timeframe is not None:
+            self.set_base_timeframe(base_timeframe, session_start)
+
+    @property
+    def timeframe_data(self):
+        """時間足をキーとするデータフレームの辞書。
+
+        ライブデータ (`ingest_bar` / `ingest_tick`) の未反映分があれば、
+        参照時にまとめて末尾へ追加されます。既存の行はコピーせず、インジケーターの
+        キャッシュも変更された行から後ろだけを計算し直します。
+        """
+        self._flush_live()
+        return self._timeframe_data
+
+    @timeframe_data.setter
+    def timeframe_data(self, frames):
+        self._timeframe_data = frames
+        self._live = None
+        self.indicator_cache.clear()
+        self._reset_graph()
+
+    def set_base_timeframe(self, timeframe, session_start=None):
+        """基準時間足を設定し、上位時間足を基準時間足のデータから生成するようにする。
+
+        生成した時間足は最初に参照された時点で集計して保持し、基準時間足のデータが
+        変わるまで再利用します。`append_timeframe_data` やライブデータで基準時間足の
+        末尾が更新された場合は、変更された足から後ろだけを集計し直します。
+        同じ時間足のデータを `add_timeframe_data` で追加した場合は、そちらを優先します。
+
+        Args:
+            timeframe (str): 基準時間足（例: "1h", "15m"）。
+            session_start (str, optional): 足の区切りに使う取引セッションの開始時刻（例: "18:00"）。
+                タイムゾーン付きのデータではインデックスの現地時刻で判定します。
+
+        Raises:
+            ValueError: 未対応の時間足、または不正な開始時刻が指定された場合。
+
+        Examples:
+            >>> analyzer = MetalAnalyzer("GC=F")
+            >>> analyzer.set_base_timeframe("1h", session_start="18:00")
+            >>> analyzer.add_timeframe_data("1h", source.fetch("GC=F", "1h", period="2y"))
+            >>> weekly = analyzer.get_timeframe("Weekly")
+        """
+        graph = TimeframeGraph(timeframe, session_start)
+        # ライブデータの集計器は区切りが変わるため、未反映分を確定させてから作り直す
+        self._flush_live()
+        self._live = None
+        self.timeframe_graph = graph
+        self._reset_graph()
+
+    def _reset_graph(self):
+        """導出グラフの基準時間足のデータを設定し直し、生成済みの時間足を破棄する。"""
+        for tf in self._derived:
+            self.indicator_cache.invalidate(('derived', tf))
+        self._derived = {}
+        if self.timeframe_graph is not None:
+            self.timeframe_graph.set_base(self._explicit_frame(self.timeframe_graph.base))
+
+    def _explicit_frame(self, timeframe):
+        """追加済みのデータから時間足（別名も含む）のデータフレームを取得する。"""
+        frames = self._timeframe_data
+        tf = canonical_timeframe(timeframe)
+        keys = [timeframe] + [k for k in TIMEFRAME_ALIASES.get(tf, ()) if k != timeframe]
+        for key in keys:
+            df = frames.get(key)
+            if df is not None and not df.empty:
+                return df
+        return None
+
+    def _derive(self, timeframe):
+        """導出グラフから時間足のデータを取得する（生成できない場合は None）。"""
+        graph = self.timeframe_graph
+        tf = canonical_timeframe(timeframe)
+        if graph is None or not graph.can_derive(tf):
+            return None
+        df = graph.get(tf)
+        if df is not None and self._derived.get(tf) is not df:
+            # 集計し直した時間足は、追加したデータと区別したキーでキャッシュに登録する
+            self._derived[tf] = df
+            self._bind(('derived', tf), df)
+        return df
+
+    def get_timeframe(self, timeframe):
+        """時間足のデータを取得する。
+
+        追加済みのデータ（別名のキーも含む）を優先し、ない場合は基準時間足から生成します。
+
+        Args:
+            timeframe (str): 時間足の名称（例: "Weekly", "1wk", "4h"）。
+
+        Returns:
+            pd.DataFrame or None: 時間足のデータ。追加も生成もできない場合は None。
+        """
+        self._flush_live()
+        df = self._explicit_frame(timeframe)
+        if df is None:
+            df = self._derive(timeframe)
+        return df
 
     def _get_df(self, keys):
         """複数の候補キーから有効なデータフレームを取得する。
 
+        候補キーのデータがない場合は、基準時間足から生成します。
+
         Args:
             keys (list): 検索する時間足キーのリスト。
 
@@ -51,22 +180,96 @@ class MetalAnalyzer:
             df = self.timeframe_data.get(key)
             if df is not None and not df.empty:
                 return df
-        return None
+        return self._derive(keys[0])
+
+    def _prepare_frame(self, data):
+        """追加するデータを分析用のデータフレームに変換する（OHLCVStore も DataFrame として保持する）。"""
+        data = as_frame(data, dtype=self.dtype)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.to_datetime(data.index)
+        return cast_prices(data, self.dtype)
 
     def add_timeframe_data(self, timeframe, data):
         """特定の時間足のデータを追加する。
 
         Args:
             timeframe (str): 時間足の名称（例: "Daily", "1h"）。
-            data (pd.DataFrame): OHLCVデータを含むデータフレーム。
+            data (pd.DataFrame or OHLCVStore): OHLCVデータを含むデータフレーム。
+                OHLCVStore の場合は分析用の DataFrame に変換して保持します
+                （ストアの価格列が dtype と同じ場合は配列をコピーせずに共有します）。
+                価格列は dtype に変換して保持します。
+
+        Note:
+            `timeframe_data` には常に DataFrame を保持し、OHLCVStore のまま保持することはしません。
+            分析・チャート・ライブ更新・上位時間足の集計が DataFrame を前提としているためで、
+            ストアを保持形式にする変更は現時点では対象外です。ストアを渡した場合の効果は、
+            変換時に配列をコピーしないことと、float32 で保持できることに限られます。
         """
-        if isinstance(data.columns, pd.MultiIndex):
-            data.columns = data.columns.get_level_values(0)
-        if not isinstance(data.index, pd.DatetimeIndex):
-            data.index = pd.to_datetime(data.index)
-            
-        self.timeframe_data[timeframe] = data
-        
+        data = self._prepare_frame(data)
+
+        # ライブデータの未反映分を確定させ、状態は次回の取り込み時に再構築する
+        with stage('store'):
+            self._flush_live()
+            self._live = None
+            self._store_frame(timeframe, data)
+
+    def append_timeframe_data(self, timeframe, data):
+        """特定の時間足のデータの末尾に新しいバーを追加する。
+
+        追加するデータの最初の時刻以降の既存のバーは、追加するデータで置き換えます
+        （形成中だった最終バーの更新など）。基準時間足の場合、生成済みの上位時間足は
+        変更されたバーを含む足から後ろだけを集計し直します。
+
+        Args:
+            timeframe (str): 時間足の名称（例: "1h"）。
+            data (pd.DataFrame or OHLCVStore): 追加する OHLCV データ。
+
+        Examples:
+            >>> analyzer.append_timeframe_data("1h", source.fetch("GC=F", "1h", period="1d"))
+        """
+        data = self._prepare_frame(data)
+
+        with stage('store'):
+            self._flush_live()
+            self._live = None
+            df = self._timeframe_data.get(timeframe)
+            if df is None or df.empty:
+                self._store_frame(timeframe, data)
+                return
+            if data.empty:
+                return
+            position = int(df.index.searchsorted(data.index[0], side='left'))
+            self._store_frame(timeframe, pd.concat([df.iloc[:position], data]), changed_from=position)
+
+    def _flush_live(self):
+        """ライブデータの未反映分をデータフレームに追加する。"""
+        live = self._live
+        if live is not None:
+            for key, df, changed_from in live.flush(self._timeframe_data):
+                # 導出グラフから生成できる上位時間足は、基準時間足から集計し直す
+                if (key not in self._timeframe_data and key != live.keys[live.base]
+                        and self.timeframe_graph is not None and self.timeframe_graph.can_derive(key)):
+                    continue
+                self._store_frame(key, df, changed_from)
+
+    def _store_frame(self, timeframe, data, changed_from=0):
+        """データフレームを保存し、日足・1時間足の参照を更新する。
+
+        Args:
+            timeframe (str): 時間足の名称。
+            data (pd.DataFrame): 保存するデータフレーム。
+            changed_from (int): 以前のデータから変更された最初の行の位置
+                （基準時間足の場合、生成済みの上位時間足の再集計範囲に使用）。
+        """
+        self._timeframe_data[timeframe] = data
+        self._bind(timeframe, data, changed_from)
+
+        graph = self.timeframe_graph
+        if graph is not None and canonical_timeframe(timeframe) == graph.base:
+            graph.set_base(self._explicit_frame(graph.base), changed_from)
+
         norm_tf = timeframe.lower().replace('monthly', '1mo').replace('weekly', '1wk').replace('daily', '1d').replace('hourly', '1h')
         if norm_tf in ['1d', 'daily']:
             self.data = data
@@ -74,14 +277,35 @@ class MetalAnalyzer:
         elif norm_tf in ['1h', 'hourly']:
             self.hourly_data = data
 
-    def analyze_short_trend(self):
-        """短期トレンド分析を実行し、結果を出力する。
+    def _bind(self, key, data, changed_from=0):
+        """データが変わった時間足を新しいバージョンでキャッシュに登録する。
+
+        changed_from を指定した場合は、計算結果を破棄せずに変更された行から後ろだけを
+        計算し直して引き継ぎます（`IndicatorCache.extend` を参照）。
+        """
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+        if changed_from > 0:
+            self.indicator_cache.extend(data, key, version, changed_from)
+            return
+        self.indicator_cache.invalidate(key)
+        self.indicator_cache.bind(data, key, version)
+
+    @instrumented('analyze_short_trend')
+    def analyze_short_trend(self, verbose=True):
+        """短期トレンド分析を実行する。
 
         日足、4時間足、1時間足、およびチャートパターンを使用して、
         多角的な相場分析（4つのダッシュボード）を実行します。
+        基準時間足 (base_timeframe) を設定している場合、追加していない日足・4時間足は
+        基準時間足から生成したものを使用します。
+
+        Args:
+            verbose (bool): 結果を画面に出力するか。バックテストなどで繰り返し実行する場合は
+                False とし、必要に応じて `format_short_trend_text` などで整形してください。
 
         Returns:
-            dict or None: 分析結果を含む辞書。データ不足の場合は None。
+            ShortTrendReport or None: 分析結果（dict として参照可能）。データ不足の場合は None。
         """
         d_df = self._get_df(['Daily', '1d', '1D', 'daily'])
         if d_df is None: d_df = self.daily_data
@@ -92,61 +316,196 @@ class MetalAnalyzer:
         
         # 4時間足の補完
         if h4_df is None and h1_df is not None:
-             h4_df = h1_df.resample('4h').agg({
-                'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-             }).dropna()
-             self.add_timeframe_data('4h', h4_df)
+            with stage('resample'):
+                h4_df = h1_df.resample('4h').agg({
+                    'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
+                }).dropna()
+            # add_timeframe_data と異なり、ライブデータの状態は破棄しない
+            h4_df = self._prepare_frame(h4_df)
+            self._store_frame('4h', h4_df)
 
         if d_df is None or h4_df is None or h1_df is None:
-            print("【警告】高度な分析には日足、4時間足、1時間足のデータが必要です。")
+            if verbose:
+                print("【警告】高度な分析には日足、4時間足、1時間足のデータが必要です。")
             return None
 
         # パターン情報の取得
-        dt_detected, dt_details = self.detect_double_top()
-        db_detected, db_details = self.detect_double_bottom()
-
-        patterns = {
-            'double_top': dt_detected,
-            'double_bottom': db_detected
-        }
-
-        # ネックラインの抽出 (正規表現)
-        import re
-        if dt_detected:
-            match = re.search(r"ネックライン ([\d.]+)", dt_details)
-            if match: patterns['neckline_top'] = float(match.group(1))
-        
-        if db_detected:
-            match = re.search(r"ネックライン ([\d.]+)", db_details)
-            if match: patterns['neckline_bottom'] = float(match.group(1))
+        patterns, results = self._collect_patterns(h1_df)
 
-        res = analyze_short_trend(d_df, h4_df, h1_df, patterns=patterns)
-        
-        print("\n" + "="*50)
-        print(" ■短期トレンド分析")
-        print("="*50)
-        print(f"長期トレンド： {res['dashboard_1_trend']}")
-        print(f"EMA乖離： {res['dashboard_2_momentum']}")
-        print(f"加速/ボラ： {res['dashboard_3_volatility']}")
-        print(f"センチメント： {res['dashboard_4_sentiment']}")
-        print("-" * 50)
-        
-        status_dt = "検知あり" if dt_detected else "検知なし"
-        print(f"ダブルトップ： {status_dt}")
-        if dt_detected: print(f"詳細： {dt_details}")
-
-        status_db = "検知あり" if db_detected else "検知なし"
-        print(f"ダブルボトム： {status_db}")
-        if db_detected: print(f"詳細： {db_details}")
-
-        print("-" * 20)
-        print(f"最終予測: {res['final_prediction']}")
-        print(f"リスク: {res['risk_level']}")
-        print(f"コメント: {res['comment']}")
-        print("="*50 + "\n")
-        
-        return res
+        res = analyze_short_trend(d_df, h4_df, h1_df, patterns=patterns, cache=self.indicator_cache)
+        report = ShortTrendReport(res, patterns=results, ticker=self.ticker,
+                                  as_of=h1_df.index[-1] if len(h1_df) else None)
+        if verbose:
+            print(format_short_trend_text(report))
+        return report
+
+    def _collect_patterns(self, df):
+        """チャートパターンを検知し、短期トレンド分析用のパターン情報を作成する。
+
+        山・谷のインデックス (SwingIndex) を1回だけ作成し、登録されている全てのパターンを検知します。
+
+        Args:
+            df (pd.DataFrame): パターン検知に使用する価格データ。
+
+        Returns:
+            tuple: (patterns, results)
+                patterns (dict) と、パターンの種類をキーとする検知結果 (PatternResult) の辞書。
+        """
+        with stage('patterns'):
+            results = detect_patterns(df, cache=self.indicator_cache)
+        return to_patterns_dict(*results.values()), results
+
+    def ingest_bar(self, timeframe, bar, timestamp=None):
+        """基準時間足のバーを1本追加し、上位時間足を逐次更新する。
+
+        最初に呼び出した時間足が基準時間足となり、それより長い時間足
+        (1時間足 → 4時間足 → 日足 → 週足 → 月足) の形成中のバーが更新されます。
+        同じ時刻のバーを再度渡すと、形成中のバーの更新として扱います。
+        既存データの再集計やインジケーターの再計算は行いません（既存データのない上位時間足は、
+        最初の取り込み時に、より細かい時間足の既存データを1回だけ集計して補います）。
+
+        Args:
+            timeframe (str): 基準時間足（例: "15m", "1h"）。
+            bar (Mapping): 'Open', 'High', 'Low', 'Close', 'Volume' を含むバー。
+            timestamp (optional): バーの開始時刻。省略時は bar.name を使用します。
+
+        Raises:
+            ValueError: 基準時間足と異なる時間足、または過去のバーが渡された場合。
+        """
+        tf = canonical_timeframe(timeframe)
+        if tf is None:
+            raise ValueError(f"未対応の時間足です: {timeframe}")
+        live = self._ensure_live(tf)
+
+        ts = pd.Timestamp(timestamp if timestamp is not None else bar.name)
+        if ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        close = float(bar['Close'])
+        values = (float(bar.get('Open', close)), float(bar.get('High', close)),
+                  float(bar.get('Low', close)), close, float(bar.get('Volume', 0.0)))
+        live.push(bucket_start(tf, ts.value), values)
+
+    def ingest_tick(self, ts, price, volume=0.0, timeframe=None):
+        """ティック（約定価格）を1件追加し、全時間足の形成中のバーを更新する。
+
+        Args:
+            ts: ティックの時刻。
+            price (float): 約定価格。
+            volume (float): 出来高。
+            timeframe (str, optional): 基準時間足。省略時は既存の基準時間足、
+                未設定の場合は "1h" を使用します。
+        """
+        if self._live is not None and timeframe is None:
+            tf = self._live.base
+        else:
+            tf = canonical_timeframe(timeframe or '1h')
+        live = self._ensure_live(tf)
+
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        bucket = bucket_start(tf, ts.value)
+        price = float(price)
+
+        current = live.current(tf)
+        if current is not None and current[0] == bucket:
+            _, o, h, l, _, v = current
+            bar = (o, max(h, price), min(l, price), price, v + volume)
+        else:
+            bar = (price, price, price, price, float(volume))
+        live.push(bucket, bar)
+
+    def _ensure_live(self, base):
+        """ライブデータの集計器を取得する（未作成の場合は既存データから作成）。"""
+        if self._live is None:
+            frames, offset = self._timeframe_data, 0
+            graph = self.timeframe_graph
+            if graph is not None:
+                # 生成できる上位時間足の最終バーからも形成中のバーを引き継ぐ
+                frames, offset = dict(frames), graph.offset
+                for tf in graph.timeframes:
+                    df = self._derive(tf) if self._explicit_frame(tf) is None else None
+                    if df is not None:
+                        frames[tf] = df
+            self._live = LiveFeed(base, frames, offset)
+        elif self._live.base != base:
+            raise ValueError(f"基準時間足は {self._live.base} です: {base}")
+        return self._live
+
+    def live_short_trend(self, detect_patterns=True):
+        """ライブデータの最新バー時点で短期トレンド分析を実行する。
+
+        `ingest_bar` / `ingest_tick` で逐次更新された指標の状態を使用するため、
+        データの再集計やインジケーターの再計算を行いません。
+        結果は `analyze_short_trend` と同じ形式ですが、画面への出力は行いません。
+
+        Args:
+            detect_patterns (bool): 直近100本の1時間足でダブルトップ/ボトムを検知するか。
+                逐次更新型の検知器（DoubleTopDetector / DoubleBottomDetector）を使用し、
+                判定結果は `detect_double_top` / `detect_double_bottom` と一致します。
+                False の場合はパターンなしとして判定します。
+
+        Returns:
+            dict or None: 分析結果。1時間足のライブデータがない場合は None。
+        """
+        live = self._live
+        if live is None or live.short_state is None:
+            return None
+        current = live.current('1h')
+        if current is None:
+            return None
+
+        state = live.short_state
+        features = state.features(current[0], current[1:])
+        patterns = None
+        if detect_patterns:
+            patterns = to_patterns_dict(state.double_top.peek(current[4]),
+                                        state.double_bottom.peek(current[4]))
+        return evaluate_short_trend(features, patterns)
+
+    @staticmethod
+    def profile(memory=False):
+        """ブロック内の各処理の実行時間・呼び出し回数・メモリ増加量を計測する。
+
+        `metal_analyzer.core.instrumentation.profile` の簡易呼び出しです。
+        計測はプロセス全体に対して行われるため、ブロック内で実行した
+        他の MetalAnalyzer やモデル関数の処理も集計されます。
 
+        Args:
+            memory (bool): tracemalloc でメモリ増加量も計測するか。
+
+        Returns:
+            コンテキストマネージャー。`with` で Profile（計測結果）を受け取ります。
+
+        Examples:
+            >>> with analyzer.profile() as prof:
+            ...     analyzer.analyze_all()
+            >>> print(prof.report())
+        """
+        return profile(memory=memory)
+
+    @classmethod
+    def analyze_universe(cls, tickers, source=None, max_workers=None, periods=None, dtype=np.float64):
+        """複数銘柄の短期・中期トレンド分析とパターン検知を並列に実行する。
+
+        `PortfolioAnalyzer` の簡易呼び出しです。各銘柄はワーカープロセスで
+        取得元から直接データを読み込んで分析されます。
+
+        Args:
+            tickers (iterable): ティッカーシンボルのリスト（例: ["GC=F", "SI=F"]）。
+            source (DataSource, optional): データの取得元。省略時は YFinanceSource。
+            max_workers (int, optional): ワーカープロセス数。省略時は CPU 数。
+            periods (dict, optional): 時間足 ('1d', '1h', '1wk') ごとの取得期間。
+            dtype (np.dtype): 価格データとインジケーターのデータ型 (np.float64 または np.float32)。
+
+        Returns:
+            pd.DataFrame: ティッカーをインデックスとする結果テーブル。
+        """
+        from .portfolio import PortfolioAnalyzer
+        return PortfolioAnalyzer(source=source, max_workers=max_workers, periods=periods,
+                                 dtype=dtype).analyze(tickers)
+
+    @instrumented('plot_candlestick')
     def plot_candlestick(self, timeframe, filename=None, title=None):
         """特定の時間足のローソク足チャートを生成・保存する。
 
@@ -154,62 +513,56 @@ class MetalAnalyzer:
 
         Args:
             timeframe (str): 描画対象の時間足キー。
-            filename (str, optional): 保存先のパス。指定しない場合は表示のみ（環境に依存）。
+            filename (str, optional): 保存先のパス。指定した場合は保存後に図を閉じます。
             title (str, optional): チャートのタイトル。
+
+        Returns:
+            matplotlib.figure.Figure or None: filename を指定しない場合は描画した図。
         """
-        df = self.timeframe_data.get(timeframe)
+        df = self.get_timeframe(timeframe)
         if df is None or df.empty:
             print(f"時間足 {timeframe} のデータがありません。")
-            return
+            return None
 
-        for window in [20, 50, 200]:
-            col_name = f'EMA_{window}'
-            if col_name not in df.columns:
-                df[col_name] = calculate_ema(df, window)
-
-        plot_df = df.tail(100)
-        apds = []
-        if not plot_df['EMA_20'].isnull().all():
-            apds.append(mpf.make_addplot(plot_df['EMA_20'], color='cyan', width=1.0))
-        if not plot_df['EMA_50'].isnull().all():
-            apds.append(mpf.make_addplot(plot_df['EMA_50'], color='yellow', width=1.0))
-        if not plot_df['EMA_200'].isnull().all():
-            apds.append(mpf.make_addplot(plot_df['EMA_200'], color='magenta', width=1.5))
-
-        # ボリンジャーバンドの計算
-        mb, ub, lb = calculate_bollinger_bands(plot_df, window=20, num_std=2)
-        if mb is not None:
-            apds.append(mpf.make_addplot(ub, color='gray', width=0.5, alpha=0.5))
-            apds.append(mpf.make_addplot(lb, color='gray', width=0.5, alpha=0.5))
-
-        custom_style = mpf.make_mpf_style(
-            base_mpf_style='charles', marketcolors=mpf.make_marketcolors(up='green', down='red', inherit=True),
-            gridcolor='dimgray', facecolor='black', figcolor='black',
-            rc={'text.color': 'white', 'axes.labelcolor': 'white', 'xtick.color': 'white',
-                'ytick.color': 'white', 'axes.edgecolor': 'white', 'figure.titlesize': 'x-large'}
-        )
-
-        title = title or f"{self.ticker} - {timeframe}"
-        if filename: os.makedirs(os.path.dirname(filename) if os.path.dirname(filename) else '.', exist_ok=True)
-
-        fig, axlist = mpf.plot(plot_df, type='candle', style=custom_style, addplot=apds, title=title, 
-                 ylabel='Price', volume=True if 'Volume' in plot_df.columns else False,
-                 savefig=dict(fname=filename, bbox_inches='tight') if filename else None,
-                 tight_layout=True, scale_padding=1.5, figratio=(16, 9), datetime_format='%m/%d %H:%M', returnfig=True)
-        
-        if len(axlist) > 0:
-            # ボリンジャーバンドの背景色塗り
-            if mb is not None:
-                axlist[0].fill_between(range(len(plot_df)), lb.values, ub.values, color='gray', alpha=0.1)
-
-            # 凡例
-            handles = [Line2D([0], [0], color=c, lw=1.5) for c in ['cyan', 'yellow', 'magenta', 'gray']]
-            labels = ['EMA 20', 'EMA 50', 'EMA 200', 'Bollinger Bands (2σ)']
-            axlist[0].legend(handles, labels, loc='upper left', fontsize='small', facecolor='black', edgecolor='white', labelcolor='white')
-            
-            if filename: fig.savefig(filename, bbox_inches='tight', facecolor='black')
+        # EMA はキャッシュから取得し、元のデータフレームには列を追加しない
+        with stage('prepare'):
+            plot_df, emas = prepare_chart_data(df, cache=self.indicator_cache)
+        with stage('render'):
+            fig = render_chart(plot_df, emas, filename=filename, title=title or f"{self.ticker} - {timeframe}")
 
         if filename: print(f"【完了】{timeframe} チャートを保存しました: {filename}")
+        return fig
+
+    @instrumented('render_charts')
+    def render_charts(self, out_dir, timeframes=None, workers=None, prefix="", filenames=None, titles=None):
+        """複数の時間足のチャートをプロセスプールで並列に描画・保存する。
+
+        Args:
+            out_dir (str): 保存先ディレクトリ。
+            timeframes (list, optional): 描画する時間足キーのリスト。省略時は追加済みの全時間足と、
+                基準時間足から生成できる時間足。
+            workers (int, optional): ワーカープロセス数。省略時は CPU 数。
+            prefix (str): ファイル名の接頭辞。
+            filenames (dict, optional): 時間足キーごとのファイル名。
+            titles (dict, optional): 時間足キーごとのタイトル。省略時は "{ticker} - {時間足}"。
+
+        Returns:
+            dict: 時間足キーをキー、保存したファイルのパスを値とする辞書。
+        """
+        frames = self.timeframe_data
+        if timeframes is None:
+            keys = list(frames.keys())
+            if self.timeframe_graph is not None:
+                keys += [tf for tf in self.timeframe_graph.timeframes if self._explicit_frame(tf) is None]
+        else:
+            keys = list(timeframes)
+        titles = dict({tf: f"{self.ticker} - {tf}" for tf in keys}, **(titles or {}))
+
+        saved = render_charts({tf: self.get_timeframe(tf) for tf in keys}, out_dir, workers=workers,
+                              cache=self.indicator_cache, prefix=prefix, filenames=filenames, titles=titles)
+        for tf, fname in saved.items():
+            print(f"【完了】{tf} チャートを保存しました: {fname}")
+        return saved
 
     def detect_double_top(self, threshold=0.03, lookback=100):
         """ダブルトップ（Mトップ）パターンを検知する。
@@ -219,7 +572,7 @@ class MetalAnalyzer:
             lookback (int): 参照する直近のデータポイント数。
 
         Returns:
-            tuple: (bool, str) 検知の有無と詳細メッセージ。
+            PatternResult: 検知結果。(bool, str) 検知の有無と詳細メッセージとして展開できます。
         """
         df = self._get_df(['1h', '1H', 'hourly'])
         if df is None: df = self.hourly_data
@@ -233,13 +586,14 @@ class MetalAnalyzer:
             lookback (int): 参照する直近のデータポイント数。
 
         Returns:
-            tuple: (bool, str) 検知の有無と詳細メッセージ。
+            PatternResult: 検知結果。(bool, str) 検知の有無と詳細メッセージとして展開できます。
         """
         from ..patterns import detect_double_bottom
         df = self._get_df(['1h', '1H', 'hourly'])
         if df is None: df = self.hourly_data
         return detect_double_bottom(df, threshold, lookback)
 
+    @instrumented('analyze_all')
     def analyze_all(self, output_dir="examples/outputs/candles", prefix=""):
         """全時間足の分析とプロットを一括実行する。
 
@@ -249,10 +603,7 @@ class MetalAnalyzer:
         """
         print(f"\n--- 総合分析およびチャート生成開始 (Prefix: {prefix}) ---")
         self.analyze_short_trend()
-        
-        for tf in list(self.timeframe_data.keys()):
-            fname = os.path.join(output_dir, f"{prefix}chart_{tf.lower()}.png")
-            self.plot_candlestick(tf, filename=fname)
+        self.render_charts(output_dir, prefix=prefix)
 
     def calculate_ema(self, window=20, timeframe='default'):
         """指数平滑移動平均 (EMA) を計算してデータフレームに追加する。
@@ -262,7 +613,7 @@ class MetalAnalyzer:
             timeframe (str): 対象の時間足キー。
         """
         df = self.timeframe_data.get(timeframe)
-        if df is not None: df[f'EMA_{window}'] = calculate_ema(df, window)
+        if df is not None: df[f'EMA_{window}'] = calculate_ema(df, window, self.dtype)
 
     def calculate_sma(self, window=20, timeframe='default'):
         """単純移動平均 (SMA) を計算してデータフレームに追加する。
@@ -272,7 +623,7 @@ class MetalAnalyzer:
             timeframe (str): 対象の時間足キー。
         """
         df = self.timeframe_data.get(timeframe)
-        if df is not None: df[f'SMA_{window}'] = calculate_sma(df, window)
+        if df is not None: df[f'SMA_{window}'] = calculate_sma(df, window, self.dtype)
 
     def calculate_rsi(self, window=14, timeframe='default'):
         """相対力指数 (RSI) を計算してデータフレームに追加する。
@@ -282,7 +633,7 @@ class MetalAnalyzer:
             timeframe (str): 対象の時間足キー。
         """
         df = self.timeframe_data.get(timeframe)
-        if df is not None: df['RSI'] = calculate_rsi(df, window)
+        if df is not None: df['RSI'] = calculate_rsi(df, window, self.dtype)
 
     def set_data(self, data):
         """日足データをセットする（互換用）。
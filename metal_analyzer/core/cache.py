@@ -0,0 +1,239 @@
+"""インジケーター計算結果のキャッシュを提供するモジュール。
+
+このモジュールは、(時間足, インジケーター, パラメータ, データバージョン) を
+キーとして計算結果を保持する LRU キャッシュ IndicatorCache を提供します。
+MetalAnalyzer が保持し、同じデータに対する EMA などの再計算を防ぎます。
+キャッシュの dtype で、インジケーターを float64 / float32 のどちらで計算するかを指定します。
+データの末尾だけが変わった場合は `extend` で、変更された行から後ろだけを計算し直して
+計算結果を引き継ぎます。
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..indicators import calculate_sma, calculate_ema, calculate_emas, calculate_rsi, calculate_bollinger_bands
+from ..indicators.dtypes import resolve_dtype
+from ..indicators.sma import _ema_filter
+from .instrumentation import stage, count
+
+
+class IndicatorCache:
+    """時間足ごとのインジケーター計算結果を保持する LRU キャッシュ。
+
+    データフレームは `bind` で時間足名とデータバージョンに対応付けます。
+    対応付けられていないデータフレームが渡された場合はキャッシュせずに計算します。
+    データフレームの中身を直接書き換えた場合は検知できないため、
+    データを更新する際は MetalAnalyzer.add_timeframe_data を使用してください。
+
+    Attributes:
+        maxsize (int): 保持する計算結果の最大数。
+        dtype (np.dtype): インジケーターの計算に使うデータ型 (np.float64 または np.float32)。
+        hits (int): キャッシュから返した回数。
+        misses (int): 新たに計算した回数。
+    """
+
+    def __init__(self, maxsize=128, dtype=np.float64):
+        """IndicatorCache を初期化する。
+
+        Args:
+            maxsize (int): 保持する計算結果の最大数。デフォルトは128。
+            dtype (np.dtype): インジケーターの計算に使うデータ型。デフォルトは np.float64。
+
+        Raises:
+            ValueError: float64 / float32 以外のデータ型が指定された場合。
+        """
+        self.maxsize = maxsize
+        self.dtype = resolve_dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._frames = {}
+
+    def bind(self, df, timeframe, version):
+        """データフレームを時間足名とデータバージョンに対応付ける。
+
+        Args:
+            df (pd.DataFrame): 対象のデータフレーム。
+            timeframe (str): 時間足名。
+            version (int): データバージョン。データが変わるたびに増やします。
+        """
+        self._frames[id(df)] = (timeframe, version, df)
+
+    def invalidate(self, timeframe):
+        """指定した時間足の計算結果と対応付けを破棄する。
+
+        Args:
+            timeframe (str): 時間足名。
+        """
+        for key in [k for k in self._entries if k[0] == timeframe]:
+            del self._entries[key]
+        for frame_id in [i for i, reg in self._frames.items() if reg[0] == timeframe]:
+            del self._frames[frame_id]
+
+    def extend(self, df, timeframe, version, changed_from):
+        """末尾が変わったデータフレームを対応付け、時間足の計算結果を引き継ぐ。
+
+        df の先頭 changed_from 行が以前に対応付けたデータと同じ場合に使用します。
+        EMA は変更前の最後の値から漸化式を続けて計算し、SMA・RSI・ボリンジャーバンドは
+        変更された行の計算に必要な期間だけを計算し直します（全体を計算した場合との差は
+        浮動小数点の丸め程度）。それ以外の計算結果は破棄し、次に参照されたときに計算します。
+
+        Args:
+            df (pd.DataFrame): 更新後のデータフレーム。
+            timeframe (str): 時間足名。
+            version (int): 更新後のデータバージョン。
+            changed_from (int): 以前のデータから変更された最初の行の位置。
+        """
+        previous = next((reg[1] for reg in self._frames.values() if reg[0] == timeframe), None)
+        entries = [(key, value) for key, value in self._entries.items()
+                   if key[0] == timeframe and key[3] == previous]
+        self.invalidate(timeframe)
+        self.bind(df, timeframe, version)
+        if changed_from <= 0 or 'Close' not in df.columns:
+            return
+
+        for key, value in entries:
+            _, name, params, _ = key
+            with stage(name):
+                value = _extend_value(name, params, value, df, changed_from)
+            if value is not None:
+                self._store((timeframe, name, params, version), value)
+
+    def clear(self):
+        """全ての計算結果と対応付けを破棄する。"""
+        self._entries.clear()
+        self._frames.clear()
+
+    def get(self, df, name, params, func):
+        """計算結果をキャッシュから取得する（なければ計算して保存する）。
+
+        Args:
+            df (pd.DataFrame): 対象のデータフレーム。
+            name (str): インジケーター名。
+            params (tuple): インジケーターのパラメータ。
+            func (callable): func(df, *params) で計算を行う関数。
+
+        Returns:
+            計算結果。
+        """
+        reg = self._frames.get(id(df))
+        if reg is None or reg[2] is not df:
+            with stage(name):
+                return func(df, *params)
+
+        key = (reg[0], name, params, reg[1])
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            count('cache.hits')
+            return self._entries[key]
+
+        self.misses += 1
+        count('cache.misses')
+        with stage(name):
+            value = func(df, *params)
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        """計算結果を保存し、上限を超えた古い結果を破棄する。"""
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def ema(self, df, window=20):
+        """キャッシュ付きの `calculate_ema`。"""
+        return self.get(df, 'ema', (window, self.dtype), calculate_ema)
+
+    def emas(self, df, spans=(12, 26)):
+        """キャッシュ付きの `calculate_emas`。
+
+        期間ごとの計算結果は `ema` と共有します。キャッシュにない期間だけを
+        `calculate_emas` の1回の呼び出しでまとめて計算します。
+
+        Args:
+            df (pd.DataFrame): 対象のデータフレーム。
+            spans (sequence of int): EMA の期間。
+
+        Returns:
+            np.ndarray or None: 形状 (len(df), len(spans)) の配列。'Close' 列がない場合は None。
+        """
+        spans = tuple(spans)
+        reg = self._frames.get(id(df))
+        if reg is None or reg[2] is not df or not spans or 'Close' not in df.columns:
+            with stage('ema'):
+                return calculate_emas(df, spans, self.dtype)
+
+        keys = {span: (reg[0], 'ema', (span, self.dtype), reg[1]) for span in spans}
+        columns = {}
+        for span, key in keys.items():
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                columns[span] = self._entries[key]
+        if columns:
+            self.hits += len(columns)
+            count('cache.hits', len(columns))
+
+        missing = [span for span in keys if span not in columns]
+        if missing:
+            self.misses += len(missing)
+            count('cache.misses', len(missing))
+            with stage('ema'):
+                values = calculate_emas(df, missing, self.dtype)
+            for j, span in enumerate(missing):
+                columns[span] = pd.Series(values[:, j], index=df.index, name='Close')
+                self._store(keys[span], columns[span])
+
+        return np.column_stack([columns[span].to_numpy() for span in spans])
+
+    def sma(self, df, window=20):
+        """キャッシュ付きの `calculate_sma`。"""
+        return self.get(df, 'sma', (window, self.dtype), calculate_sma)
+
+    def rsi(self, df, window=14):
+        """キャッシュ付きの `calculate_rsi`。"""
+        return self.get(df, 'rsi', (window, self.dtype), calculate_rsi)
+
+    def bollinger(self, df, window=20, num_std=2):
+        """キャッシュ付きの `calculate_bollinger_bands`。"""
+        return self.get(df, 'bollinger', (window, num_std, self.dtype), calculate_bollinger_bands)
+
+
+# 期間 window の計算結果を末尾から計算し直すインジケーターと、window - 1 本に加えて
+# 変更された行より前に必要なバーの本数（RSI は変化幅の計算に1本多く必要）
+_TAIL_WARMUP = {
+    'sma': (calculate_sma, 0),
+    'rsi': (calculate_rsi, 1),
+    'bollinger': (calculate_bollinger_bands, 0),
+}
+
+
+def _extend_value(name, params, value, df, changed_from):
+    """計算結果を更新後のデータに引き継ぐ（引き継げない場合は None）。"""
+    series = value if isinstance(value, tuple) else (value,)
+    if not all(isinstance(s, pd.Series) and len(s) >= changed_from for s in series) or changed_from > len(df):
+        return None
+
+    if name == 'ema':
+        window, dtype = params
+        prev = series[0].to_numpy()[changed_from - 1]
+        tail = df['Close'].to_numpy()[changed_from:].astype(dtype, copy=False)
+        if np.isnan(prev) or np.isnan(tail).any():
+            return None
+        values = np.empty(len(df), dtype=dtype)
+        values[:changed_from] = series[0].to_numpy()[:changed_from]
+        _ema_filter(tail, 2.0 / (window + 1.0), prev, values[changed_from:])
+        return pd.Series(values, index=df.index, name='Close')
+
+    if name not in _TAIL_WARMUP:
+        return None
+    func, extra = _TAIL_WARMUP[name]
+    start = max(changed_from - (params[0] - 1 + extra), 0)
+    result = func(df.iloc[start:], *params)
+    tails = result if isinstance(result, tuple) else (result,)
+    merged = tuple(pd.Series(np.concatenate([old.to_numpy()[:changed_from], new.to_numpy()[changed_from - start:]]),
+                             index=df.index, name=old.name)
+                   for old, new in zip(series, tails))
+    return merged if isinstance(value, tuple) else merged[0]
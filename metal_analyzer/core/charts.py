@@ -0,0 +1,188 @@
+"""ローソク足チャートの描画機能を提供するモジュール。
+
+このモジュールは、1枚のチャートを描画する render_chart と、
+複数の時間足のチャートをプロセスプールで並列に描画する render_charts を提供します。
+ファイルに保存する図は Agg バックエンドで描画し、保存は1回だけ行い、
+保存後は必ず図を閉じます（長時間動作するプロセスでのメモリリークを防ぐため）。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import mplfinance as mpf
+import pandas as pd
+from matplotlib.lines import Line2D
+
+from ..indicators import calculate_emas, calculate_bollinger_bands
+from .store import as_frame
+from .instrumentation import stage
+
+# 重畳する EMA の期間と色・線幅
+EMA_STYLES = (
+    (20, 'cyan', 1.0),
+    (50, 'yellow', 1.0),
+    (200, 'magenta', 1.5),
+)
+
+# チャートに描画するバーの本数
+CHART_BARS = 100
+
+
+def _chart_style():
+    """ダークモードのチャートスタイルを作成する。"""
+    return mpf.make_mpf_style(
+        base_mpf_style='charles', marketcolors=mpf.make_marketcolors(up='green', down='red', inherit=True),
+        gridcolor='dimgray', facecolor='black', figcolor='black',
+        rc={'text.color': 'white', 'axes.labelcolor': 'white', 'xtick.color': 'white',
+            'ytick.color': 'white', 'axes.edgecolor': 'white', 'figure.titlesize': 'x-large'}
+    )
+
+
+def prepare_chart_data(df, cache=None, bars=CHART_BARS):
+    """描画に必要な直近のバーと EMA を切り出す。
+
+    EMA は全期間で計算してから切り出すため、描画範囲の先頭でも正しい値になります。
+
+    Args:
+        df (pd.DataFrame or OHLCVStore): 描画対象の価格データ。
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+        bars (int): 描画するバーの本数。
+
+    Returns:
+        tuple: (plot_df, emas)
+            plot_df (pd.DataFrame): 直近 bars 本の OHLCV。
+            emas (dict): EMA の期間をキー、直近 bars 本の EMA (pd.Series) を値とする辞書。
+    """
+    df = as_frame(df)
+    calc_emas = cache.emas if cache is not None else calculate_emas
+    columns = [c for c in ('Open', 'High', 'Low', 'Close', 'Volume') if c in df.columns]
+    windows = [window for window, _, _ in EMA_STYLES]
+    values = calc_emas(df, windows)[-bars:]
+    index = df.index[-bars:]
+    emas = {window: pd.Series(values[:, j], index=index, name='Close') for j, window in enumerate(windows)}
+    return df[columns].tail(bars), emas
+
+
+def render_chart(plot_df, emas, filename=None, title=None):
+    """ローソク足チャートを描画する。
+
+    EMA (20, 50, 200) とボリンジャーバンドを重畳し、ダークモードで出力します。
+
+    Args:
+        plot_df (pd.DataFrame): 描画する OHLCV（`prepare_chart_data` の戻り値）。
+        emas (dict): 期間ごとの EMA（`prepare_chart_data` の戻り値）。
+        filename (str, optional): 保存先のパス。指定した場合は保存後に図を閉じます。
+        title (str, optional): チャートのタイトル。
+
+    Returns:
+        matplotlib.figure.Figure or None: filename を指定しない場合は描画した図
+            （不要になったら呼び出し側で plt.close してください）。保存した場合は None。
+    """
+    apds = []
+    for window, color, width in EMA_STYLES:
+        if not emas[window].isnull().all():
+            apds.append(mpf.make_addplot(emas[window], color=color, width=width))
+
+    # ボリンジャーバンドの計算
+    mb, ub, lb = calculate_bollinger_bands(plot_df, window=20, num_std=2)
+    if mb is not None and ub.isnull().all():
+        # バーが期間に満たない場合は描画しない
+        mb = None
+    if mb is not None:
+        apds.append(mpf.make_addplot(ub, color='gray', width=0.5, alpha=0.5))
+        apds.append(mpf.make_addplot(lb, color='gray', width=0.5, alpha=0.5))
+
+    fig, axlist = mpf.plot(plot_df, type='candle', style=_chart_style(), addplot=apds, title=title,
+                           ylabel='Price', volume=True if 'Volume' in plot_df.columns else False,
+                           tight_layout=True, scale_padding=1.5, figratio=(16, 9),
+                           datetime_format='%m/%d %H:%M', returnfig=True)
+
+    if len(axlist) > 0:
+        # ボリンジャーバンドの背景色塗り
+        if mb is not None:
+            axlist[0].fill_between(range(len(plot_df)), lb.values, ub.values, color='gray', alpha=0.1)
+
+        # 凡例
+        handles = [Line2D([0], [0], color=c, lw=1.5) for c in ['cyan', 'yellow', 'magenta', 'gray']]
+        labels = ['EMA 20', 'EMA 50', 'EMA 200', 'Bollinger Bands (2σ)']
+        axlist[0].legend(handles, labels, loc='upper left', fontsize='small', facecolor='black',
+                         edgecolor='white', labelcolor='white')
+
+    if filename is None:
+        return fig
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    try:
+        fig.savefig(filename, bbox_inches='tight', facecolor='black')
+    finally:
+        plt.close(fig)
+    return None
+
+
+def _init_worker():
+    """ワーカープロセスで GUI を使わない Agg バックエンドを使用する。"""
+    matplotlib.use('Agg', force=True)
+
+
+def _render_job(plot_df, emas, filename, title):
+    """ワーカープロセスでチャートを1枚描画して保存する。"""
+    render_chart(plot_df, emas, filename=filename, title=title)
+    return filename
+
+
+def render_charts(timeframes, out_dir, workers=None, cache=None, prefix="", filenames=None,
+                  titles=None):
+    """複数の時間足のチャートをまとめて描画し、PNG として保存する。
+
+    描画データ（直近のバーと EMA）の準備は呼び出し元のプロセスで行い、
+    描画と保存はプロセスプールで並列に実行します。
+
+    Args:
+        timeframes (dict): 時間足名をキー、DataFrame (または OHLCVStore) を値とする辞書。
+        out_dir (str): 保存先ディレクトリ。
+        workers (int, optional): ワーカープロセス数。None の場合は CPU 数（時間足の数まで）。
+            1 以下の場合はプロセスを起動せずに順番に描画します。
+        cache (IndicatorCache, optional): EMA 計算に使用するキャッシュ。
+        prefix (str): ファイル名の接頭辞（filenames を指定しない時間足に使用）。
+        filenames (dict, optional): 時間足名ごとのファイル名。
+            省略した時間足は "{prefix}chart_{時間足名の小文字}.png"。
+        titles (dict, optional): 時間足名ごとのチャートのタイトル。
+
+    Returns:
+        dict: 時間足名をキー、保存したファイルのパスを値とする辞書（timeframes の順）。
+            データがない時間足は含まれません。
+    """
+    filenames = filenames or {}
+    titles = titles or {}
+
+    jobs = []
+    for tf, df in timeframes.items():
+        if df is None or df.empty:
+            print(f"時間足 {tf} のデータがありません。")
+            continue
+        with stage('prepare'):
+            plot_df, emas = prepare_chart_data(df, cache=cache)
+        fname = os.path.join(out_dir, filenames.get(tf, f"{prefix}chart_{tf.lower()}.png"))
+        jobs.append((tf, plot_df, emas, fname, titles.get(tf, tf)))
+
+    if not jobs:
+        return {}
+    os.makedirs(out_dir, exist_ok=True)
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for _, plot_df, emas, fname, title in jobs:
+            with stage('render'):
+                _render_job(plot_df, emas, fname, title)
+    else:
+        # ワーカープロセス内の処理は計測できないため、並列描画全体を1つのステージとする
+        with stage('render_parallel'), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = [executor.submit(_render_job, plot_df, emas, fname, title)
+                       for _, plot_df, emas, fname, title in jobs]
+            for future in futures:
+                future.result()
+
+    return {tf: fname for tf, _, _, fname, _ in jobs}
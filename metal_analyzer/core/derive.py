@@ -0,0 +1,307 @@
+"""基準時間足から上位時間足を生成する（時間足の導出グラフ）モジュール。
+
+このモジュールは、1つの基準時間足のデータから上位時間足
+(15分足 → 1時間足 → 4時間足 → 日足 → 週足 / 月足) を初回参照時に集計し、
+結果を保持する TimeframeGraph を提供します。基準時間足の末尾にデータが追加された場合は、
+変更された行を含む足から後ろだけを集計し直します。
+MetalAnalyzer(base_timeframe=...) から利用されます。
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from .live import TIMEFRAME_CHAIN, canonical_timeframe, _MINUTE, _HOUR, _DAY
+
+# 各時間足を集計する元の時間足（月足は週をまたぐため日足から集計する）
+DERIVATION_PARENTS = {
+    '1h': '15m',
+    '4h': '1h',
+    'Daily': '4h',
+    'Weekly': 'Daily',
+    'Monthly': 'Daily',
+}
+
+# CME の貴金属先物 (GC=F など) の取引セッションの開始時刻（取引所の現地時刻）
+FUTURES_SESSION_START = '18:00'
+
+_INTRADAY_STEPS = {'15m': 15 * _MINUTE, '1h': _HOUR, '4h': 4 * _HOUR}
+_OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def session_offset(session_start=None):
+    """取引セッションの開始時刻を、足の区切りのずれ (ナノ秒) に変換する。
+
+    セッションの開始時刻を S とすると、ずれは (24時間 - S) です。時刻を offset だけ進めてから
+    0時で区切ることで、前日の S から当日の S までが当日の日足になります。
+
+    Args:
+        session_start (str or datetime.time or pd.Timedelta, optional): セッションの開始時刻
+            （例: "18:00"）。省略時は 0時 (ずれなし)。
+
+    Returns:
+        int: 区切りのずれ (ナノ秒)。
+
+    Raises:
+        ValueError: 24時間以上の時刻が指定された場合。
+
+    Examples:
+        >>> session_offset('18:00') // (60 * 60 * 10**9)
+        6
+    """
+    if session_start is None:
+        return 0
+    if isinstance(session_start, datetime.time):
+        session_start = datetime.timedelta(hours=session_start.hour, minutes=session_start.minute,
+                                           seconds=session_start.second)
+    elif isinstance(session_start, str) and session_start.count(':') == 1:
+        session_start += ':00'
+    start = pd.Timedelta(session_start).value
+    if not 0 <= start < _DAY:
+        raise ValueError(f"セッションの開始時刻は 0:00 以上 24:00 未満で指定してください: {session_start}")
+    return (_DAY - start) % _DAY
+
+
+def bucket_labels(timeframe, stamps, offset=0):
+    """各時刻が属する足の開始時刻をまとめて返す。
+
+    `metal_analyzer.core.live.bucket_start` を配列に適用した結果と同じです。
+
+    Args:
+        timeframe (str): 正規化された時間足名。
+        stamps (np.ndarray): エポックナノ秒 (int64) の配列。
+        offset (int): セッションの区切りのずれ (ナノ秒)。
+
+    Returns:
+        np.ndarray: 足の開始時刻 (エポックナノ秒) の int64 配列。
+    """
+    shifted = np.asarray(stamps, dtype=np.int64) + offset
+    if timeframe in _INTRADAY_STEPS:
+        return shifted - shifted % _INTRADAY_STEPS[timeframe] - offset
+    days = shifted // _DAY
+    if timeframe == 'Daily':
+        return days * _DAY
+    if timeframe == 'Weekly':
+        # 1970-01-01 は木曜日 (曜日番号 3)
+        return (days - (days + 3) % 7) * _DAY
+    if timeframe == 'Monthly':
+        months = days.astype('datetime64[D]').astype('datetime64[M]')
+        return months.astype('datetime64[ns]').view(np.int64)
+    raise ValueError(f"未対応の時間足です: {timeframe}")
+
+
+def _wall_ns(index):
+    """DatetimeIndex を現地時刻のエポックナノ秒 (int64) に変換する。"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return np.asarray(index, dtype='datetime64[ns]').view(np.int64)
+
+
+def _label_index(timeframe, index, wall, labels, starts):
+    """各足の開始時刻 (現地時刻) から、元データと同じタイムゾーンの DatetimeIndex を作成する。"""
+    label_index = pd.DatetimeIndex(labels[starts].view('datetime64[ns]'), name=index.name)
+    if index.tz is None:
+        return label_index
+    if timeframe in _INTRADAY_STEPS:
+        # 夏時間の切り替えで現地時刻が重複しないよう、足の最初の行の時刻から戻して求める
+        first = np.asarray(index[starts].tz_convert('UTC').tz_localize(None), dtype='datetime64[ns]').view(np.int64)
+        instants = first - (wall[starts] - labels[starts])
+        # 区切りの時刻が夏時間の開始で存在しない場合は、足の最初の行の時刻とする
+        shifted = pd.DatetimeIndex(instants.view('datetime64[ns]')).tz_localize('UTC').tz_convert(index.tz)
+        instants = np.where(_wall_ns(shifted) == labels[starts], instants, first)
+        return pd.DatetimeIndex(instants.view('datetime64[ns]'), name=index.name).tz_localize('UTC').tz_convert(index.tz)
+    return label_index.tz_localize(index.tz, ambiguous=np.zeros(len(starts), dtype=bool),
+                                   nonexistent='shift_forward')
+
+
+def aggregate_ohlcv(df, timeframe, offset=0):
+    """時系列順に並んだ OHLCV データを上位時間足に集計する。
+
+    `resample(...).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+    'Volume': 'sum'}).dropna()` と同じ結果を、行の並びのまま `reduceat` で求めます
+    （データのない足は作成しません）。価格列のデータ型は元データのまま保持します。
+    Open / Close は欠損値を読み飛ばさず、各足の最初・最後の行の値を使用します。
+
+    Args:
+        df (pd.DataFrame): 時系列順に並んだ OHLCV データ。
+        timeframe (str): 集計先の時間足（正規名）。
+        offset (int): セッションの区切りのずれ (ナノ秒)。`session_offset` を参照。
+
+    Returns:
+        tuple: (frame, starts)
+            frame (pd.DataFrame) は集計結果、starts (np.ndarray) は各足の最初の行の df 内の位置。
+    """
+    columns, index, starts = _aggregate_columns(df, timeframe, offset)
+    return pd.DataFrame(columns, index=index, copy=False), starts
+
+
+def _aggregate_columns(df, timeframe, offset):
+    """`aggregate_ohlcv` の集計結果を (列の辞書, インデックス, 各足の開始位置) で返す。"""
+    wall = _wall_ns(df.index)
+    labels = bucket_labels(timeframe, wall, offset)
+    if len(labels):
+        starts = np.concatenate(([0], np.flatnonzero(labels[1:] != labels[:-1]) + 1))
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+    ends = np.append(starts[1:], len(labels)) - 1
+
+    columns = {}
+    for col in _OHLCV:
+        if col not in df.columns:
+            continue
+        values = df[col].to_numpy()
+        if not len(starts):
+            columns[col] = values
+        elif col == 'Open':
+            columns[col] = values[starts]
+        elif col == 'High':
+            columns[col] = np.fmax.reduceat(values, starts)
+        elif col == 'Low':
+            columns[col] = np.fmin.reduceat(values, starts)
+        elif col == 'Close':
+            columns[col] = values[ends]
+        else:
+            columns[col] = np.add.reduceat(np.nan_to_num(values), starts)
+    return columns, _label_index(timeframe, df.index, wall, labels, starts), starts
+
+
+class _DerivedFrame:
+    """導出した時間足のデータと、再集計が必要な位置を保持する。"""
+
+    __slots__ = ('frame', 'starts', 'dirty_from')
+
+    def __init__(self):
+        self.frame = None
+        self.starts = None
+        self.dirty_from = 0
+
+
+class TimeframeGraph:
+    """基準時間足から上位時間足を遅延生成し、結果を保持するクラス。
+
+    各時間足は DERIVATION_PARENTS の1つ下の時間足から集計します
+    （例: 15分足が基準の場合、週足は 15分足 → 1時間足 → 4時間足 → 日足 → 週足 の順に集計）。
+    集計は `get` で初めて参照された時点で行い、基準時間足が変わるまで結果を再利用します。
+    `set_base` に変更位置を渡すと、変更された行を含む足から後ろだけを集計し直します。
+
+    足の区切りは基準時間足のインデックスの現地時刻で判定します。タイムゾーン付きの
+    インデックスの場合、夏時間の切り替えをまたいでも現地時刻の区切りを保ちます。
+    session_start を指定した場合、日足は前日の開始時刻から当日の開始時刻まで、
+    週足は日曜夜に始まるセッションを含む月曜日始まりの週になります
+    （日中足は開始時刻から 4時間ごとなどに区切ります）。
+
+    Attributes:
+        base (str): 基準時間足（正規名）。
+        offset (int): セッションの区切りのずれ (ナノ秒)。
+        timeframes (tuple): 基準時間足から生成できる時間足（細かい順）。
+
+    Examples:
+        >>> graph = TimeframeGraph('1h', session_start=FUTURES_SESSION_START)
+        >>> graph.set_base(h1_df)
+        >>> weekly = graph.get('Weekly')
+    """
+
+    def __init__(self, base, session_start=None):
+        """TimeframeGraph を初期化する。
+
+        Args:
+            base (str): 基準時間足（例: "15m", "1h", "Daily"）。
+            session_start (str or datetime.time, optional): 取引セッションの開始時刻
+                （例: FUTURES_SESSION_START）。省略時は 0時区切り。
+
+        Raises:
+            ValueError: 未対応の時間足、または不正な開始時刻が指定された場合。
+        """
+        tf = canonical_timeframe(base)
+        if tf is None:
+            raise ValueError(f"未対応の時間足です: {base}")
+        self.base = tf
+        self.offset = session_offset(session_start)
+        self._frame = None
+
+        derivable = {tf}
+        for name in TIMEFRAME_CHAIN:
+            if DERIVATION_PARENTS.get(name) in derivable:
+                derivable.add(name)
+        self.timeframes = tuple(name for name in TIMEFRAME_CHAIN if name in derivable and name != tf)
+        self._nodes = {name: _DerivedFrame() for name in self.timeframes}
+        self._children = {name: [c for c in self.timeframes if DERIVATION_PARENTS[c] == name]
+                          for name in (tf,) + self.timeframes}
+
+    def can_derive(self, timeframe):
+        """基準時間足から生成できる時間足か判定する。
+
+        Args:
+            timeframe (str): 時間足の名称（別名も可）。
+
+        Returns:
+            bool: 生成できる場合は True。
+        """
+        return canonical_timeframe(timeframe) in self._nodes
+
+    def set_base(self, df, changed_from=0):
+        """基準時間足のデータを設定する。
+
+        Args:
+            df (pd.DataFrame or None): 基準時間足の OHLCV データ。
+            changed_from (int): 前回のデータから変更された最初の行の位置。
+                それより前の行が前回と同じ場合に指定すると、変更された行を含む足から後ろだけを
+                集計し直します。0 の場合は全体を集計し直します。
+        """
+        if df is not None and not df.index.is_monotonic_increasing:
+            df, changed_from = df.sort_index(kind='stable'), 0
+        self._frame = df
+        self._mark_dirty(self.base, changed_from)
+
+    def _mark_dirty(self, timeframe, position):
+        """timeframe の position 行目以降の変更を、直接集計している時間足に伝える。"""
+        for child in self._children[timeframe]:
+            node = self._nodes[child]
+            node.dirty_from = position if node.dirty_from is None else min(node.dirty_from, position)
+
+    def get(self, timeframe):
+        """基準時間足から生成した時間足のデータを返す。
+
+        Args:
+            timeframe (str): 時間足の名称（別名も可）。
+
+        Returns:
+            pd.DataFrame or None: 集計結果。基準時間足のデータがない場合は None。
+
+        Raises:
+            ValueError: 基準時間足から生成できない時間足が指定された場合。
+        """
+        tf = canonical_timeframe(timeframe)
+        if tf not in self._nodes:
+            raise ValueError(f"{self.base} から生成できない時間足です: {timeframe}")
+        return self._build(tf)
+
+    def _build(self, timeframe):
+        """必要な場合だけ集計し直して、時間足のデータを返す。"""
+        node = self._nodes[timeframe]
+        parent_tf = DERIVATION_PARENTS[timeframe]
+        parent = self._frame if parent_tf == self.base else self._build(parent_tf)
+        if node.dirty_from is None:
+            return node.frame
+        if parent is None:
+            node.frame, node.starts, node.dirty_from = None, None, None
+            return None
+
+        # 変更された行を含む足の先頭から後ろだけを集計し直す
+        keep = 0
+        if node.frame is not None and node.dirty_from > 0 and len(node.starts):
+            keep = max(int(np.searchsorted(node.starts, node.dirty_from, side='right')) - 1, 0)
+        start = int(node.starts[keep]) if keep else 0
+
+        columns, index, starts = _aggregate_columns(parent.iloc[start:], timeframe, self.offset)
+        if keep:
+            # pd.concat を使わず、変更のない足の配列と再集計した足の配列を連結する
+            columns = {col: np.concatenate([node.frame[col].to_numpy()[:keep], values])
+                       for col, values in columns.items()}
+            index = node.frame.index[:keep].append(index)
+            starts = np.concatenate([node.starts[:keep], starts + start])
+        frame = pd.DataFrame(columns, index=index, copy=False)
+        node.frame, node.starts, node.dirty_from = frame, starts, None
+        self._mark_dirty(timeframe, keep)
+        return frame
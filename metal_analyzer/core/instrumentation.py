@@ -0,0 +1,281 @@
+"""処理時間・呼び出し回数・メモリ使用量を計測する計装（インストルメンテーション）機能を提供するモジュール。
+
+MetalAnalyzer やモデル関数の主要な処理（データ取得、再集計、インジケーター計算、
+パターン検知、チャート描画など）は `stage` で区切られており、
+フック (`add_hook`) または `profile` が有効な間だけ計測結果が通知されます。
+どちらも登録されていない間は、`stage` は何もしない共有のコンテキストマネージャーを返し、
+計測のための処理は一切行いません。
+
+Examples:
+    >>> with profile(memory=True) as prof:
+    ...     analyzer.analyze_all()
+    >>> print(prof.report())
+"""
+
+import contextlib
+import functools
+import threading
+import time
+import tracemalloc
+
+# 登録されているフック（profile も内部的にフックとして登録される）
+_hooks = ()
+_lock = threading.Lock()
+# ステージの入れ子（スレッドごと）
+_local = threading.local()
+
+
+class _NullStage:
+    """計測が無効なときに `stage` が返す、何もしないコンテキストマネージャー。"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """ステージの処理時間とメモリの増加量を計測するコンテキストマネージャー。"""
+
+    __slots__ = ('name', 'path', '_start', '_memory')
+
+    def __init__(self, name):
+        self.name = name
+        self.path = None
+        self._start = None
+        self._memory = None
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.name)
+        self.path = '/'.join(stack)
+        self._memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        allocated = None
+        if self._memory is not None and tracemalloc.is_tracing():
+            allocated = tracemalloc.get_traced_memory()[0] - self._memory
+        _local.stack.pop()
+        _emit({'type': 'stage', 'name': self.name, 'path': self.path, 'elapsed': elapsed,
+               'bytes': allocated, 'error': exc_type is not None})
+        return False
+
+
+def _emit(event):
+    """登録されている全てのフックにイベントを通知する。"""
+    for hook in _hooks:
+        hook(event)
+
+
+def enabled():
+    """計測が有効（フックまたは profile が登録されている）かを返す。"""
+    return bool(_hooks)
+
+
+def add_hook(callback):
+    """計測イベントを受け取るフックを登録する。
+
+    フックは、ステージの終了時に
+    {'type': 'stage', 'name', 'path', 'elapsed', 'bytes', 'error'}、
+    カウンターの加算時に {'type': 'count', 'name', 'value'} の辞書を引数に呼び出されます。
+    path は入れ子になったステージ名を '/' で連結したもの、bytes は tracemalloc が
+    有効な場合のステージ中のメモリ増加量（バイト、無効な場合は None）です。
+    フックは計測対象と同じスレッドで呼び出されます。
+
+    Args:
+        callback (callable): イベントの辞書を受け取る関数。
+    """
+    global _hooks
+    with _lock:
+        _hooks = _hooks + (callback,)
+
+
+def remove_hook(callback):
+    """登録したフックを解除する。
+
+    Args:
+        callback (callable): `add_hook` で登録した関数。
+    """
+    global _hooks
+    with _lock:
+        hooks = list(_hooks)
+        if callback in hooks:
+            hooks.remove(callback)
+        _hooks = tuple(hooks)
+
+
+def stage(name):
+    """処理の区間（ステージ）を計測するコンテキストマネージャーを返す。
+
+    Args:
+        name (str): ステージ名（例: "patterns", "render"）。
+
+    Returns:
+        コンテキストマネージャー。計測が無効な場合は何もしない共有オブジェクトです。
+    """
+    if not _hooks:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def count(name, value=1):
+    """カウンターを加算する（計測が無効な場合は何もしない）。
+
+    Args:
+        name (str): カウンター名（例: "cache.hits"）。
+        value (int): 加算する値。
+    """
+    if _hooks:
+        _emit({'type': 'count', 'name': name, 'value': value})
+
+
+def instrumented(name):
+    """関数の呼び出し全体を1つのステージとして計測するデコレーター。
+
+    Args:
+        name (str): ステージ名。
+
+    Returns:
+        callable: デコレーター。計測が無効な場合は元の関数をそのまま呼び出します。
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class Profile:
+    """`profile` で収集した計測結果。
+
+    Attributes:
+        stages (dict): ステージのパスをキーとする集計結果。各値は
+            calls（呼び出し回数）, total / min / max（秒）, bytes（メモリ増加量の合計、
+            計測していない場合は None）, errors（例外で終了した回数）を持つ辞書。
+        counters (dict): カウンター名をキーとする合計値。
+        elapsed (float or None): profile ブロック全体の経過時間（秒）。
+        memory (bool): メモリ使用量を計測したか。
+        peak_bytes (int or None): profile ブロック中の tracemalloc のピークメモリ（バイト）。
+    """
+
+    def __init__(self, memory=False):
+        self.stages = {}
+        self.counters = {}
+        self.elapsed = None
+        self.memory = memory
+        self.peak_bytes = None
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            if event['type'] == 'count':
+                self.counters[event['name']] = self.counters.get(event['name'], 0) + event['value']
+                return
+            entry = self.stages.get(event['path'])
+            if entry is None:
+                entry = self.stages[event['path']] = {
+                    'calls': 0, 'total': 0.0, 'min': float('inf'), 'max': 0.0,
+                    'bytes': None, 'errors': 0}
+            elapsed = event['elapsed']
+            entry['calls'] += 1
+            entry['total'] += elapsed
+            entry['min'] = min(entry['min'], elapsed)
+            entry['max'] = max(entry['max'], elapsed)
+            entry['errors'] += int(event['error'])
+            if event['bytes'] is not None:
+                entry['bytes'] = (entry['bytes'] or 0) + event['bytes']
+
+    def by_name(self):
+        """入れ子の位置に関係なく、ステージ名ごとに集計した呼び出し回数と合計時間を返す。
+
+        Returns:
+            dict: ステージ名をキー、{'calls', 'total'} を値とする辞書。
+        """
+        totals = {}
+        for path, entry in self.stages.items():
+            item = totals.setdefault(path.rsplit('/', 1)[-1], {'calls': 0, 'total': 0.0})
+            item['calls'] += entry['calls']
+            item['total'] += entry['total']
+        return totals
+
+    def to_dict(self):
+        """計測結果を JSON に変換できる辞書で返す。
+
+        Returns:
+            dict: 'elapsed', 'peak_bytes', 'stages'（各ステージに mean を追加）, 'counters' を持つ辞書。
+        """
+        stages = {}
+        for path, entry in sorted(self.stages.items()):
+            stages[path] = dict(entry, mean=entry['total'] / entry['calls'])
+        return {'elapsed': self.elapsed, 'peak_bytes': self.peak_bytes, 'stages': stages,
+                'counters': dict(self.counters)}
+
+    def report(self):
+        """計測結果を表形式の文字列で返す。
+
+        Returns:
+            str: ステージごとの呼び出し回数・合計時間・平均時間・メモリ増加量と、カウンターの一覧。
+        """
+        lines = [f"{'stage':<48} {'calls':>7} {'total ms':>10} {'mean ms':>10} {'KiB':>10}"]
+        for path, entry in sorted(self.stages.items()):
+            depth = path.count('/')
+            label = '  ' * depth + path.rsplit('/', 1)[-1]
+            kib = f"{entry['bytes'] / 1024:10.1f}" if entry['bytes'] is not None else f"{'-':>10}"
+            lines.append(f"{label:<48} {entry['calls']:>7} {entry['total'] * 1e3:>10.2f} "
+                         f"{entry['total'] / entry['calls'] * 1e3:>10.3f} {kib}")
+        if self.elapsed is not None:
+            lines.append(f"{'(total)':<48} {'':>7} {self.elapsed * 1e3:>10.2f}")
+        if self.peak_bytes is not None:
+            lines.append(f"peak memory: {self.peak_bytes / 1024:.1f} KiB")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(memory=False):
+    """ブロック内の計測結果を収集するコンテキストマネージャー。
+
+    Args:
+        memory (bool): tracemalloc でステージごとのメモリ増加量を計測するか。
+            計測中は処理が大幅に遅くなります。
+
+    Yields:
+        Profile: 計測結果。ブロックを抜けた時点で elapsed と peak_bytes が設定されます。
+
+    Examples:
+        >>> with profile() as prof:
+        ...     analyze_short_trend(d_df, h4_df, h1_df)
+        >>> prof.to_dict()['stages']
+    """
+    result = Profile(memory=memory)
+    started_tracing = False
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    add_hook(result)
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.elapsed = time.perf_counter() - start
+        remove_hook(result)
+        if memory and tracemalloc.is_tracing():
+            result.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
@@ -0,0 +1,435 @@
+"""ライブデータ（逐次追加されるバー・ティック）を扱うモジュール。
+
+このモジュールは、基準時間足のバーを上位時間足（4時間足・日足・週足・月足）へ
+逐次ロールアップする集計器と、短期トレンド分析に必要な指標を
+バーごとに O(1) で更新する状態クラスを提供します。
+MetalAnalyzer.ingest_bar / ingest_tick から利用されます。
+"""
+
+from collections import deque
+
+import numpy as np
+
+from ..indicators.online import OnlineEMA, OnlineRSI
+from ..patterns.incremental import DoubleTopDetector, DoubleBottomDetector
+from .store import OHLCVStore
+
+_MINUTE = 60 * 10**9
+_HOUR = 60 * _MINUTE
+_DAY = 24 * _HOUR
+
+# 細かい順に並べた時間足と、その別名
+TIMEFRAME_CHAIN = ('15m', '1h', '4h', 'Daily', 'Weekly', 'Monthly')
+TIMEFRAME_ALIASES = {
+    '15m': ('15m', '15M', '15min'),
+    '1h': ('1h', '1H', 'hourly'),
+    '4h': ('4h', '4H', '4hourly'),
+    'Daily': ('Daily', '1d', '1D', 'daily'),
+    'Weekly': ('Weekly', '1wk', 'weekly'),
+    'Monthly': ('Monthly', '1mo', 'monthly'),
+}
+
+_OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def canonical_timeframe(timeframe):
+    """時間足の名称を TIMEFRAME_CHAIN の正規名に変換する。
+
+    Args:
+        timeframe (str): 時間足の名称（例: "1H", "1d"）。
+
+    Returns:
+        str or None: 正規名。対応しない名称の場合は None。
+    """
+    for name, aliases in TIMEFRAME_ALIASES.items():
+        if timeframe in aliases:
+            return name
+    return None
+
+
+def bucket_start(timeframe, ts_ns, offset=0):
+    """タイムスタンプ (エポックナノ秒) が属する足の開始時刻を返す。
+
+    週足は月曜日始まり、月足は各月1日始まりとします。
+    offset を指定すると、時刻を offset だけ進めた時点で区切ります（取引セッションの開始時刻で
+    区切る場合。`metal_analyzer.core.derive.session_offset` を参照）。日中足は区切りの時刻、
+    日足・週足・月足はセッションの属する日付（0時）を返します。
+
+    Args:
+        timeframe (str): 正規化された時間足名。
+        ts_ns (int): エポックからのナノ秒。
+        offset (int): セッションの区切りのずれ (ナノ秒)。デフォルトは0（0時区切り）。
+
+    Returns:
+        int: 足の開始時刻 (エポックナノ秒)。
+    """
+    ts = ts_ns + offset
+    if timeframe == '15m':
+        return ts - ts % (15 * _MINUTE) - offset
+    if timeframe == '1h':
+        return ts - ts % _HOUR - offset
+    if timeframe == '4h':
+        return ts - ts % (4 * _HOUR) - offset
+    if timeframe == 'Daily':
+        return ts - ts % _DAY
+    if timeframe == 'Weekly':
+        # 1970-01-01 は木曜日 (曜日番号 3)
+        day = ts // _DAY
+        return (day - (day + 3) % 7) * _DAY
+    if timeframe == 'Monthly':
+        month = np.datetime64(ts, 'ns').astype('datetime64[M]')
+        return int(month.astype('datetime64[ns]').astype(np.int64))
+    raise ValueError(f"未対応の時間足です: {timeframe}")
+
+
+def _merge(agg, bar):
+    """2つの OHLCV タプルを時系列順に結合する。"""
+    if agg is None:
+        return bar
+    if bar is None:
+        return agg
+    return (agg[0], max(agg[1], bar[1]), min(agg[2], bar[2]), bar[3], agg[4] + bar[4])
+
+
+class BarAggregator:
+    """基準時間足のバーを1つの上位時間足へ逐次集計するクラス。
+
+    確定済みの基準バーの集計値と、形成途中（更新され得る）の基準バーを
+    分けて保持するため、同じ時刻のバーが再送された場合も二重計上しません。
+
+    Attributes:
+        timeframe (str): 集計先の時間足（正規名）。
+        offset (int): セッションの区切りのずれ (ナノ秒)。
+        bucket (int or None): 形成中の足の開始時刻 (エポックナノ秒)。
+    """
+
+    def __init__(self, timeframe, offset=0):
+        """BarAggregator を初期化する。
+
+        Args:
+            timeframe (str): 集計先の時間足（正規名）。
+            offset (int): セッションの区切りのずれ (ナノ秒)。`bucket_start` を参照。
+        """
+        self.timeframe = timeframe
+        self.offset = offset
+        self.bucket = None
+        self._closed = None
+        self._current = None
+        self._current_ts = None
+
+    def seed(self, ts_ns, bar, revisable=False):
+        """既存データの最終バーを形成中の足として引き継ぐ。
+
+        Args:
+            ts_ns (int): 最終バーの時刻。
+            bar (tuple): (Open, High, Low, Close, Volume)。
+            revisable (bool): 最終バー自体を同時刻のバーで置き換え可能にするか。
+        """
+        self.bucket = bucket_start(self.timeframe, ts_ns, self.offset)
+        if revisable:
+            self._closed, self._current, self._current_ts = None, bar, ts_ns
+        else:
+            self._closed, self._current, self._current_ts = bar, None, None
+
+    def update(self, ts_ns, bar):
+        """基準時間足のバーを追加する。
+
+        Args:
+            ts_ns (int): 基準バーの時刻 (エポックナノ秒)。
+            bar (tuple): (Open, High, Low, Close, Volume)。
+
+        Returns:
+            tuple or None: 足が確定した場合は (開始時刻, Open, High, Low, Close, Volume)。
+        """
+        if self._current_ts is not None and ts_ns < self._current_ts:
+            raise ValueError("過去のバーは追加できません。")
+
+        bucket = bucket_start(self.timeframe, ts_ns, self.offset)
+        completed = None
+        if self.bucket is not None and bucket != self.bucket:
+            completed = (self.bucket,) + _merge(self._closed, self._current)
+            self._closed = None
+        elif ts_ns != self._current_ts:
+            self._closed = _merge(self._closed, self._current)
+
+        self.bucket = bucket
+        self._current = bar
+        self._current_ts = ts_ns
+        return completed
+
+    def current(self):
+        """形成中の足を (開始時刻, Open, High, Low, Close, Volume) で返す。"""
+        if self.bucket is None:
+            return None
+        return (self.bucket,) + _merge(self._closed, self._current)
+
+
+class ShortTrendState:
+    """短期トレンド分析の特徴量を1時間足ごとに逐次更新する状態クラス。
+
+    確定した1時間足を `commit` で取り込み、形成中の1時間足を `features` に渡すと、
+    `build_short_trend_features` の最終行と同じ特徴量を再計算なしで返します。
+    4時間足は1時間足の時刻から `resample('4h')` と同じ区切り（offset を指定した場合は
+    セッションの開始時刻からの区切り）で集計します。
+    ダブルトップ/ボトムは DoubleTopDetector / DoubleBottomDetector で逐次判定します
+    （確定バーは取り込むだけで、判定は参照時に行います）。
+    """
+
+    def __init__(self, pattern_lookback=100, offset=0):
+        """ShortTrendState を初期化する。
+
+        Args:
+            pattern_lookback (int): パターン検知の対象とする直近のバー数。
+            offset (int): 4時間足の区切りのずれ (ナノ秒)。`bucket_start` を参照。
+        """
+        self.offset = offset
+        self.h1_ema20 = OnlineEMA(20)
+        self.h1_ema200 = OnlineEMA(200)
+        self.h1_rsi = OnlineRSI(14)
+        self.h4_emas = {span: OnlineEMA(span) for span in (20, 50, 200)}
+        self._h4_bucket = None
+        self._h4_close = None
+
+        self._ranges = deque(maxlen=19)
+        self._lows = deque(maxlen=49)
+        self._highs = deque(maxlen=49)
+        self._div_lows = deque(maxlen=14)
+        self._div_rsi = deque(maxlen=14)
+        self.double_top = DoubleTopDetector(lookback=pattern_lookback)
+        self.double_bottom = DoubleBottomDetector(lookback=pattern_lookback)
+        self.count = 0
+
+    def commit(self, ts_ns, bar):
+        """確定した1時間足を取り込む。
+
+        Args:
+            ts_ns (int): 1時間足の時刻 (エポックナノ秒)。
+            bar (tuple): (Open, High, Low, Close, Volume)。
+        """
+        _, high, low, close, _ = bar
+        bucket = bucket_start('4h', ts_ns, self.offset)
+        if self._h4_bucket is not None and bucket != self._h4_bucket:
+            for ema in self.h4_emas.values():
+                ema.update(self._h4_close)
+        self._h4_bucket = bucket
+        self._h4_close = close
+
+        self.h1_ema20.update(close)
+        self.h1_ema200.update(close)
+        rsi = self.h1_rsi.update(close)
+
+        self._ranges.append(high - low)
+        self._lows.append(low)
+        self._highs.append(high)
+        self._div_lows.append(low)
+        self._div_rsi.append(rsi)
+        self.double_top.append(close)
+        self.double_bottom.append(close)
+        self.count += 1
+
+    def _h4_ema_asof(self, span, ts_ns, close):
+        """形成中の4時間足を含めた時点のEMAを返す。"""
+        ema = self.h4_emas[span]
+        prev = ema.value
+        if self._h4_bucket is not None and bucket_start('4h', ts_ns, self.offset) != self._h4_bucket:
+            # 直前の4時間足が確定したものとして1ステップ進める
+            prev = ema.peek(self._h4_close)
+        return OnlineEMA.step(prev, close, ema.alpha)
+
+    def features(self, ts_ns, bar):
+        """形成中の1時間足を含めた時点の特徴量を返す。
+
+        Args:
+            ts_ns (int): 形成中の1時間足の時刻 (エポックナノ秒)。
+            bar (tuple): (Open, High, Low, Close, Volume)。
+
+        Returns:
+            dict: `evaluate_short_trend` に渡せる特徴量。
+        """
+        open_, high, low, close, _ = bar
+        rsi = self.h1_rsi.peek(close)
+
+        ranges = list(self._ranges) + [high - low]
+        recent = ranges[-3:]
+
+        # 直近15本の最安値（同値の場合は最初のバー）
+        lows = list(self._div_lows) + [low]
+        rsis = list(self._div_rsi) + [rsi]
+        low_pos = min(range(len(lows)), key=lows.__getitem__)
+        is_bullish_divergence = bool(close <= lows[low_pos] and rsi > rsis[low_pos] + 3.0)
+
+        body_size = abs(close - open_)
+        lower_shadow = min(close, open_) - low
+
+        return {
+            'h4_close': close,
+            'h4_ema20': self._h4_ema_asof(20, ts_ns, close),
+            'h4_ema50': self._h4_ema_asof(50, ts_ns, close),
+            'h4_ema200': self._h4_ema_asof(200, ts_ns, close),
+            'h1_close': close,
+            'h1_ema20': self.h1_ema20.peek(close),
+            'h1_ema200': self.h1_ema200.peek(close),
+            'h1_rsi': rsi,
+            'recent_range': sum(recent) / len(recent),
+            'avg_range': sum(ranges) / len(ranges),
+            'h1_low_50': min(min(self._lows, default=low), low),
+            'h1_high_50': max(max(self._highs, default=high), high),
+            'is_pinbar': (lower_shadow > body_size * 2.0) and (lower_shadow > 0),
+            'is_bullish_divergence': is_bullish_divergence,
+        }
+
+
+class LiveFeed:
+    """基準時間足のバーを受け取り、上位時間足と短期トレンド状態を逐次更新するクラス。
+
+    集計結果はすぐにはデータフレームへ反映せず、`flush` が呼ばれた時点で
+    確定済みのバーと形成中のバーをまとめて末尾に追加します。
+    時間足ごとのバーは OHLCVStore に保持して末尾だけを書き換えるため、`flush` は
+    既存データをコピーせず、配列を共有するデータフレームを返します（償却 O(追加本数)）。
+    そのため、以前の `flush` で返したデータフレームの最終行（形成中だったバー）は、
+    次の `flush` で新しい値に書き換わることがあります。
+    既存データのない上位時間足は、より細かい時間足の既存データを集計したものを起点にするため、
+    ライブデータの数本だけからなるデータフレームは作成しません。
+
+    Attributes:
+        base (str): 基準時間足（正規名）。
+        levels (list): 基準時間足を含む、集計対象の時間足。
+        short_state (ShortTrendState or None): 1時間足が集計対象の場合の短期トレンド状態。
+    """
+
+    def __init__(self, base, frames, offset=0):
+        """LiveFeed を初期化し、既存データの最終バーから状態を引き継ぐ。
+
+        Args:
+            base (str): 基準時間足（正規名）。
+            frames (dict): 時間足名をキーとする既存のデータフレーム。
+            offset (int): セッションの区切りのずれ (ナノ秒)。`bucket_start` を参照。
+        """
+        self.base = base
+        self.levels = list(TIMEFRAME_CHAIN[TIMEFRAME_CHAIN.index(base):])
+        self.aggregators = {tf: BarAggregator(tf, offset) for tf in self.levels}
+        self.keys = {}
+        self._pending = {tf: [] for tf in self.levels}
+        self._has_partial = {}
+        self._dirty = set()
+        self.short_state = ShortTrendState(offset=offset) if '1h' in self.levels else None
+        # 既存データがなく、細かい時間足から集計した時間足（最初の flush で起点にする）
+        self._filled = {}
+        # 時間足ごとのバーのストアと、最後の flush で返したデータフレーム
+        self._stores = {}
+        self._flushed = {}
+        sources = {}
+
+        for tf in self.levels:
+            key = next((k for k in TIMEFRAME_ALIASES[tf] if k in frames), tf)
+            self.keys[tf] = key
+            df = frames.get(key)
+            if df is None or df.empty:
+                df = self._fill(tf, sources, offset)
+            if df is not None and not df.empty:
+                sources[tf] = df
+            self._has_partial[tf] = df is not None and not df.empty
+            if not self._has_partial[tf]:
+                continue
+            last = df.iloc[-1]
+            bar = tuple(float(last.get(col, 0.0)) for col in _OHLCV)
+            self.aggregators[tf].seed(df.index[-1].value, bar, revisable=(tf == base))
+
+        h1 = sources.get('1h')
+        if self.short_state is not None and h1 is not None and len(h1) > 1:
+            values = h1[_OHLCV[:4]].to_numpy(dtype=float)
+            stamps = np.asarray(h1.index, dtype='datetime64[ns]').view(np.int64)
+            for i in range(len(h1) - 1):
+                self.short_state.commit(int(stamps[i]), tuple(values[i]) + (0.0,))
+
+    def _fill(self, timeframe, sources, offset):
+        """既存データのない時間足を、最も近い細かい時間足の既存データから集計する。
+
+        基準時間足のデータもない場合は、全ての時間足がライブデータだけから作られるため集計しません。
+        """
+        # 循環インポートを避けるため、ここでインポートする
+        from .derive import aggregate_ohlcv
+
+        finer = self.levels[:self.levels.index(timeframe)]
+        for tf in reversed(finer):
+            # 週は月をまたぐため、月足は週足から集計しない
+            if tf in sources and not (timeframe == 'Monthly' and tf == 'Weekly'):
+                df = aggregate_ohlcv(sources[tf], timeframe, offset)[0]
+                self._filled[timeframe] = df
+                return df
+        return None
+
+    def _start_store(self, timeframe, df):
+        """既存データ（形成中の最終バーを除く）から時間足のストアを作成する。
+
+        既存データの配列を共有したまま書き換えないよう、最初の `append` で
+        新しい配列が確保される長さ（形成中のバーを除いた本数）で作成します。
+        """
+        filled = self._filled.pop(timeframe, None)
+        if df is None:
+            df = filled
+        if df is None or df.empty:
+            store = OHLCVStore(np.empty(0, dtype=np.int64), [], [], [], [])
+        else:
+            base = df.iloc[:-1] if self._has_partial[timeframe] else df
+            store = OHLCVStore.from_frame(base, dtype=df['Close'].dtype)
+        self._stores[timeframe] = store
+        return store
+
+    def push(self, ts_ns, bar):
+        """基準時間足のバーを追加し、全ての上位時間足を更新する。
+
+        Args:
+            ts_ns (int): バーの時刻 (エポックナノ秒)。
+            bar (tuple): (Open, High, Low, Close, Volume)。
+        """
+        for tf in self.levels:
+            completed = self.aggregators[tf].update(ts_ns, bar)
+            if completed is not None:
+                self._pending[tf].append(completed)
+                if tf == '1h' and self.short_state is not None:
+                    self.short_state.commit(completed[0], completed[1:])
+            self._dirty.add(tf)
+
+    def current(self, timeframe):
+        """形成中の足を返す。"""
+        return self.aggregators[timeframe].current()
+
+    def flush(self, frames):
+        """未反映のバーをデータフレームに追加する。
+
+        Args:
+            frames (dict): 時間足名をキーとするデータフレーム（更新されます）。
+
+        Returns:
+            list: 更新された (キー, データフレーム, 変更位置) のリスト。変更位置は
+                既存データのうち置き換え・追加が始まる行の位置です。
+                データフレームは OHLCV の列だけを持ちます。
+        """
+        updated = []
+        for tf in self.levels:
+            if tf not in self._dirty:
+                continue
+            rows = self._pending[tf] + [self.aggregators[tf].current()]
+
+            key = self.keys[tf]
+            df = frames.get(key)
+            store = self._stores.get(tf)
+            if store is None or df is not self._flushed.get(tf):
+                store = self._start_store(tf, df)
+            elif self._has_partial[tf]:
+                # 形成中だった最終バーは、集計器の最新の値で置き換える
+                store.truncate(len(store) - 1)
+            changed_from = len(store)
+
+            values = np.array([r[1:] for r in rows], dtype=np.float64)
+            store.append(OHLCVStore(np.array([r[0] for r in rows], dtype=np.int64), values[:, 0], values[:, 1],
+                                    values[:, 2], values[:, 3], values[:, 4], dtype=store.dtype))
+            frame = store.to_frame()
+            self._flushed[tf] = frame
+            updated.append((key, frame, changed_from))
+
+            self._pending[tf] = []
+            self._has_partial[tf] = True
+        self._dirty.clear()
+        return updated
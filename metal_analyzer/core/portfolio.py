@@ -0,0 +1,136 @@
+"""複数銘柄の分析を並列に実行する機能を提供するモジュール。
+
+このモジュールは、複数のティッカーについて短期・中期トレンド分析と
+チャートパターン検知をプロセスプールで並列に実行する PortfolioAnalyzer を提供します。
+各ワーカープロセスは取得元 (DataSource) から自分でデータを読み込むため、
+プロセス間でデータフレームを受け渡す（pickle する）ことはありません。
+取得元に ArchiveSource を使用すると、各プロセスは同じアーカイブファイルを
+メモリマップで読み取り専用に共有します。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ..backtest.walk_forward import resample_4h
+from ..indicators.dtypes import resolve_dtype
+from ..models.middle_trend_predictor import analyze_middle_trend
+from ..data import YFinanceSource
+from .analyzer import MetalAnalyzer
+
+# 各時間足の取得期間 (send_gold_trend.py と同じ)
+DEFAULT_PERIODS = {
+    '1d': '2y',
+    '1h': '2mo',
+    '1wk': '5y',
+}
+
+
+def _analyze_ticker(ticker, source, periods, dtype=np.float64):
+    """1銘柄の分析を実行する（ワーカープロセスで実行される）。
+
+    Args:
+        ticker (str): ティッカーシンボル。
+        source (DataSource): データの取得元。
+        periods (dict): 時間足 ('1d', '1h', '1wk') ごとの取得期間。
+        dtype (np.dtype): 価格データとインジケーターのデータ型。
+
+    Returns:
+        dict: 結果テーブルの1行分。失敗した場合は 'error' に理由が入ります。
+    """
+    row = {'ticker': ticker, 'as_of': pd.NaT, 'close': float('nan'), 'error': None}
+    try:
+        d_df = source.fetch(ticker, '1d', period=periods['1d'])
+        h1_df = source.fetch(ticker, '1h', period=periods['1h'])
+        w_df = source.fetch(ticker, '1wk', period=periods['1wk'])
+        if d_df.empty or h1_df.empty:
+            row['error'] = "データがありません。"
+            return row
+        h4_df = resample_4h(h1_df)
+
+        analyzer = MetalAnalyzer(ticker=ticker, dtype=dtype)
+        analyzer.add_timeframe_data('Daily', d_df)
+        analyzer.add_timeframe_data('4h', h4_df)
+        analyzer.add_timeframe_data('1h', h1_df)
+        analyzer.add_timeframe_data('Weekly', w_df)
+        cache = analyzer.indicator_cache
+        frames = analyzer.timeframe_data
+
+        short = analyzer.analyze_short_trend(verbose=False)
+        # キャッシュと dtype を適用するため、MetalAnalyzer が保持するデータフレームで分析する
+        middle = analyze_middle_trend(frames['Weekly'], frames['Daily'], cache=cache)
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+        return row
+
+    row['as_of'] = h1_df.index[-1]
+    row['close'] = float(h1_df['Close'].iloc[-1])
+    row['double_top'] = bool(short.patterns['double_top'].detected)
+    row['double_bottom'] = bool(short.patterns['double_bottom'].detected)
+    row.update({f"short_{key}": value for key, value in short.items()})
+    row.update({f"middle_{key}": value for key, value in middle.items()})
+    return row
+
+
+class PortfolioAnalyzer:
+    """複数銘柄の短期・中期トレンド分析を並列に実行するクラス。
+
+    Attributes:
+        source (DataSource): データの取得元。pickle 可能である必要があります。
+        max_workers (int or None): ワーカープロセス数。None の場合は CPU 数。
+            1 以下の場合はプロセスを起動せずに順番に実行します。
+        periods (dict): 時間足 ('1d', '1h', '1wk') ごとの取得期間。
+        dtype (np.dtype): 価格データとインジケーターのデータ型 (np.float64 または np.float32)。
+    """
+
+    def __init__(self, source=None, max_workers=None, periods=None, dtype=np.float64):
+        """PortfolioAnalyzer を初期化する。
+
+        Args:
+            source (DataSource, optional): データの取得元。省略時は YFinanceSource。
+            max_workers (int, optional): ワーカープロセス数。
+            periods (dict, optional): 時間足ごとの取得期間。省略した時間足は
+                `DEFAULT_PERIODS` の値を使用します。
+            dtype (np.dtype): 価格データとインジケーターのデータ型。デフォルトは np.float64。
+                np.float32 ではメモリの使用量が半分になります（`MetalAnalyzer` を参照）。
+
+        Raises:
+            ValueError: float64 / float32 以外のデータ型が指定された場合。
+        """
+        self.source = source if source is not None else YFinanceSource()
+        self.max_workers = max_workers
+        self.periods = dict(DEFAULT_PERIODS, **(periods or {}))
+        self.dtype = resolve_dtype(dtype)
+
+    def analyze(self, tickers):
+        """各銘柄の分析を実行し、結果をまとめたテーブルを返す。
+
+        Args:
+            tickers (iterable): ティッカーシンボルのリスト。
+
+        Returns:
+            pd.DataFrame: ティッカーをインデックスとする結果テーブル。
+                列は as_of, close, double_top, double_bottom, short_* (短期分析),
+                middle_* (中期分析), error。失敗した銘柄は error 以外が欠損値になります。
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return pd.DataFrame(columns=['as_of', 'close', 'error'])
+
+        workers = self.max_workers or os.cpu_count() or 1
+        workers = min(workers, len(tickers))
+        if workers <= 1:
+            rows = [_analyze_ticker(t, self.source, self.periods, self.dtype) for t in tickers]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rows = list(executor.map(_analyze_ticker, tickers,
+                                         [self.source] * len(tickers),
+                                         [self.periods] * len(tickers),
+                                         [self.dtype] * len(tickers)))
+
+        table = pd.DataFrame.from_records(rows, index='ticker')
+        # エラー列は末尾に置く
+        columns = [c for c in table.columns if c != 'error'] + ['error']
+        return table[columns]
@@ -0,0 +1,230 @@
+"""短期トレンド分析の結果オブジェクトと、その出力形式（テキスト・JSON・Discord）を提供するモジュール。
+
+`MetalAnalyzer.analyze_short_trend` は分析結果を ShortTrendReport として返し、
+画面への出力は verbose=True の場合のみ `format_short_trend_text` で行います。
+バックテストなどで大量に分析する場合は verbose=False とすることで、出力のコストを省けます。
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from ..patterns.result import PATTERN_NAMES, BEARISH_PATTERNS
+
+# ダッシュボードのキーと表示名（表示順）
+DASHBOARD_LABELS = (
+    ('dashboard_1_trend', '長期トレンド'),
+    ('dashboard_2_momentum', 'EMA乖離'),
+    ('dashboard_3_volatility', '加速/ボラ'),
+    ('dashboard_4_sentiment', 'センチメント'),
+)
+
+# 各ダッシュボードのスコアへの寄与を表すキー（長期トレンド、モメンタム、センチメント、ボラティリティの順）
+SCORE_CONTRIBUTIONS = ('trend_score', 'momentum_score', 'pattern_risk', 'volatility_score')
+
+
+class ShortTrendReport(dict):
+    """短期トレンド分析の結果。
+
+    `analyze_short_trend` の結果辞書 (dashboard_1~4, final_prediction, risk_level, comment,
+    score と各ダッシュボードの寄与) をそのまま保持する dict のサブクラスで、
+    チャートパターンの検知結果と分析時点を属性として持ちます。
+    従来通り `report['final_prediction']` のように参照できます。
+
+    Attributes:
+        patterns (dict): パターンの種類をキー、PatternResult を値とする検知結果。
+        ticker (str or None): 分析対象のティッカーシンボル。
+        as_of (pd.Timestamp or None): 分析に使用した最後の1時間足の時刻。
+    """
+
+    def __init__(self, results, patterns=None, ticker=None, as_of=None):
+        super().__init__(results)
+        self.patterns = dict(patterns or {})
+        self.ticker = ticker
+        self.as_of = as_of
+
+    @property
+    def dashboards(self):
+        """ダッシュボードのキーと判定結果の辞書。"""
+        return {key: self.get(key) for key, _ in DASHBOARD_LABELS}
+
+    @property
+    def score(self):
+        """最終スコア。"""
+        return self.get('score')
+
+    @property
+    def contributions(self):
+        """各ダッシュボードのスコアへの寄与（合計が score）。"""
+        return {key: self.get(key) for key in SCORE_CONTRIBUTIONS}
+
+    @property
+    def prediction(self):
+        """最終的な方向性予測。"""
+        return self.get('final_prediction')
+
+    @property
+    def risk_level(self):
+        """リスク評価。"""
+        return self.get('risk_level')
+
+    @property
+    def comment(self):
+        """詳細コメント。"""
+        return self.get('comment')
+
+    @property
+    def detected_patterns(self):
+        """検知されたパターンの種類のリスト（PATTERN_NAMES の順）。"""
+        order = list(PATTERN_NAMES) + [k for k in self.patterns if k not in PATTERN_NAMES]
+        return [kind for kind in order if kind in self.patterns and self.patterns[kind].detected]
+
+    def to_dict(self):
+        """JSON に変換できる辞書で返す。
+
+        Returns:
+            dict: 結果辞書の各キーに、'ticker', 'as_of' と、パターンごとの
+                検知結果 ('patterns') を加えた辞書。
+        """
+        data = {key: _plain(value) for key, value in self.items()}
+        data['ticker'] = self.ticker
+        data['as_of'] = self.as_of.isoformat() if self.as_of is not None else None
+        data['patterns'] = {kind: _pattern_dict(result) for kind, result in self.patterns.items()}
+        return data
+
+    def __repr__(self):
+        return f"ShortTrendReport({dict.__repr__(self)}, ticker={self.ticker!r}, as_of={self.as_of!r})"
+
+
+def _plain(value):
+    """NumPy / pandas のスカラーを JSON に変換できる Python の値にする（NaN は None）。"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, (tuple, list)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _pattern_dict(result):
+    """PatternResult を JSON に変換できる辞書にする。"""
+    return {
+        'detected': bool(result.detected),
+        'status': result.status,
+        'peaks': _plain(result.peaks),
+        'peak_prices': _plain(result.peak_prices),
+        'neckline': _plain(result.neckline),
+        'current_price': _plain(result.current_price),
+        'trend': result.trend,
+        'diff_ratio': _plain(result.diff_ratio),
+        'message': result.message,
+    }
+
+
+def format_short_trend_text(report):
+    """短期トレンド分析の結果を画面表示用のテキストにする。
+
+    `MetalAnalyzer.analyze_short_trend(verbose=True)` が出力する内容です。
+
+    Args:
+        report (ShortTrendReport): 分析結果。
+
+    Returns:
+        str: 出力するテキスト（前後の空行を含む）。
+    """
+    lines = ["", "=" * 50, " ■短期トレンド分析", "=" * 50]
+    for key, label in DASHBOARD_LABELS:
+        lines.append(f"{label}： {report[key]}")
+    lines.append("-" * 50)
+
+    for kind in ('double_top', 'double_bottom'):
+        result = report.patterns.get(kind)
+        detected = result is not None and result.detected
+        lines.append(f"{PATTERN_NAMES[kind]}： {'検知あり' if detected else '検知なし'}")
+        if detected:
+            lines.append(f"詳細： {result.message}")
+
+    # その他のパターンは検知されたものだけ表示する
+    for kind in report.detected_patterns:
+        if kind not in ('double_top', 'double_bottom'):
+            lines.append(f"{PATTERN_NAMES.get(kind, kind)}： 検知あり")
+
+    lines.append("-" * 20)
+    lines.append(f"最終予測: {report['final_prediction']}")
+    lines.append(f"リスク: {report['risk_level']}")
+    lines.append(f"コメント: {report['comment']}")
+    lines.append("=" * 50)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def format_short_trend_json(report, indent=None):
+    """短期トレンド分析の結果を JSON 文字列にする。
+
+    Args:
+        report (ShortTrendReport): 分析結果。
+        indent (int, optional): インデント幅。省略時は1行で出力します。
+
+    Returns:
+        str: `ShortTrendReport.to_dict` の内容の JSON 文字列。
+    """
+    return json.dumps(report.to_dict(), ensure_ascii=False, indent=indent)
+
+
+def format_short_trend_discord(report, details=None):
+    """短期トレンド分析の結果を Discord Embed のフィールドにする。
+
+    Args:
+        report (ShortTrendReport or dict): 分析結果。
+        details (str, optional): 末尾に付ける時間足別の詳細（`analyze_timeframe_details` の戻り値）。
+
+    Returns:
+        dict: Embed の fields に追加する {'name', 'value', 'inline'} の辞書。
+    """
+    value = f"**予測**: `{report['final_prediction']}`\n"
+    value += f"**リスク**: {report['risk_level']}\n"
+    value += f"**センチメント**: {report['dashboard_4_sentiment']}\n"
+    value += f"> {report['comment']}\n"
+    patterns = getattr(report, 'detected_patterns', None)
+    if patterns:
+        value += f"**パターン**: {', '.join(PATTERN_NAMES.get(k, k) for k in patterns)}\n"
+    if details is not None:
+        value += f"\n👇 **時間足別詳細**\n{details}"
+    return {"name": "🟢 短期トレンド (Short)", "value": value, "inline": False}
+
+
+def format_trend_matrix(matrix):
+    """時間足ごとのトレンド判定の表を Markdown のテキストにする。
+
+    `analyze_timeframe_details` が返す内容です。
+
+    Args:
+        matrix (pd.DataFrame): `trend_matrix` の戻り値。
+
+    Returns:
+        str: 1行に1つの時間足を「**時間足**: `トレンド` パターン」の形式で並べたテキスト。
+    """
+    kinds = [kind for kind in matrix.columns if kind in PATTERN_NAMES]
+    # ダブルトップ・ダブルボトムを先頭に表示する
+    kinds = ([k for k in ('double_top', 'double_bottom') if k in kinds]
+             + [k for k in kinds if k not in ('double_top', 'double_bottom')])
+    marks = {'double_top': "**⚠️ Wトップ** ", 'double_bottom': "**💎 Wボトム** "}
+
+    flags = matrix[kinds].to_numpy(dtype=bool)
+    lines = []
+    for tf_name, trend, row in zip(matrix.index, matrix['trend'], flags):
+        pattern_str = ""
+        for kind, detected in zip(kinds, row):
+            if not detected:
+                continue
+            if kind in marks:
+                pattern_str += marks[kind]
+            else:
+                mark = "⚠️" if kind in BEARISH_PATTERNS else "💎"
+                pattern_str += f"**{mark} {PATTERN_NAMES[kind]}** "
+        lines.append(f"**{tf_name}**: `{trend}` {pattern_str}")
+    return "\n".join(lines)
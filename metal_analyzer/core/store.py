@@ -0,0 +1,303 @@
+"""列指向の OHLCV データストアを提供するモジュール。
+
+このモジュールは、タイムスタンプ (int64 のエポックナノ秒) と各価格列を
+連続した NumPy 配列で保持する OHLCVStore を提供します。
+`view` による期間の切り出しはコピーを伴わず、DataFrame が必要な場合のみ
+`to_frame` で生成します（float64 のストアでは配列を共有します）。
+MetalAnalyzer はストアを受け付けますが、`timeframe_data` には `as_frame` で変換した
+DataFrame を保持します（ストアのまま保持する形式には対応していません）。
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+OHLCV_COLUMNS = PRICE_COLUMNS + ('Volume',)
+
+
+def _to_ns(value):
+    """時刻をエポックナノ秒 (int) に変換する（タイムゾーンは取り除く）。"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.value
+
+
+def _index_to_ns(index):
+    """DatetimeIndex（などの時刻の並び）をエポックナノ秒の int64 配列に変換する。"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return np.asarray(index, dtype='datetime64[ns]').view(np.int64)
+
+
+class OHLCVStore:
+    """連続した NumPy 配列で OHLCV データを保持するストア。
+
+    価格列 (Open/High/Low/Close) は float64 または float32、出来高は float64 で保持します。
+    `view` / `tail` / スライスはコピーを伴わない部分ストアを返します。
+    `append` は容量を倍々に確保するため、1本ずつの追加も償却 O(1) です。
+
+    Attributes:
+        dtype (np.dtype): 価格列のデータ型。
+    """
+
+    def __init__(self, timestamps, open, high, low, close, volume=None, dtype=np.float64):
+        """OHLCVStore を初期化する。
+
+        Args:
+            timestamps (array-like): バーの開始時刻（int64 のエポックナノ秒）。昇順であること。
+            open (array-like): 始値。
+            high (array-like): 高値。
+            low (array-like): 安値。
+            close (array-like): 終値。
+            volume (array-like, optional): 出来高。省略時は 0。
+            dtype (np.dtype): 価格列のデータ型（np.float64 または np.float32）。
+        """
+        self.dtype = np.dtype(dtype)
+        self._ts = np.ascontiguousarray(timestamps, dtype=np.int64)
+        n = len(self._ts)
+        self._cols = {}
+        for name, values in zip(PRICE_COLUMNS, (open, high, low, close)):
+            self._cols[name] = np.ascontiguousarray(values, dtype=self.dtype)
+        if volume is None:
+            volume = np.zeros(n)
+        self._cols['Volume'] = np.ascontiguousarray(volume, dtype=np.float64)
+        for name, values in self._cols.items():
+            if len(values) != n:
+                raise ValueError(f"{name} の長さ ({len(values)}) がタイムスタンプ ({n}) と一致しません。")
+        self._n = n
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        """OHLCV の DataFrame からストアを作成する。
+
+        yfinance の MultiIndex カラムとインデックスのタイムゾーンは取り除きます。
+
+        Args:
+            df (pd.DataFrame): 'Open', 'High', 'Low', 'Close' 列を含むデータフレーム。
+            dtype (np.dtype): 価格列のデータ型。
+
+        Returns:
+            OHLCVStore: 作成したストア。
+        """
+        columns = df.columns
+        if isinstance(columns, pd.MultiIndex):
+            columns = columns.get_level_values(0)
+
+        def column(name):
+            return df.iloc[:, list(columns).index(name)].to_numpy()
+
+        volume = column('Volume') if 'Volume' in columns else None
+        return cls(_index_to_ns(df.index), column('Open'), column('High'), column('Low'),
+                   column('Close'), volume, dtype=dtype)
+
+    @classmethod
+    def _from_arrays(cls, timestamps, cols, dtype):
+        """配列を共有するストアを作成する（コピーなし）。"""
+        store = cls.__new__(cls)
+        store.dtype = dtype
+        store._ts = timestamps
+        store._cols = cols
+        store._n = len(timestamps)
+        return store
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, key):
+        """列名で配列を、スライスで部分ストアを返す。"""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._n)
+            if step != 1:
+                raise ValueError("OHLCVStore のスライスでは step を指定できません。")
+            return self._slice(start, stop)
+        if key not in self._cols:
+            raise KeyError(key)
+        return self._cols[key][:self._n]
+
+    def __contains__(self, key):
+        return key in self._cols
+
+    def __repr__(self):
+        if self._n == 0:
+            return f"OHLCVStore(0 bars, dtype={self.dtype})"
+        return f"OHLCVStore({self._n} bars, {self.index[0]} - {self.index[-1]}, dtype={self.dtype})"
+
+    @property
+    def columns(self):
+        """列名のタプル。"""
+        return OHLCV_COLUMNS
+
+    @property
+    def empty(self):
+        """バーが1本もない場合は True。"""
+        return self._n == 0
+
+    @property
+    def timestamps(self):
+        """バーの開始時刻（int64 のエポックナノ秒）。"""
+        return self._ts[:self._n]
+
+    @property
+    def index(self):
+        """バーの開始時刻の DatetimeIndex。"""
+        return pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'))
+
+    @property
+    def open(self):
+        return self._cols['Open'][:self._n]
+
+    @property
+    def high(self):
+        return self._cols['High'][:self._n]
+
+    @property
+    def low(self):
+        return self._cols['Low'][:self._n]
+
+    @property
+    def close(self):
+        return self._cols['Close'][:self._n]
+
+    @property
+    def volume(self):
+        return self._cols['Volume'][:self._n]
+
+    @property
+    def nbytes(self):
+        """保持している配列の合計バイト数（確保済みの容量を含む）。"""
+        return self._ts.nbytes + sum(values.nbytes for values in self._cols.values())
+
+    def _slice(self, start, stop):
+        """位置 [start, stop) の部分ストアを返す（配列は共有）。"""
+        cols = {name: values[start:stop] for name, values in self._cols.items()}
+        return self._from_arrays(self._ts[start:stop], cols, self.dtype)
+
+    def view(self, start=None, end=None):
+        """期間 [start, end] のバーを、配列を共有する部分ストアとして返す。
+
+        start, end の時刻ちょうどのバーも含みます（日付文字列はその日の 0 時として扱います）。
+
+        Args:
+            start (optional): 開始時刻。省略時は先頭から。
+            end (optional): 終了時刻。省略時は末尾まで。
+
+        Returns:
+            OHLCVStore: 部分ストア。
+        """
+        ts = self.timestamps
+        i = 0 if start is None else int(np.searchsorted(ts, _to_ns(start), side='left'))
+        j = self._n if end is None else int(np.searchsorted(ts, _to_ns(end), side='right'))
+        return self._slice(i, max(i, j))
+
+    def tail(self, n=5):
+        """末尾 n 本のバーを、配列を共有する部分ストアとして返す。"""
+        return self._slice(max(0, self._n - n), self._n)
+
+    def append(self, other):
+        """末尾にバーを追加する。
+
+        既存の `view` や `to_frame` で作成したデータフレームには影響しません。
+
+        Args:
+            other (OHLCVStore or pd.DataFrame): 追加するバー。
+                先頭のバーは既存の最終バーより後の時刻であること。
+
+        Raises:
+            ValueError: 既存の最終バー以前の時刻のバーが含まれる場合。
+        """
+        if not isinstance(other, OHLCVStore):
+            other = OHLCVStore.from_frame(other, dtype=self.dtype)
+        m = len(other)
+        if m == 0:
+            return
+        if self._n > 0 and other.timestamps[0] <= self._ts[self._n - 1]:
+            raise ValueError("既存の最終バー以前の時刻のバーは追加できません。")
+
+        n = self._n
+        if n + m > len(self._ts):
+            capacity = max(n + m, 2 * len(self._ts), 16)
+            self._ts = self._grow(self._ts, capacity)
+            self._cols = {name: self._grow(values, capacity) for name, values in self._cols.items()}
+        self._ts[n:n + m] = other.timestamps
+        for name in OHLCV_COLUMNS:
+            self._cols[name][n:n + m] = other[name]
+        self._n = n + m
+
+    def truncate(self, n):
+        """末尾のバーを取り除き、先頭の n 本だけにする（確保済みの容量は保持します）。
+
+        形成中だった最終バーを `append` で置き換える場合に使用します。取り除いた位置は
+        次の `append` で上書きされるため、それ以前に `view` や `to_frame` で作成した
+        データフレームのうち、その位置を含むものの値も変わります。
+
+        Args:
+            n (int): 残すバーの本数。
+        """
+        self._n = max(0, min(int(n), self._n))
+
+    def _grow(self, values, capacity):
+        """有効範囲をコピーした新しいバッファを確保する。"""
+        buffer = np.empty(capacity, dtype=values.dtype)
+        buffer[:self._n] = values[:self._n]
+        return buffer
+
+    def to_frame(self, dtype=None):
+        """DataFrame を生成する。
+
+        価格列のデータ型が変わらない場合、配列はコピーされずに共有されます。
+
+        Args:
+            dtype (np.dtype, optional): 価格列のデータ型。省略時はストアのデータ型。
+
+        Returns:
+            pd.DataFrame: 'Open', 'High', 'Low', 'Close', 'Volume' 列のデータフレーム。
+        """
+        data = {}
+        for name in PRICE_COLUMNS:
+            values = self._cols[name][:self._n]
+            data[name] = values if dtype is None else values.astype(dtype, copy=False)
+        data['Volume'] = self.volume
+        return pd.DataFrame(data, index=self.index, copy=False)
+
+
+def as_frame(data, dtype=np.float64):
+    """OHLCVStore を分析用の DataFrame に変換する（DataFrame はそのまま返す）。
+
+    価格列が dtype と同じ場合、返すデータフレームはストアの配列をコピーせずに共有します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore): OHLCV データ。
+        dtype (np.dtype): OHLCVStore の価格列を変換するデータ型。デフォルトは np.float64。
+
+    Returns:
+        pd.DataFrame: データフレーム。
+    """
+    if isinstance(data, OHLCVStore):
+        return data.to_frame(dtype=dtype)
+    return data
+
+
+def cast_prices(df, dtype):
+    """DataFrame の価格列 (Open/High/Low/Close) を指定したデータ型に変換する。
+
+    全ての価格列が既にそのデータ型の場合は、コピーせずにそのまま返します。
+
+    Args:
+        df (pd.DataFrame): OHLCV のデータフレーム（単一階層の列）。
+        dtype (np.dtype): 価格列のデータ型。
+
+    Returns:
+        pd.DataFrame: 価格列を変換したデータフレーム。
+    """
+    dtype = np.dtype(dtype)
+    cast = {name: dtype for name in PRICE_COLUMNS if name in df.columns and df[name].dtype != dtype}
+    return df.astype(cast) if cast else df
+
+
+def column_values(data, name):
+    """DataFrame または OHLCVStore から列の NumPy 配列を取り出す。"""
+    if isinstance(data, OHLCVStore):
+        return data[name]
+    return data[name].values
@@ -0,0 +1,13 @@
+"""価格データの取得機能を提供するパッケージ。
+
+データ取得元の共通インターフェース (DataSource) と、yfinance・ローカルファイル・
+バーアーカイブの各取得元、および複数系列を並列に取得する fetch_many が含まれます。
+取得したデータは、フラットなカラムとタイムゾーンなしのインデックスに正規化されます。
+"""
+
+from .base import DataSource, normalize_ohlcv, period_start
+from .sources import YFinanceSource, LocalFileSource, ArchiveSource
+from .fetch import fetch_many
+
+__all__ = ['DataSource', 'normalize_ohlcv', 'period_start', 'YFinanceSource', 'LocalFileSource',
+           'ArchiveSource', 'fetch_many']
@@ -0,0 +1,123 @@
+"""価格データ取得元の共通インターフェースを提供するモジュール。
+
+このモジュールは、データ取得元の基底クラス DataSource と、
+取得したデータを分析用の形式にそろえる normalize_ohlcv を提供します。
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from ..core.store import OHLCV_COLUMNS
+from ..core.instrumentation import stage
+
+# yfinance の period 指定（例: "2y", "1mo", "5d"）の単位
+_PERIOD_UNITS = {
+    'm': 'minutes',
+    'h': 'hours',
+    'd': 'days',
+    'wk': 'weeks',
+    'mo': 'months',
+    'y': 'years',
+}
+
+
+def normalize_ohlcv(df):
+    """OHLCV データを分析用の形式にそろえる。
+
+    以下の正規化を1回だけ行います。
+    - MultiIndex のカラム (yfinance の (Price, Ticker) 形式) を1段にする
+    - インデックスを DatetimeIndex に変換し、タイムゾーンを取り除く
+    - 'Open', 'High', 'Low', 'Close', 'Volume' 以外の列を取り除き、float64 にそろえる
+    - 時刻順に並べ、重複した時刻は後のバーを残す
+
+    Args:
+        df (pd.DataFrame): 取得した OHLCV データ。
+
+    Returns:
+        pd.DataFrame: 正規化したデータフレーム（元のデータは変更しません）。
+    """
+    if df is None:
+        return pd.DataFrame(columns=list(OHLCV_COLUMNS), index=pd.DatetimeIndex([]), dtype=np.float64)
+
+    df = df.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df.columns = [str(c).strip().title() for c in df.columns]
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = None
+
+    columns = [c for c in OHLCV_COLUMNS if c in df.columns]
+    df = df.loc[:, ~df.columns.duplicated()][columns].astype(np.float64)
+    if 'Close' in df.columns:
+        df = df[df['Close'].notna()]
+
+    df = df.sort_index()
+    return df[~df.index.duplicated(keep='last')]
+
+
+def period_start(end, period):
+    """期間指定（例: "2y", "1mo"）から開始時刻を求める。
+
+    Args:
+        end (pd.Timestamp): 期間の終了時刻。
+        period (str): yfinance 形式の期間。"max" または None の場合は制限なし。
+
+    Returns:
+        pd.Timestamp or None: 開始時刻。制限なしの場合は None。
+
+    Raises:
+        ValueError: 解釈できない期間が指定された場合。
+    """
+    if period is None or period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=end.year, month=1, day=1)
+    match = re.fullmatch(r'(\d+)(mo|wk|y|d|h|m)', period)
+    if match is None:
+        raise ValueError(f"解釈できない期間です: {period}")
+    unit = _PERIOD_UNITS[match.group(2)]
+    return end - pd.DateOffset(**{unit: int(match.group(1))})
+
+
+class DataSource(ABC):
+    """価格データ取得元の基底クラス。
+
+    サブクラスは `_fetch` を実装します。`fetch` は取得結果を `normalize_ohlcv` で
+    正規化し、start / end の範囲に切り出して返します。
+    プロセスプールから利用できるよう、サブクラスは pickle 可能な属性だけを持つようにします。
+    """
+
+    @abstractmethod
+    def _fetch(self, ticker, interval, period=None, start=None, end=None):
+        """取得元からデータを読み込む（正規化前のデータを返してよい）。"""
+
+    def fetch(self, ticker, interval, period=None, start=None, end=None):
+        """OHLCV データを取得する。
+
+        Args:
+            ticker (str): ティッカーシンボル（例: "GC=F"）。
+            interval (str): 時間足（例: "1d", "1h", "15m"）。
+            period (str, optional): 取得期間（例: "2y", "1mo"）。start と同時には指定しません。
+            start (optional): 開始時刻（この時刻を含む）。
+            end (optional): 終了時刻（この時刻を含まない。yfinance と同じ扱い）。
+
+        Returns:
+            pd.DataFrame: 正規化した OHLCV データ。
+        """
+        with stage('fetch'):
+            df = normalize_ohlcv(self._fetch(ticker, interval, period=period, start=start, end=end))
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index < pd.Timestamp(end)]
+        return df
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
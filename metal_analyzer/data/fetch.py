@@ -0,0 +1,49 @@
+"""複数系列の価格データを並列に取得する機能を提供するモジュール。"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .base import normalize_ohlcv
+
+
+def _request_kwargs(request):
+    """取得条件（辞書またはタプル）を `DataSource.fetch` の引数に変換する。"""
+    if isinstance(request, dict):
+        return dict(request)
+    keys = ('ticker', 'interval', 'period', 'start', 'end')
+    return dict(zip(keys, request))
+
+
+def fetch_many(source, requests, max_workers=8, raise_errors=False):
+    """複数の (ティッカー, 時間足) をスレッドプールで同時に取得する。
+
+    データ取得の待ち時間は最も遅い系列の分だけになります（全系列の合計にはなりません）。
+
+    Args:
+        source (DataSource): データの取得元。
+        requests (dict): 結果のキーを取得条件に対応付けた辞書。取得条件は
+            {'ticker': 'GC=F', 'interval': '1d', 'period': '2y'} のような辞書、
+            または (ticker, interval[, period[, start[, end]]]) のタプル。
+        max_workers (int): 同時に取得する最大数。デフォルト 8。
+        raise_errors (bool): True の場合、取得に失敗した系列があれば例外を送出します。
+            False の場合は警告を表示し、その系列は空のデータフレームになります。
+
+    Returns:
+        dict: requests と同じキーを持つ、正規化済みデータフレームの辞書。
+    """
+    if not requests:
+        return {}
+
+    results = {}
+    workers = max(1, min(max_workers, len(requests)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(source.fetch, **_request_kwargs(request))
+                   for key, request in requests.items()}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                if raise_errors:
+                    raise
+                print(f"【警告】{key} の取得に失敗しました: {e}")
+                results[key] = normalize_ohlcv(None)
+    return results
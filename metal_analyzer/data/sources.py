@@ -0,0 +1,169 @@
+"""価格データ取得元の実装を提供するモジュール。
+
+このモジュールは、以下の DataSource を提供します。
+- YFinanceSource: yfinance から取得する（yfinance は利用時に読み込みます）
+- LocalFileSource: ローカルの CSV / Parquet ファイルから読み込む（オフラインのテスト用）
+- ArchiveSource: BarArchive から読み込み、上流の取得元があれば新しいバーだけを追記する
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from ..storage import BarArchive
+from ..storage.archive import _safe_name
+from .base import DataSource, normalize_ohlcv, period_start
+
+
+class YFinanceSource(DataSource):
+    """yfinance から価格データを取得する DataSource。
+
+    複数スレッドから同時に呼び出せるよう、グローバルな状態を共有する
+    `yf.download` ではなく `yf.Ticker(...).history` を使用します。
+
+    Attributes:
+        auto_adjust (bool): 配当・分割を調整した価格を取得するか。
+    """
+
+    def __init__(self, auto_adjust=True):
+        """YFinanceSource を初期化する。
+
+        Args:
+            auto_adjust (bool): 配当・分割を調整した価格を取得するか。デフォルト True。
+        """
+        self.auto_adjust = auto_adjust
+
+    def _fetch(self, ticker, interval, period=None, start=None, end=None):
+        try:
+            import yfinance as yf
+        except ImportError as e:
+            raise ImportError("YFinanceSource を使用するには yfinance をインストールしてください: "
+                              "pip install yfinance") from e
+
+        kwargs = {'interval': interval, 'auto_adjust': self.auto_adjust}
+        if start is not None or end is not None:
+            kwargs.update(start=start, end=end)
+        else:
+            kwargs['period'] = period or '1mo'
+        return yf.Ticker(ticker).history(**kwargs)
+
+
+class LocalFileSource(DataSource):
+    """ローカルの CSV / Parquet ファイルから価格データを読み込む DataSource。
+
+    ファイル名は `pattern` を ticker, interval で埋めて決めます。
+    period は、ファイル内の最終バーを基準とした期間として扱います。
+
+    Attributes:
+        root (str): ファイルを置くディレクトリ。
+        pattern (str): ファイル名のパターン。拡張子 (.csv / .parquet) で形式を判定します。
+    """
+
+    def __init__(self, root, pattern="{ticker}_{interval}.csv"):
+        """LocalFileSource を初期化する。
+
+        Args:
+            root (str): ファイルを置くディレクトリ。
+            pattern (str): ファイル名のパターン。デフォルトは "{ticker}_{interval}.csv"。
+        """
+        self.root = root
+        self.pattern = pattern
+
+    def __repr__(self):
+        return f"LocalFileSource({self.root!r}, pattern={self.pattern!r})"
+
+    def path(self, ticker, interval):
+        """ticker, interval に対応するファイルのパスを返す。"""
+        name = self.pattern.format(ticker=_safe_name(ticker), interval=_safe_name(interval))
+        return os.path.join(self.root, name)
+
+    def _fetch(self, ticker, interval, period=None, start=None, end=None):
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{ticker} ({interval}) のファイルがありません: {path}")
+
+        if path.endswith('.parquet'):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+
+        df = normalize_ohlcv(df)
+        if start is None and period is not None and not df.empty:
+            since = period_start(df.index[-1], period)
+            if since is not None:
+                df = df[df.index >= since]
+        return df
+
+    def save(self, ticker, interval, df):
+        """データを `path(ticker, interval)` に保存する（テスト用データの作成に使用）。
+
+        Args:
+            ticker (str): ティッカーシンボル。
+            interval (str): 時間足。
+            df (pd.DataFrame): 保存する OHLCV データ。
+
+        Returns:
+            str: 保存したファイルのパス。
+        """
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        df = normalize_ohlcv(df)
+        if path.endswith('.parquet'):
+            df.to_parquet(path)
+        else:
+            df.to_csv(path)
+        return path
+
+
+class ArchiveSource(DataSource):
+    """BarArchive から価格データを読み込む DataSource。
+
+    上流の取得元 (upstream) を指定すると、上流から取得したバーのうち
+    アーカイブにない新しいバーだけを追記してから読み出します。
+    上流の取得に失敗した場合は、保存済みのデータだけで応答します。
+    period は、アーカイブ内の最終バーを基準とした期間として扱います。
+
+    Attributes:
+        archive (BarArchive): 読み書きするアーカイブ。
+        upstream (DataSource or None): 新しいバーの取得元。None の場合はオフラインで動作します。
+    """
+
+    def __init__(self, archive, upstream=None):
+        """ArchiveSource を初期化する。
+
+        Args:
+            archive (BarArchive or str): アーカイブ、またはそのルートディレクトリ。
+            upstream (DataSource, optional): 新しいバーの取得元。
+        """
+        self.archive = archive if isinstance(archive, BarArchive) else BarArchive(archive)
+        self.upstream = upstream
+
+    def __repr__(self):
+        return f"ArchiveSource({self.archive.root!r}, upstream={self.upstream!r})"
+
+    def _fetch(self, ticker, interval, period=None, start=None, end=None):
+        if self.upstream is not None:
+            try:
+                last = self.archive.last_timestamp(ticker, interval)
+                if last is None:
+                    new = self.upstream.fetch(ticker, interval, period=period, start=start, end=end)
+                else:
+                    # 保存済みの最終バー（形成途中だった可能性がある）から取得し直す
+                    new = self.upstream.fetch(ticker, interval, start=last, end=end)
+                self.archive.write(ticker, interval, new)
+            except Exception as e:
+                if not self.archive.exists(ticker, interval):
+                    raise
+                print(f"【警告】{ticker} ({interval}) の取得に失敗したため、保存済みのデータを使用します: {e}")
+
+        if not self.archive.exists(ticker, interval):
+            raise KeyError(f"アーカイブに {ticker} ({interval}) のデータがありません。")
+
+        # 期間をメモリマップ上で切り出してから変換し、アーカイブ全体は読み込まない
+        since = start
+        if since is None and period is not None:
+            last = self.archive.last_timestamp(ticker, interval)
+            if last is not None:
+                since = period_start(last, period)
+        return self.archive.read(ticker, interval, since, end).to_frame(dtype=np.float64)
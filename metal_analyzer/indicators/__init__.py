@@ -1,10 +1,17 @@
 """テクニカル分析指標を提供するパッケージ。
 
-SMA, EMA, RSI などの基本的な指標計算ロジックが含まれます。
+SMA, EMA, RSI などの基本的な指標計算ロジックと、NumPy 配列を直接受け取る高速版
+(rsi_array, rolling_mean_std, bollinger_array)、
+バーごとに O(1) で更新できる逐次更新型の指標が含まれます。
+各関数の dtype 引数で float32 での計算を選択できます（`dtypes` モジュールを参照）。
 """
 
-from .sma import calculate_sma, calculate_ema
-from .rsi import calculate_rsi
-from .bollinger_bands import calculate_bollinger_bands
+from .sma import calculate_sma, calculate_ema, calculate_emas, rolling_mean_std
+from .rsi import calculate_rsi, rsi_array
+from .bollinger_bands import calculate_bollinger_bands, bollinger_array
+from .dtypes import FLOAT_DTYPES, resolve_dtype
+from .online import OnlineSMA, OnlineEMA, OnlineRSI, OnlineBollinger
 
-__all__ = ['calculate_sma', 'calculate_ema', 'calculate_rsi', 'calculate_bollinger_bands']
+__all__ = ['calculate_sma', 'calculate_ema', 'calculate_emas', 'calculate_rsi', 'calculate_bollinger_bands',
+           'rolling_mean_std', 'rsi_array', 'bollinger_array', 'FLOAT_DTYPES', 'resolve_dtype',
+           'OnlineSMA', 'OnlineEMA', 'OnlineRSI', 'OnlineBollinger']
@@ -2,17 +2,26 @@
 
 このモジュールは、指定された期間と標準偏差に基づいて、
 ボリンジャーバンド（ミドル、アッパー、ローワー）を計算する関数を提供します。
+`bollinger_array` は DataFrame を介さずに NumPy 配列の終値からバンドと
+バンド幅・%B をまとめて計算する高速版です。
+dtype に np.float32 を指定すると float32 で計算します（誤差は `dtypes` モジュールを参照）。
 """
 
+import numpy as np
 import pandas as pd
 
-def calculate_bollinger_bands(df, window=20, num_std=2):
+from .dtypes import resolve_dtype
+from .sma import rolling_mean_std
+
+def calculate_bollinger_bands(df, window=20, num_std=2, dtype=np.float64):
     """ボリンジャーバンドを計算する。
 
     Args:
         df (pd.DataFrame): 'Close' 列を含むデータフレーム。
         window (int): 移動平均の期間。デフォルトは20。
         num_std (int): 標準偏差の倍数。デフォルトは2。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+            np.float32 の場合は `bollinger_array` で計算します。
 
     Returns:
         tuple: (pd.Series, pd.Series, pd.Series) 
@@ -21,6 +30,10 @@ def calculate_bollinger_bands(df, window=20, num_std=2):
     """
     if 'Close' not in df.columns:
         return None, None, None
+    dtype = resolve_dtype(dtype)
+    if dtype != np.float64:
+        bands = bollinger_array(df['Close'].to_numpy(), window, num_std, dtype=dtype)[:3]
+        return tuple(pd.Series(values, index=df.index, name='Close') for values in bands)
     
     middle_band = df['Close'].rolling(window=window).mean()
     std_dev = df['Close'].rolling(window=window).std()
@@ -29,3 +42,39 @@ def calculate_bollinger_bands(df, window=20, num_std=2):
     lower_band = middle_band - (std_dev * num_std)
     
     return middle_band, upper_band, lower_band
+
+def bollinger_array(close, window=20, num_std=2, dtype=np.float64):
+    """終値の配列からボリンジャーバンドとバンド幅・%B を計算する。
+
+    移動平均と移動標準偏差を `rolling_mean_std` で1回に計算します。
+    ミドル・アッパー・ローワーの値は `calculate_bollinger_bands` と同じです
+    （差は浮動小数点の丸め程度）。
+
+    Args:
+        close (array-like): 終値の配列。
+        window (int): 移動平均の期間。デフォルトは20。
+        num_std (float): 標準偏差の倍数。デフォルトは2。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+
+    Returns:
+        tuple: dtype の np.ndarray の (ミドルバンド, アッパーバンド, ローワーバンド, バンド幅, %B)。
+            バンド幅は (アッパー - ローワー) / ミドル、%B は (終値 - ローワー) / (アッパー - ローワー)。
+            期間に満たない位置は NaN、バンドの幅が 0 の位置の %B も NaN。
+
+    Raises:
+        ValueError: window が 1 未満の場合。
+
+    Examples:
+        >>> middle, upper, lower, width, percent_b = bollinger_array(df['Close'].to_numpy())
+    """
+    dtype = resolve_dtype(dtype)
+    close = np.asarray(close, dtype=dtype)
+    middle, std_dev = rolling_mean_std(close, window, dtype=dtype)
+    num_std = dtype.type(num_std)
+    upper = middle + std_dev * num_std
+    lower = middle - std_dev * num_std
+    band = upper - lower
+    with np.errstate(invalid='ignore', divide='ignore'):
+        width = band / middle
+        percent_b = np.where(band != 0, (close - lower) / band, dtype.type(np.nan))
+    return middle, upper, lower, width, percent_b
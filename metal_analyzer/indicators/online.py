@@ -0,0 +1,299 @@
+"""逐次更新型（オンライン）テクニカル指標を提供するモジュール。
+
+このモジュールは、新しいバーが1本追加されるたびに O(1) で値を更新できる
+SMA, EMA, RSI, ボリンジャーバンドのクラスを提供します。
+内部ではリングバッファと累積和を保持し、全期間を再計算することはありません。
+
+各クラスの値は、同じ系列に対応するバッチ関数（`calculate_sma` など）の
+最終値と浮動小数点誤差の範囲（相対誤差 1e-12 程度）で一致します。
+期間に満たない間 (ウォームアップ) は、バッチ関数と同じく NaN を返します。
+入力系列には欠損値 (NaN) が含まれないことを前提とします。
+"""
+
+import math
+from collections import deque
+
+
+def _close_value(bar):
+    """バー（数値、または 'Close' を持つ辞書/Series）から終値を取り出す。"""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    try:
+        return float(bar['Close'])
+    except (TypeError, KeyError, IndexError):
+        return float(bar)
+
+
+class _RollingWindow:
+    """固定長ウィンドウの合計と偏差平方和を逐次更新するリングバッファ。
+
+    誤差の蓄積を防ぐため、ウィンドウ長と同じ回数の更新ごとに
+    バッファから合計を再計算します（償却 O(1)）。
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+
+    def push(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.values.append(x)
+            # Welford 法による入れ替え (old を削除して x を追加)
+            delta = x - old
+            old_mean = self.mean
+            self.mean += delta / self.window
+            self.m2 += delta * (x - self.mean + old - old_mean)
+        else:
+            self.values.append(x)
+            n = len(self.values)
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+
+        self._updates += 1
+        if self._updates >= self.window:
+            self._resync()
+
+    def _resync(self):
+        n = len(self.values)
+        mean = math.fsum(self.values) / n
+        self.mean = mean
+        self.m2 = math.fsum((v - mean) ** 2 for v in self.values)
+        self._updates = 0
+
+    def peek_mean(self, x):
+        """x を追加した場合の平均を、状態を変更せずに返す。"""
+        n = len(self.values)
+        if n == self.window:
+            return self.mean + (x - self.values[0]) / self.window
+        return (self.mean * n + x) / (n + 1)
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    def variance(self, ddof=1):
+        n = len(self.values)
+        if n - ddof <= 0:
+            return math.nan
+        return max(self.m2, 0.0) / (n - ddof)
+
+
+class OnlineSMA:
+    """逐次更新型の単純移動平均 (SMA)。
+
+    `calculate_sma(df, window)` と同じく、バーが window 本揃うまでは NaN を返します。
+
+    Attributes:
+        window (int): 平均を取る期間。
+        value (float): 最新のSMA値。
+    """
+
+    def __init__(self, window=20):
+        """OnlineSMA を初期化する。
+
+        Args:
+            window (int): 平均を取る期間。デフォルトは20。
+        """
+        self.window = window
+        self._buffer = _RollingWindow(window)
+        self.value = math.nan
+
+    def update(self, bar):
+        """新しいバーを追加してSMAを更新する。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            float: 更新後のSMA値。
+        """
+        self._buffer.push(_close_value(bar))
+        self.value = self._buffer.mean if self._buffer.full else math.nan
+        return self.value
+
+
+class OnlineEMA:
+    """逐次更新型の指数平滑移動平均 (EMA)。
+
+    `calculate_ema(df, window)`（`ewm(span=window, adjust=False)`）と同じく、
+    最初のバーの終値を初期値とします。
+
+    Attributes:
+        window (int): EMAの期間 (span)。
+        alpha (float): 平滑化係数 2 / (window + 1)。
+        value (float): 最新のEMA値。
+    """
+
+    def __init__(self, window=20):
+        """OnlineEMA を初期化する。
+
+        Args:
+            window (int): EMAの期間。デフォルトは20。
+        """
+        self.window = window
+        self.alpha = 2.0 / (window + 1.0)
+        self.value = math.nan
+
+    def update(self, bar):
+        """新しいバーを追加してEMAを更新する。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            float: 更新後のEMA値。
+        """
+        self.value = self.peek(bar)
+        return self.value
+
+    def peek(self, bar):
+        """バーを追加した場合のEMA値を、状態を変更せずに返す。
+
+        形成途中のバーを確定前に評価する場合などに使用します。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            float: バー追加後のEMA値。
+        """
+        return self.step(self.value, _close_value(bar), self.alpha)
+
+    @staticmethod
+    def step(prev, x, alpha):
+        """前回のEMA値 prev に値 x を1ステップ適用したEMA値を返す。
+
+        Args:
+            prev (float): 前回のEMA値。NaN の場合は x をそのまま返します。
+            x (float): 新しい値。
+            alpha (float): 平滑化係数。
+
+        Returns:
+            float: 更新後のEMA値。
+        """
+        if math.isnan(prev):
+            return x
+        if prev == x:
+            return prev
+        # pandas の ewm(adjust=False) と同じ演算順序で重み付き平均を取る
+        old_wt = 1.0 - alpha
+        return (old_wt * prev + alpha * x) / (old_wt + alpha)
+
+
+class OnlineRSI:
+    """逐次更新型の相対力指数 (RSI)。
+
+    `calculate_rsi(df, window)` と同じく、上昇幅・下落幅の単純移動平均から
+    RSIを計算します（最初のバーの変化幅は 0 として扱います）。
+
+    Attributes:
+        window (int): 計算期間。
+        value (float): 最新のRSI値。
+    """
+
+    def __init__(self, window=14):
+        """OnlineRSI を初期化する。
+
+        Args:
+            window (int): 計算期間。デフォルトは14。
+        """
+        self.window = window
+        self._gains = _RollingWindow(window)
+        self._losses = _RollingWindow(window)
+        self._prev_close = None
+        self.value = math.nan
+
+    def update(self, bar):
+        """新しいバーを追加してRSIを更新する。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            float: 更新後のRSI値。期間に満たない場合は NaN。
+        """
+        x = _close_value(bar)
+        delta = 0.0 if self._prev_close is None else x - self._prev_close
+        self._prev_close = x
+
+        self._gains.push(delta if delta > 0 else 0.0)
+        self._losses.push(-delta if delta < 0 else 0.0)
+
+        if not self._gains.full:
+            self.value = math.nan
+        else:
+            self.value = self._rsi(self._gains.mean, self._losses.mean)
+        return self.value
+
+    def peek(self, bar):
+        """バーを追加した場合のRSI値を、状態を変更せずに返す。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            float: バー追加後のRSI値。期間に満たない場合は NaN。
+        """
+        x = _close_value(bar)
+        delta = 0.0 if self._prev_close is None else x - self._prev_close
+        if len(self._gains.values) + 1 < self.window:
+            return math.nan
+        gain = self._gains.peek_mean(delta if delta > 0 else 0.0)
+        loss = self._losses.peek_mean(-delta if delta < 0 else 0.0)
+        return self._rsi(gain, loss)
+
+    @staticmethod
+    def _rsi(gain, loss):
+        if loss == 0:
+            # pandas と同様に 0/0 は NaN、x/0 は RSI 100 とする
+            return math.nan if gain == 0 else 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+
+class OnlineBollinger:
+    """逐次更新型のボリンジャーバンド。
+
+    `calculate_bollinger_bands(df, window, num_std)` と同じく、
+    標本標準偏差 (ddof=1) を使用します。
+
+    Attributes:
+        window (int): 移動平均の期間。
+        num_std (float): 標準偏差の倍数。
+        value (tuple): 最新の (ミドルバンド, アッパーバンド, ローワーバンド)。
+    """
+
+    def __init__(self, window=20, num_std=2):
+        """OnlineBollinger を初期化する。
+
+        Args:
+            window (int): 移動平均の期間。デフォルトは20。
+            num_std (float): 標準偏差の倍数。デフォルトは2。
+        """
+        self.window = window
+        self.num_std = num_std
+        self._buffer = _RollingWindow(window)
+        self.value = (math.nan, math.nan, math.nan)
+
+    def update(self, bar):
+        """新しいバーを追加してボリンジャーバンドを更新する。
+
+        Args:
+            bar (float or Mapping): 終値、または 'Close' を含むバー。
+
+        Returns:
+            tuple: (ミドルバンド, アッパーバンド, ローワーバンド)。
+                期間に満たない場合は全て NaN。
+        """
+        self._buffer.push(_close_value(bar))
+        if not self._buffer.full:
+            return self.value
+
+        middle = self._buffer.mean
+        std_dev = math.sqrt(self._buffer.variance(ddof=1))
+        self.value = (middle, middle + std_dev * self.num_std, middle - std_dev * self.num_std)
+        return self.value
@@ -2,22 +2,37 @@
 
 このモジュールは、指定された期間に基づいて市場の売られすぎ・買われすぎを
 判断するためのRSIを計算する関数を提供します。
+`rsi_array` は DataFrame を介さずに NumPy 配列の終値から RSI を計算する高速版で、
+単純移動平均 (SMA) とワイルダーの平滑化 (Wilder) の両方に対応します。
+dtype に np.float32 を指定すると float32 で計算します（誤差は `dtypes` モジュールを参照）。
 """
 
+import numpy as np
 import pandas as pd
 
-def calculate_rsi(df, window=14):
+from .dtypes import resolve_dtype
+from .sma import _rolling_mean, _ema_filter
+
+# rsi_array で指定できる平滑化の方法
+RSI_SMOOTHING = ('sma', 'wilder')
+
+def calculate_rsi(df, window=14, dtype=np.float64):
     """RSI (Relative Strength Index) を計算する。
 
     Args:
         df (pd.DataFrame): 'Close' 列を含むデータフレーム。
         window (int): 計算期間。デフォルトは14。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+            np.float32 の場合は `rsi_array` で計算します。
 
     Returns:
         pd.Series or None: RSIの値を持つシリーズ。'Close' 列がない場合は None。
     """
     if 'Close' not in df.columns:
         return None
+    dtype = resolve_dtype(dtype)
+    if dtype != np.float64:
+        return pd.Series(rsi_array(df['Close'].to_numpy(), window, dtype=dtype), index=df.index, name='Close')
     
     delta = df['Close'].diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
@@ -28,3 +43,65 @@ def calculate_rsi(df, window=14):
     rs = gain / loss
     rsi = 100 - (100 / (1 + rs))
     return rsi
+
+def rsi_array(close, window=14, smoothing='sma', dtype=np.float64):
+    """終値の配列から RSI を計算する。
+
+    上昇幅・下落幅を1回の差分で求め、平均は累積和（SMA, `rolling_mean_std` と同じ方法）
+    または線形フィルタ（Wilder, EMA と同じ方法）で O(n) で計算します。smoothing='sma' の値は
+    `calculate_rsi` と同じです（最初のバーや NaN を含む変化幅は 0 として扱います。
+    差は浮動小数点の丸め程度）。
+
+    Args:
+        close (array-like): 終値の配列。
+        window (int): 計算期間。デフォルトは14。
+        smoothing (str): 平均の方法。
+            - 'sma': 直近 window 本の単純移動平均（`calculate_rsi` と同じ）。最初の値は index window-1。
+            - 'wilder': 最初の window 本の変化幅の平均を初期値とし、以降は
+              avg = (前回の avg * (window-1) + 変化幅) / window で更新するワイルダーの平滑化。
+              最初の値は index window。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+
+    Returns:
+        np.ndarray: RSI の dtype の配列（close と同じ長さ）。期間に満たない位置は NaN。
+
+    Raises:
+        ValueError: window が 1 未満、または未対応の smoothing が指定された場合。
+
+    Examples:
+        >>> rsi = rsi_array(df['Close'].to_numpy(), 14, smoothing='wilder')
+    """
+    if window < 1:
+        raise ValueError(f"window には 1 以上を指定してください: {window}")
+    if smoothing not in RSI_SMOOTHING:
+        raise ValueError(f"未対応の smoothing です: {smoothing}（指定可能: {', '.join(RSI_SMOOTHING)}）")
+
+    dtype = resolve_dtype(dtype)
+    close = np.asarray(close, dtype=dtype)
+    n = len(close)
+    delta = np.zeros(n, dtype=dtype)
+    if n > 1:
+        delta[1:] = close[1:] - close[:-1]
+    # NaN の変化幅は比較が偽になるため 0 になる（pandas の where と同じ）
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, dtype.type(0))
+        loss = np.where(delta < 0, -delta, dtype.type(0))
+
+    if smoothing == 'sma':
+        # 上昇幅・下落幅は 0 以上のため、累積和の丸めで生じた負の値は 0 とする
+        avg_gain = np.maximum(_rolling_mean(gain, window, dtype), 0.0)
+        avg_loss = np.maximum(_rolling_mean(loss, window, dtype), 0.0)
+    else:
+        avg_gain, avg_loss = _wilder_mean(gain, window), _wilder_mean(loss, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def _wilder_mean(values, window):
+    """ワイルダーの平滑化による平均を計算する（最初の値は index window）。"""
+    out = np.full(len(values), np.nan, dtype=values.dtype)
+    if len(values) > window:
+        seed = values[1:window + 1].mean(dtype=np.float64)
+        out[window] = seed
+        _ema_filter(values[window + 1:], 1.0 / window, seed, out[window + 1:])
+    return out
@@ -2,34 +2,228 @@
 
 このモジュールは、指定された期間に基づいて単純移動平均（SMA）および
 指数平滑移動平均（EMA）を計算する関数を提供します。
+EMA は線形フィルタ (scipy.signal.lfilter) で計算し、複数の期間は `calculate_emas` で
+pandas を介さずに1つの配列としてまとめて求めます。
+`rolling_mean_std` は NumPy 配列の移動平均と移動標準偏差を累積和で1回に計算します。
+各関数の dtype に np.float32 を指定すると float32 で計算します（誤差は `dtypes` モジュールを参照）。
 """
 
+import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 
-def calculate_sma(df, window=20):
+from .dtypes import resolve_dtype
+
+# rolling_mean_std で累積和を取り直す区間の長さ。
+# 累積和の桁が大きくなって丸め誤差が蓄積しないよう、区間ごとに基準値を引いてから計算する
+_ROLLING_BLOCK = 4096
+
+# float32 の EMA を float64 に変換して計算する区間の長さ
+_FILTER_BLOCK = 65536
+
+def calculate_sma(df, window=20, dtype=np.float64):
     """単純移動平均 (SMA) を計算する。
 
     Args:
         df (pd.DataFrame): 'Close' 列を含むデータフレーム。
         window (int): 平均を取る期間。デフォルトは20。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+            np.float32 の場合は `rolling_mean_std` と同じ方法で計算します。
 
     Returns:
         pd.Series or None: SMAの値を持つシリーズ。'Close' 列がない場合は None。
     """
     if 'Close' not in df.columns:
         return None
-    return df['Close'].rolling(window=window).mean()
+    dtype = resolve_dtype(dtype)
+    if dtype == np.float64:
+        return df['Close'].rolling(window=window).mean()
+    values = _rolling_mean(df['Close'].to_numpy(), window, dtype)
+    return pd.Series(values, index=df.index, name='Close')
 
-def calculate_ema(df, window=20):
+def calculate_ema(df, window=20, dtype=np.float64):
     """指数平滑移動平均 (EMA) を計算する。
 
     Args:
         df (pd.DataFrame): 'Close' 列を含むデータフレーム。
         window (int): 平均を取る期間。デフォルトは20。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
 
     Returns:
         pd.Series or None: EMAの値を持つシリーズ。'Close' 列がない場合は None。
     """
     if 'Close' not in df.columns:
         return None
-    return df['Close'].ewm(span=window, adjust=False).mean()
+    values = _ema_matrix(df['Close'].to_numpy(), (window,), resolve_dtype(dtype))[:, 0]
+    return pd.Series(values, index=df.index, name='Close')
+
+def calculate_emas(df, spans=(12, 26), dtype=np.float64):
+    """複数の期間の指数平滑移動平均 (EMA) をまとめて計算する。
+
+    同じ終値に対して複数の期間の EMA が必要な場合に、期間ごとに
+    `calculate_ema` を呼び出す代わりに使用します。各列の値は
+    `calculate_ema(df, span)` と同じです。
+
+    Args:
+        df (pd.DataFrame): 'Close' 列を含むデータフレーム。
+        spans (sequence of int): EMA の期間。デフォルトは (12, 26)。
+        dtype (np.dtype): 計算に使うデータ型 (np.float64 または np.float32)。
+
+    Returns:
+        np.ndarray or None: 形状 (len(df), len(spans)) の dtype の配列（列は spans の順）。
+            'Close' 列がない場合は None。
+
+    Examples:
+        >>> ema20, ema50, ema200 = calculate_emas(df, (20, 50, 200))[-1]
+    """
+    if 'Close' not in df.columns:
+        return None
+    return _ema_matrix(df['Close'].to_numpy(), tuple(spans), resolve_dtype(dtype))
+
+def _ema_matrix(values, spans, dtype=np.float64):
+    """複数の期間の EMA を1つの2次元配列としてまとめて計算する。
+
+    `Series.ewm(span=..., adjust=False).mean()` と同じ漸化式
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] (y[0] = x[0]) を、
+    期間ごとに線形フィルタ (scipy.signal.lfilter) で計算します。
+    先頭の NaN は結果も NaN とし、途中に NaN を含む場合は pandas で計算します。
+
+    Args:
+        values (array-like): 終値などの1次元配列。
+        spans (sequence of int): EMA の期間。
+        dtype (np.dtype): 計算に使うデータ型。
+
+    Returns:
+        np.ndarray: 形状 (len(values), len(spans)) の dtype の配列。列は spans の順。
+    """
+    x = np.asarray(values, dtype=dtype)
+    # 期間ごとの列が連続したメモリになるように (期間数, n) で確保し、転置して返す
+    out = np.full((len(spans), len(x)), np.nan, dtype=dtype)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0:
+        return out.T
+
+    start = valid[0]
+    body = x[start:]
+    if len(valid) != len(body):
+        # 途中の NaN は pandas と同じ重み付けにするため、pandas で計算する
+        series = pd.Series(x)
+        for j, span in enumerate(spans):
+            out[j] = series.ewm(span=span, adjust=False).mean().to_numpy()
+        return out.T
+
+    for j, span in enumerate(spans):
+        alpha = 2.0 / (span + 1.0)
+        _ema_filter(body, alpha, body[0], out[j, start:])
+    return out.T
+
+def _ema_filter(values, alpha, initial, out):
+    """y[t] = (1 - alpha) * y[t-1] + alpha * x[t] (y[-1] = initial) を計算して out に書き込む。
+
+    float64 以外の配列は、漸化式の丸め誤差が蓄積しないよう区間ごとに float64 に変換して計算し、
+    結果だけを out のデータ型で保持します。
+    """
+    b, a = [alpha], [1.0, alpha - 1.0]
+    zi = [(1.0 - alpha) * float(initial)]
+    if values.dtype == np.float64:
+        out[:], _ = lfilter(b, a, values, zi=zi)
+        return
+    for i in range(0, len(values), _FILTER_BLOCK):
+        seg = values[i:i + _FILTER_BLOCK].astype(np.float64)
+        out[i:i + len(seg)], zi = lfilter(b, a, seg, zi=zi)
+
+def rolling_mean_std(values, window=20, ddof=1, dtype=np.float64):
+    """配列の移動平均と移動標準偏差を累積和でまとめて計算する。
+
+    `Series.rolling(window).mean()` / `.std(ddof)` と同じ値を O(n) で計算します
+    （差は浮動小数点の丸め程度）。桁落ちを抑えるため、一定の区間ごとに
+    区間の平均を基準値として引いた値の累積和と二乗の累積和から求め、
+    同じ値が window 本以上続く位置は平均をその値、標準偏差を 0 とします。
+
+    Args:
+        values (array-like): 終値などの1次元配列。
+        window (int): 期間。デフォルトは20。
+        ddof (int): 標準偏差の自由度の補正。デフォルトは1（標本標準偏差）。
+        dtype (np.dtype): 結果のデータ型 (np.float64 または np.float32)。
+            np.float32 でも区間ごとの累積和は float64 で計算します。
+
+    Returns:
+        tuple: (np.ndarray, np.ndarray) の dtype の (移動平均, 移動標準偏差)。
+            期間に満たない位置と、期間内に NaN を含む位置は NaN。
+            window <= ddof の場合、標準偏差は全て NaN。
+
+    Raises:
+        ValueError: window が 1 未満の場合。
+
+    Examples:
+        >>> mean, std = rolling_mean_std(df['Close'].to_numpy(), 20)
+    """
+    if window < 1:
+        raise ValueError(f"window には 1 以上を指定してください: {window}")
+    mean, var = _rolling_moments(values, window, ddof, resolve_dtype(dtype))
+    return mean, np.sqrt(var)
+
+def _rolling_mean(values, window, dtype=np.float64):
+    """配列の移動平均だけを `rolling_mean_std` と同じ方法で計算する。"""
+    return _rolling_moments(values, window, None, dtype)[0]
+
+def _rolling_moments(values, window, ddof, dtype=np.float64):
+    """移動平均と移動分散を dtype の配列で計算する（ddof が None の場合、分散は None を返す）。"""
+    x = np.asarray(values, dtype=dtype)
+    n = len(x)
+    mean = np.full(n, np.nan, dtype=dtype)
+    var = None if ddof is None else np.full(n, np.nan, dtype=dtype)
+    with_var = var is not None and window > ddof
+    if n < window:
+        return mean, var
+
+    finite = np.isfinite(x)
+    all_finite = finite.all()
+    xz = x if all_finite else np.where(finite, x, 0.0)
+    flat = []
+    for start in range(window - 1, n, _ROLLING_BLOCK):
+        stop = min(start + _ROLLING_BLOCK, n)
+        # 区間内の計算は dtype によらず float64 で行う（区間の配列はキャッシュに収まる大きさ）
+        seg = xz[start - window + 1:stop].astype(np.float64, copy=False)
+        ref = seg.mean()
+        d = seg - ref
+        m = _window_sums(d, window)
+        m /= window
+        if with_var:
+            s2 = _window_sums(d * d, window)
+            var[start:stop] = (s2 - m * m * window) / (window - ddof)
+        m += ref
+        mean[start:stop] = m
+        # 平均が最後の値とほぼ等しい位置は、同じ値が続いている候補として後で確認する
+        tol = 1e-9 * (np.abs(d).max() + abs(ref)) + 1e-300
+        flat.append(start + np.flatnonzero(np.abs(m - seg[window - 1:]) <= tol))
+
+    if with_var:
+        # 丸め誤差による負の分散は 0 とする
+        np.maximum(var, 0.0, out=var, where=~np.isnan(var))
+
+    # 同じ値が window 本続く位置は、丸め誤差が残らないよう平均をその値、分散を 0 とする
+    flat = np.concatenate(flat)
+    if len(flat):
+        windows = np.lib.stride_tricks.sliding_window_view(xz, window)[flat - window + 1]
+        flat = flat[(windows == windows[:, -1:]).all(axis=1)]
+        mean[flat] = xz[flat]
+        if with_var:
+            var[flat] = 0.0
+
+    if not all_finite:
+        # 期間内に NaN（無限大を含む）がある位置は NaN とする
+        bad = np.concatenate(([0], np.cumsum(~finite)))
+        has_nan = np.ones(n, dtype=bool)
+        has_nan[window - 1:] = bad[window:] - bad[:-window] > 0
+        mean[has_nan] = np.nan
+        if var is not None:
+            var[has_nan] = np.nan
+    return mean, var
+
+def _window_sums(values, window):
+    """長さ window の各区間の和を累積和で計算する（長さ len(values) - window + 1）。"""
+    csum = np.cumsum(values)
+    sums = csum[window - 1:].copy()
+    sums[1:] -= csum[:-window]
+    return sums
@@ -5,6 +5,15 @@
 
 from .top_down import analyze_top_down
 from .top_down import analyze_top_down
-from .short_trend_predictor import analyze_short_trend
+from .short_trend_predictor import (
+    analyze_short_trend, analyze_short_trend_series, evaluate_short_trend, evaluate_short_trend_arrays,
+    build_short_trend_features, trend_matrix, SHORT_TREND_PARAMS
+)
+from .middle_trend_predictor import analyze_middle_trend, MIDDLE_TREND_PARAMS
+from .long_trend_predictor import analyze_long_trend, LONG_TREND_PARAMS
+from .params import resolve_params
 
-__all__ = ['analyze_top_down', 'analyze_short_trend']
+__all__ = ['analyze_top_down', 'analyze_short_trend', 'analyze_short_trend_series', 'evaluate_short_trend',
+           'evaluate_short_trend_arrays', 'build_short_trend_features', 'trend_matrix', 'SHORT_TREND_PARAMS',
+           'analyze_middle_trend', 'MIDDLE_TREND_PARAMS', 'analyze_long_trend', 'LONG_TREND_PARAMS',
+           'resolve_params']
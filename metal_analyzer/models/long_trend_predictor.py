@@ -9,10 +9,20 @@
 
 import pandas as pd
 import numpy as np
-from ..indicators.sma import calculate_ema
+from ..indicators.sma import calculate_ema, calculate_emas
+from ..core.store import as_frame
+from ..core.instrumentation import instrumented
+from .params import resolve_params
+
+# 判定基準のデフォルト値（analyze_long_trend の params 引数で上書きできます）
+LONG_TREND_PARAMS = {
+    'gsr_high': 80,   # Dashboard 2: 銀が歴史的割安とみなす金銀レシオ
+    'gsr_low': 60,    # Dashboard 2: 銀の割安感が解消したとみなす金銀レシオ
+}
 
 def _ensure_flat_columns(df):
     """MultiIndexのカラムを持つDataFrameをフラットにするヘルパー関数"""
+    df = as_frame(df)
     if df is None or df.empty:
         return df
     if isinstance(df.columns, pd.MultiIndex):
@@ -20,19 +30,23 @@ def _ensure_flat_columns(df):
         df.columns = df.columns.get_level_values(0)
     return df
 
-def analyze_long_trend(monthly_gold_df, monthly_silver_df, monthly_platinum_df, monthly_dxy_df, monthly_tips_df):
+@instrumented('models.analyze_long_trend')
+def analyze_long_trend(monthly_gold_df, monthly_silver_df, monthly_platinum_df, monthly_dxy_df, monthly_tips_df,
+                       params=None):
     """長期的なトレンド分析（池水雄一氏のメソッドに基づく）を実行する。
 
     Args:
-        monthly_gold_df (pd.DataFrame): 金の月足データ。
-        monthly_silver_df (pd.DataFrame): 銀の月足データ。
-        monthly_platinum_df (pd.DataFrame): プラチナの月足データ。
-        monthly_dxy_df (pd.DataFrame): ドルインデックス (DXY) の月足データ。
-        monthly_tips_df (pd.DataFrame): TIPS ETF (TIP) の月足データ。
+        monthly_gold_df (pd.DataFrame or OHLCVStore): 金の月足データ。
+        monthly_silver_df (pd.DataFrame or OHLCVStore): 銀の月足データ。
+        monthly_platinum_df (pd.DataFrame or OHLCVStore): プラチナの月足データ。
+        monthly_dxy_df (pd.DataFrame or OHLCVStore): ドルインデックス (DXY) の月足データ。
+        monthly_tips_df (pd.DataFrame or OHLCVStore): TIPS ETF (TIP) の月足データ。
+        params (dict, optional): 判定基準。LONG_TREND_PARAMS の一部のキーを上書きします。
 
     Returns:
         dict: 分析結果を含む辞書。
     """
+    p = resolve_params(LONG_TREND_PARAMS, params)
     results = {
         'dashboard_1_currency': '不明',
         'dashboard_2_ratio': '不明',
@@ -58,8 +72,7 @@ def analyze_long_trend(monthly_gold_df, monthly_silver_df, monthly_platinum_df,
     # ロジック: 金の長期EMA(12, 24ヶ月)と、ドルインデックスのトレンド比較。
     # =========================================================================
     g_close = g_df['Close'].iloc[-1]
-    g_ema12 = calculate_ema(g_df, 12).iloc[-1]
-    g_ema24 = calculate_ema(g_df, 24).iloc[-1]
+    g_ema12, g_ema24 = calculate_emas(g_df, (12, 24))[-1]
     
     gold_trend = "中立"
     if g_close > g_ema12 > g_ema24:
@@ -89,9 +102,9 @@ def analyze_long_trend(monthly_gold_df, monthly_silver_df, monthly_platinum_df,
     if s_df is not None and not s_df.empty:
         s_close = s_df['Close'].iloc[-1]
         gsr = g_close / s_close
-        if gsr > 80:
+        if gsr > p['gsr_high']:
             ratio_comment.append(f"銀が歴史的割安 (GSR: {gsr:.1f})")
-        elif gsr < 60:
+        elif gsr < p['gsr_low']:
             ratio_comment.append(f"銀の割安感解消 (GSR: {gsr:.1f})")
         else:
             ratio_comment.append(f"GSR適正圏 (GSR: {gsr:.1f})")
@@ -9,16 +9,28 @@
 
 import pandas as pd
 import numpy as np
-from ..indicators.sma import calculate_ema, calculate_sma
+from ..indicators.sma import calculate_emas, calculate_sma
 from ..indicators.rsi import calculate_rsi
 from ..indicators.bollinger_bands import calculate_bollinger_bands
+from ..core.store import as_frame
+from ..core.instrumentation import instrumented
+from .params import resolve_params
 
-def analyze_middle_trend(weekly_df, daily_df):
+# 判定基準のデフォルト値（analyze_middle_trend の params 引数で上書きできます）
+MIDDLE_TREND_PARAMS = {
+    'bb_expansion': 1.3,   # Dashboard 3: 高ボラティリティとみなすバンド幅の20日平均に対する倍率
+    'bb_squeeze': 0.8,     # Dashboard 3: 収縮とみなすバンド幅の20日平均に対する倍率
+}
+
+@instrumented('models.analyze_middle_trend')
+def analyze_middle_trend(weekly_df, daily_df, cache=None, params=None):
     """中期的なトレンド分析（YouTube動画で解説されたロジックに基づく）を実行する。
 
     Args:
-        weekly_df (pd.DataFrame): 週足データ。
-        daily_df (pd.DataFrame): 日足データ。
+        weekly_df (pd.DataFrame or OHLCVStore): 週足データ。
+        daily_df (pd.DataFrame or OHLCVStore): 日足データ。
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+        params (dict, optional): 判定基準。MIDDLE_TREND_PARAMS の一部のキーを上書きします。
 
     Returns:
         dict: 分析結果を含む辞書。
@@ -28,6 +40,7 @@ def analyze_middle_trend(weekly_df, daily_df):
             - dashboard_4_strategy: 戦略的エントリー（押し目買い判定）
             - final_prediction: 総合コメント
     """
+    p = resolve_params(MIDDLE_TREND_PARAMS, params)
     results = {
         'dashboard_1_weekly': '不明',
         'dashboard_2_daily': '不明',
@@ -36,6 +49,7 @@ def analyze_middle_trend(weekly_df, daily_df):
         'final_prediction': ''
     }
 
+    weekly_df, daily_df = as_frame(weekly_df), as_frame(daily_df)
     if weekly_df.empty or daily_df.empty:
         results['final_prediction'] = "十分なデータがありません。"
         return results
@@ -49,14 +63,16 @@ def analyze_middle_trend(weekly_df, daily_df):
         daily_df = daily_df.copy()
         daily_df.columns = daily_df.columns.get_level_values(0)
 
+    emas = cache.emas if cache is not None else calculate_emas
+    rsi = cache.rsi if cache is not None else calculate_rsi
+    bollinger = cache.bollinger if cache is not None else calculate_bollinger_bands
+
     # =========================================================================
     # --- Dashboard 1: 週足構造 (Deep Snow / 根雪) ---
     # 役割: 長期的な上昇トレンドが崩れていないかを確認する。
     # ロジック: 週足EMA (13, 26, 52) の並び順。
     # =========================================================================
-    w_ema13 = calculate_ema(weekly_df, 13).iloc[-1]
-    w_ema26 = calculate_ema(weekly_df, 26).iloc[-1]
-    w_ema52 = calculate_ema(weekly_df, 52).iloc[-1]
+    w_ema13, w_ema26, w_ema52 = emas(weekly_df, (13, 26, 52))[-1]
     w_close = weekly_df['Close'].iloc[-1]
 
     is_weekly_uptrend = False
@@ -80,13 +96,12 @@ def analyze_middle_trend(weekly_df, daily_df):
     # 役割: 直近の下落の強さを測る。
     # ロジック: 日足RSIとMACD (EMA12 - EMA26)。
     # =========================================================================
-    d_rsi = calculate_rsi(daily_df, 14).iloc[-1]
+    d_rsi = rsi(daily_df, 14).iloc[-1]
     
-    d_ema12 = calculate_ema(daily_df, 12)
-    d_ema26 = calculate_ema(daily_df, 26)
-    d_macd = d_ema12 - d_ema26
-    current_macd = d_macd.iloc[-1]
-    prev_macd = d_macd.iloc[-2]
+    d_emas = emas(daily_df, (12, 26))
+    d_macd = d_emas[:, 0] - d_emas[:, 1]
+    current_macd = d_macd[-1]
+    prev_macd = d_macd[-2]
     
     is_daily_oversold = d_rsi < 35
     is_momentum_down = current_macd < prev_macd
@@ -108,17 +123,17 @@ def analyze_middle_trend(weekly_df, daily_df):
     # 役割: 「ウォーシュ・モード」のような高ボラティリティ環境かどうかを判定。
     # ロジック: 日足ボリンジャーバンド幅の拡大率。
     # =========================================================================
-    mb, ub, lb = calculate_bollinger_bands(daily_df, window=20, num_std=2)
+    mb, ub, lb = bollinger(daily_df, 20, 2)
     if mb is not None:
         bandwidth = (ub - lb) / mb
         # 過去20日間の平均バンド幅と比較
         avg_bandwidth = bandwidth.rolling(window=20).mean().iloc[-1]
         current_bandwidth = bandwidth.iloc[-1]
         
-        # 現在のバンド幅が平均の1.3倍以上なら高ボラティリティ
-        if current_bandwidth > avg_bandwidth * 1.3:
+        # 現在のバンド幅が平均の1.3倍 (bb_expansion) 以上なら高ボラティリティ
+        if current_bandwidth > avg_bandwidth * p['bb_expansion']:
             results['dashboard_3_volatility'] = '⚠️ 高ボラティリティ (Warsh Mode)'
-        elif current_bandwidth < avg_bandwidth * 0.8:
+        elif current_bandwidth < avg_bandwidth * p['bb_squeeze']:
             results['dashboard_3_volatility'] = '収縮 (Squeeze)'
         else:
             results['dashboard_3_volatility'] = '通常 (Normal)'
@@ -0,0 +1,28 @@
+"""分析モデルの判定基準（パラメータ）を扱うモジュール。
+
+各モデルは判定に使う閾値をモジュール定数の辞書（SHORT_TREND_PARAMS など）として持ち、
+分析関数の params 引数で一部を上書きできます。`metal_analyzer.optimize` の
+グリッドサーチで求めたパラメータをそのまま渡すことができます。
+"""
+
+
+def resolve_params(defaults, params=None):
+    """デフォルトのパラメータに指定されたパラメータを上書きした辞書を返す。
+
+    Args:
+        defaults (dict): モデルのデフォルトのパラメータ。
+        params (dict, optional): 上書きするパラメータ。
+
+    Returns:
+        dict: 上書き後のパラメータ。
+
+    Raises:
+        ValueError: defaults にないパラメータが指定された場合。
+    """
+    if not params:
+        return defaults
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"未対応のパラメータです: {', '.join(sorted(unknown))}"
+                         f"（指定可能: {', '.join(defaults)}）")
+    return dict(defaults, **params)
@@ -6,11 +6,41 @@
 
 import pandas as pd
 import numpy as np
-from ..indicators.sma import calculate_ema, calculate_sma
+from ..indicators.sma import calculate_sma, calculate_emas
 from ..indicators.rsi import calculate_rsi
-from ..patterns import detect_double_top, detect_double_bottom
+from ..patterns import PATTERN_DETECTORS, detect_patterns
+from ..patterns.result import BEARISH_REVERSALS, BULLISH_REVERSALS, neckline_key
+from ..core.store import as_frame
+from ..core.instrumentation import instrumented
+from ..core.report import format_trend_matrix
+from .params import resolve_params
 
-def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
+# evaluate_short_trend が参照する特徴量の一覧
+SHORT_TREND_FEATURES = (
+    'h4_close', 'h4_ema20', 'h4_ema50', 'h4_ema200',
+    'h1_close', 'h1_ema20', 'h1_ema200', 'h1_rsi',
+    'recent_range', 'avg_range', 'h1_low_50', 'h1_high_50',
+    'is_pinbar', 'is_bullish_divergence',
+)
+
+# 最終スコアの判定基準（score <= CRASH_THRESHOLD で大暴落加速、score >= SURGE_THRESHOLD で急騰加速）
+# backtest.calibration.calibrate_thresholds で過去のスコアから検証できます。
+CRASH_THRESHOLD = -6
+SURGE_THRESHOLD = 5
+
+# 判定基準のデフォルト値（analyze_short_trend などの params 引数で上書きできます）
+SHORT_TREND_PARAMS = {
+    'ema_deviation': 0.005,       # Dashboard 2: 勢いが強いとみなす1時間足EMA20からの乖離率
+    'range_acceleration': 1.5,    # Dashboard 3: 加速とみなす直近3本の値幅の、20本平均に対する倍率
+    'ema200_band': 0.002,         # Dashboard 4: 200EMAサポートとみなす200EMAからの乖離率
+    'crash_threshold': CRASH_THRESHOLD,
+    'surge_threshold': SURGE_THRESHOLD,
+    # Dashboard 4: ダブルトップ/ボトム以外の反転パターン（三尊・トリプルトップなど）もスコアに反映するか
+    'score_reversal_patterns': False,
+}
+
+@instrumented('models.analyze_short_trend')
+def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None, cache=None, params=None):
     """短期的な4つのダッシュボード指標に基づいたトレンド分析を実行する。
 
     以下の4つの観点からスコアリングを行います：
@@ -20,11 +50,13 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
     4. センチメント (重要ライン・パターン)
 
     Args:
-        daily_df (pd.DataFrame): 日足データ。
-        h4_df (pd.DataFrame): 4時間足データ。
-        h1_df (pd.DataFrame): 1時間足データ。
+        daily_df (pd.DataFrame or OHLCVStore): 日足データ。
+        h4_df (pd.DataFrame or OHLCVStore): 4時間足データ。
+        h1_df (pd.DataFrame or OHLCVStore): 1時間足データ。
         patterns (dict, optional): 検知されたチャートパターン情報。
             例: {'double_top': True, 'neckline': 2500.0}
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+        params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
 
     Returns:
         dict: 分析結果を含む辞書。
@@ -32,31 +64,120 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
             - final_prediction: 最終的な方向性予測
             - risk_level: リスク評価
             - comment: 詳細コメント
+            - trend_score, momentum_score, pattern_risk, volatility_score:
+              各ダッシュボードのスコアへの寄与（合計が score）
+            - accel_factor: ボラティリティによるスコア倍率
+            - score: 最終スコア（CRASH_THRESHOLD 以下で大暴落加速、SURGE_THRESHOLD 以上で急騰加速）
     """
-    results = {
+    daily_df, h4_df, h1_df = as_frame(daily_df), as_frame(h4_df), as_frame(h1_df)
+
+    # データ不足チェック
+    if daily_df.empty or h4_df.empty or h1_df.empty:
+        results = _empty_results()
+        results['comment'] = "十分なデータがありません。"
+        return results
+
+    emas = cache.emas if cache is not None else calculate_emas
+    rsi = cache.rsi if cache is not None else calculate_rsi
+
+    # 4時間足: パーフェクトオーダー判定用の EMA 20/50/200
+    h4_ema20, h4_ema50, h4_ema200 = emas(h4_df, (20, 50, 200))[-1]
+    h4_close = h4_df['Close'].iloc[-1]
+
+    # 1時間足: EMA乖離・値幅・直近高安値・RSI
+    h1_ema20, h1_ema200 = emas(h1_df, (20, 200))[-1]
+    h1_close = h1_df['Close'].iloc[-1]
+
+    # 値幅は必要な末尾だけを計算する（ライブ更新で毎回呼ばれても全体を走査しない）
+    h1_range = h1_df['High'].tail(20) - h1_df['Low'].tail(20)
+    recent_range = h1_range.tail(3).mean()
+    avg_range = h1_range.mean()
+
+    h1_low_50 = h1_df['Low'].tail(50).min()
+    h1_high_50 = h1_df['High'].tail(50).max()
+
+    rsi_series = rsi(h1_df, 14)
+    h1_rsi = rsi_series.iloc[-1]
+
+    # ピンバー判定 (下ヒゲが実体の2倍以上)
+    last_candle = h1_df.iloc[-1]
+    body_size = abs(last_candle['Close'] - last_candle['Open'])
+    lower_shadow = min(last_candle['Close'], last_candle['Open']) - last_candle['Low']
+    is_pinbar = (lower_shadow > body_size * 2.0) and (lower_shadow > 0)
+
+    # RSIダイバージェンス (簡易版: 価格は安値更新、RSIは切り上がり)
+    # 直近15本の最安値時点のRSIと、現在のRSIを比較
+    recent_low_idx = h1_df['Low'].tail(15).idxmin()
+    recent_low_rsi = rsi_series.loc[recent_low_idx]
+    # 現在価格が直近安値以下、かつ現在のRSIが当時のRSIより高い (+3ポイント以上)
+    is_bullish_divergence = (h1_close <= h1_df.loc[recent_low_idx, 'Low']) and (h1_rsi > recent_low_rsi + 3.0)
+
+    features = {
+        'h4_close': h4_close,
+        'h4_ema20': h4_ema20,
+        'h4_ema50': h4_ema50,
+        'h4_ema200': h4_ema200,
+        'h1_close': h1_close,
+        'h1_ema20': h1_ema20,
+        'h1_ema200': h1_ema200,
+        'h1_rsi': h1_rsi,
+        'recent_range': recent_range,
+        'avg_range': avg_range,
+        'h1_low_50': h1_low_50,
+        'h1_high_50': h1_high_50,
+        'is_pinbar': is_pinbar,
+        'is_bullish_divergence': is_bullish_divergence,
+    }
+    return evaluate_short_trend(features, patterns, params)
+
+def _empty_results():
+    """判定前の初期状態の結果辞書を返す。"""
+    return {
         'dashboard_1_trend': '不明',
         'dashboard_2_momentum': '不明',
         'dashboard_3_volatility': '不明',
         'dashboard_4_sentiment': '不明',
         'final_prediction': '様子見',
         'risk_level': '中',
-        'comment': ''
+        'comment': '',
+        'trend_score': 0,
+        'momentum_score': 0,
+        'pattern_risk': 0,
+        'volatility_score': 0.0,
+        'accel_factor': 1.0,
+        'score': np.nan,
     }
 
-    # データ不足チェック
-    if daily_df.empty or h4_df.empty or h1_df.empty:
-        results['comment'] = "十分なデータがありません。"
-        return results
+def evaluate_short_trend(features, patterns=None, params=None):
+    """計算済みの特徴量から4つのダッシュボードと最終予測を判定する。
+
+    `analyze_short_trend` の判定ロジック本体です。インジケーターの計算を
+    含まないため、バックテストなどで事前計算した特徴量を時点ごとに
+    渡して評価する用途にも使用できます。
+
+    Args:
+        features (Mapping): `SHORT_TREND_FEATURES` の各キーを持つ特徴量。
+            `build_short_trend_features` が返す DataFrame の1行に相当します。
+        patterns (dict, optional): 検知されたチャートパターン情報（`to_patterns_dict` の戻り値）。
+            ダブルトップ/ボトムが判定に使われます。params の 'score_reversal_patterns' が True の
+            場合は、三尊・トリプルトップなどの反転パターンも同様に判定に使われます。
+        params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+
+    Returns:
+        dict: `analyze_short_trend` と同じ形式の分析結果。
+    """
+    p = resolve_params(SHORT_TREND_PARAMS, params)
+    results = _empty_results()
 
     # =========================================================================
     # --- Dashboard 1: 長期トレンド分析 (EMAパーフェクトオーダー) ---
     # 役割: 相場の「大きな流れ」がどちらを向いているかを判定します。
     # ロジック: 20日, 50日, 200日のEMA（指数平滑移動平均）の並び順を確認。
     # =========================================================================
-    h4_ema20 = calculate_ema(h4_df, 20).iloc[-1]
-    h4_ema50 = calculate_ema(h4_df, 50).iloc[-1]
-    h4_ema200 = calculate_ema(h4_df, 200).iloc[-1]
-    h4_close = h4_df['Close'].iloc[-1]
+    h4_ema20 = features['h4_ema20']
+    h4_ema50 = features['h4_ema50']
+    h4_ema200 = features['h4_ema200']
+    h4_close = features['h4_close']
 
     # 下落のパーフェクトオーダー: 短期 < 中期 < 長期 の順で、価格が一番下にある状態
     if h4_close < h4_ema20 < h4_ema50 < h4_ema200:
@@ -72,14 +193,14 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
     # 役割: 現在の価格が「行き過ぎ」ていないか、あるいは強い勢いがあるかを判定します。
     # ロジック: 1時間足の現在値とEMA 20 deltas を計算。
     # =========================================================================
-    h1_ema20 = calculate_ema(h1_df, 20).iloc[-1]
-    h1_close = h1_df['Close'].iloc[-1]
+    h1_ema20 = features['h1_ema20']
+    h1_close = features['h1_close']
     dist_ema20 = (h1_close - h1_ema20) / h1_ema20
     
-    # 0.5% 以上の乖離を一つの基準として勢いを判定
-    if dist_ema20 < -0.005:
+    # 0.5% (ema_deviation) 以上の乖離を一つの基準として勢いを判定
+    if dist_ema20 < -p['ema_deviation']:
         results['dashboard_2_momentum'] = '下落の勢い強い'
-    elif dist_ema20 > 0.005:
+    elif dist_ema20 > p['ema_deviation']:
         results['dashboard_2_momentum'] = '上昇の勢い強い'
     else:
         results['dashboard_2_momentum'] = '穏やか'
@@ -89,11 +210,11 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
     # 役割: 相場が「動き始めた」タイミング（爆発力）を検知します。
     # ロジック: 直近3本のローソク足の平均値幅を、過去20本の平均値幅と比較。
     # =========================================================================
-    recent_range = (h1_df['High'] - h1_df['Low']).tail(3).mean()
-    avg_range = (h1_df['High'] - h1_df['Low']).tail(20).mean()
+    recent_range = features['recent_range']
+    avg_range = features['avg_range']
     
-    # 値幅が平均の1.5倍を超えたら「加速状態」とみなす
-    if recent_range > avg_range * 1.5:
+    # 値幅が平均の1.5倍 (range_acceleration) を超えたら「加速状態」とみなす
+    if recent_range > avg_range * p['range_acceleration']:
         results['dashboard_3_volatility'] = 'ブレイクアウト/加速中'
         accel_factor = 1.5 # 予測スコアに倍率をかける
     else:
@@ -106,48 +227,35 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
     # ロジック: 直近50本の高値・安値の更新、およびダブルトップ等のパターン検知。
     #          さらに、反発（リバーサル）の予兆として「200EMAサポート」「RSIダイバージェンス」「ピンバー」「ダブルボトム」も監視。
     # =========================================================================
-    h1_low_50 = h1_df['Low'].tail(50).min()
-    h1_high_50 = h1_df['High'].tail(50).max()
-    
-    # 追加指標の計算 (RSI, 200EMA, Pinbar)
-    rsi_series = calculate_rsi(h1_df, 14)
-    h1_rsi = rsi_series.iloc[-1]
-    
-    h1_ema200 = calculate_ema(h1_df, 200).iloc[-1]
-    
-    # ピンバー判定 (下ヒゲが実体の2倍以上)
-    last_candle = h1_df.iloc[-1]
-    body_size = abs(last_candle['Close'] - last_candle['Open'])
-    lower_shadow = min(last_candle['Close'], last_candle['Open']) - last_candle['Low']
-    is_pinbar = (lower_shadow > body_size * 2.0) and (lower_shadow > 0)
+    h1_low_50 = features['h1_low_50']
+    h1_high_50 = features['h1_high_50']
+    h1_rsi = features['h1_rsi']
+    h1_ema200 = features['h1_ema200']
+    is_pinbar = features['is_pinbar']
+    is_bullish_divergence = features['is_bullish_divergence']
 
     # 200EMAサポート判定 (価格が200EMA付近にあるか)
-    # 現在価格が200EMAの上下0.2%以内にあり、かつRSIが極端な売られすぎでない
+    # 現在価格が200EMAの上下0.2% (ema200_band) 以内にあり、かつRSIが極端な売られすぎでない
     dist_ema200 = (h1_close - h1_ema200) / h1_ema200
-    is_200ema_support = (abs(dist_ema200) < 0.002)
-    
-    # RSIダイバージェンス (簡易版: 価格は安値更新、RSIは切り上がり)
-    # 直近15本の最安値時点のRSIと、現在のRSIを比較
-    recent_low_idx = h1_df['Low'].tail(15).idxmin()
-    recent_low_rsi = rsi_series.loc[recent_low_idx]
-    # 現在価格が直近安値以下、かつ現在のRSIが当時のRSIより高い (+3ポイント以上)
-    is_bullish_divergence = (h1_close <= h1_df.loc[recent_low_idx, 'Low']) and (h1_rsi > recent_low_rsi + 3.0)
+    is_200ema_support = (abs(dist_ema200) < p['ema200_band'])
 
     pattern_risk = 0
     sentiment_desc = 'レンジ内'
 
     # チャートパターンによる判定 (優先度: 高)
-    detected_top = patterns.get('double_top') if patterns else False
-    detected_bottom = patterns.get('double_bottom') if patterns else False
+    # 'score_reversal_patterns' を指定した場合は、三尊・トリプルトップなどの反転パターンも同様に評価する
+    top_kinds, bottom_kinds = _scored_reversals(p)
+    top_kind = _first_detected(patterns, top_kinds)
+    bottom_kind = _first_detected(patterns, bottom_kinds)
 
-    if detected_top:
-        neckline = patterns.get('neckline_top', 0)
+    if top_kind:
+        neckline = patterns.get(neckline_key(top_kind), 0)
         if h1_close < neckline:
             sentiment_desc = '重要ライン割れ (暴落確定)'
             pattern_risk = -5
         else:
             sentiment_desc = '重要ラインでの攻防 (Top)'
-    elif detected_bottom:
+    elif bottom_kind == 'double_bottom':
         neckline = patterns.get('neckline_bottom', 0)
         if h1_close > neckline:
             sentiment_desc = 'Wボトム ネックライン上抜け (反発確定)'
@@ -155,6 +263,14 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
         else:
              sentiment_desc = 'Wボトム形成中 (反発期待)'
              pattern_risk = 2
+    elif bottom_kind:
+        neckline = patterns.get(neckline_key(bottom_kind), 0)
+        if h1_close > neckline:
+            sentiment_desc = '底打ちパターン ネックライン上抜け (反発確定)'
+            pattern_risk = 5
+        else:
+            sentiment_desc = '底打ちパターン形成中 (反発期待)'
+            pattern_risk = 2
     else:
         # 特別なパターンがない場合は、各種反発シグナルなどを評価
         
@@ -183,25 +299,35 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
     # --- 最終分析アルゴリズム (スコアリングシステム) ---
     # 役割: 4つのダッシュボードの結果を統合し、最終分析結果を導き出します。
     # =========================================================================
-    score = 0
     # 1. 長期トレンドの影響 (配点: +/- 3)
-    if '下降' in results['dashboard_1_trend']: score -= 3
-    if '上昇' in results['dashboard_1_trend']: score += 3
+    trend_score = 0
+    if '下降' in results['dashboard_1_trend']: trend_score -= 3
+    if '上昇' in results['dashboard_1_trend']: trend_score += 3
     
     # 2. モメンタムの影響 (配点: +/- 1)
-    if '下落' in results['dashboard_2_momentum']: score -= 1
-    if '上昇' in results['dashboard_2_momentum']: score += 1
+    momentum_score = 0
+    if '下落' in results['dashboard_2_momentum']: momentum_score -= 1
+    if '上昇' in results['dashboard_2_momentum']: momentum_score += 1
     
     # 3. センチメントと、ボラティリティによる増幅
     # (score + 重要ライン割れリスク) に対して、値幅が拡大していれば最大1.5倍の加重を行う
-    score = (score + pattern_risk) * accel_factor
+    base_score = trend_score + momentum_score + pattern_risk
+    score = base_score * accel_factor
+
+    # 各ダッシュボードの寄与（合計が score になる。ボラティリティは増幅による増減分）
+    results['trend_score'] = trend_score
+    results['momentum_score'] = momentum_score
+    results['pattern_risk'] = pattern_risk
+    results['volatility_score'] = score - base_score
+    results['accel_factor'] = accel_factor
+    results['score'] = score
 
     # スコアに基づいた最終判定の分類
-    if score <= -6:
+    if score <= p['crash_threshold']:
         results['final_prediction'] = '⚠️ 大暴落加速 (Great Crash Acceleration)'
         results['risk_level'] = '極めて高い'
         results['comment'] = "長期下降トレンド、重要ライン割れ、ボラティリティ拡大が全て揃いました。トレンドの底が見えません。"
-    elif score >= 5: # 基準を緩和 (6 -> 5) し、反発を捉えやすくする
+    elif score >= p['surge_threshold']: # 基準を緩和 (6 -> 5) し、反発を捉えやすくする
         results['final_prediction'] = '🚀 急騰加速 (Surge Acceleration)'
         results['risk_level'] = '高い'
         results['comment'] = "レジスタンス突破、または強力なサポートからの急反発（V字回復）が発生しています。"
@@ -216,61 +342,423 @@ def analyze_short_trend(daily_df, h4_df, h1_df, patterns=None):
 
     return results
 
-def analyze_timeframe_details(timeframes):
-    """各時間足の詳細分析レポートを生成する。
+@instrumented('models.build_short_trend_features')
+def build_short_trend_features(h4_df, h1_df, cache=None):
+    """1時間足の各バー時点における短期トレンド分析の特徴量を一括計算する。
+
+    各行の値は、そのバーまでの1時間足（およびそこから再集計した4時間足）だけを
+    `analyze_short_trend` に渡した場合と同じになるように計算されます。
+    形成途中の4時間足は、その時点の1時間足終値を終値とする未確定バーとして扱い、
+    EMAは直前の確定バーのEMAから1ステップだけ進めた値を使用します。
+
+    インジケーターは全期間に対して1回だけ計算されるため、ウォークフォワード
+    検証などで時点ごとにデータを切り出して再計算する必要がなくなります。
+
+    Args:
+        h4_df (pd.DataFrame or OHLCVStore): 4時間足データ（通常は h1_df を4時間で再集計したもの）。
+        h1_df (pd.DataFrame or OHLCVStore): 1時間足データ。
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+
+    Returns:
+        pd.DataFrame: h1_df と同じインデックスを持ち、`SHORT_TREND_FEATURES` の
+            各列を持つデータフレーム。
+    """
+    h4_df, h1_df = as_frame(h4_df), as_frame(h1_df)
+    if h1_df.empty:
+        return pd.DataFrame(index=h1_df.index, columns=list(SHORT_TREND_FEATURES))
+
+    emas = cache.emas if cache is not None else calculate_emas
+    rsi = cache.rsi if cache is not None else calculate_rsi
+
+    close = h1_df['Close']
+    high = h1_df['High']
+    low = h1_df['Low']
+    open_ = h1_df['Open']
+
+    features = pd.DataFrame(index=h1_df.index)
+
+    # --- 4時間足 (未確定バーを含む時点評価) ---
+    h4_close = h4_df['Close'].to_numpy(dtype=float)
+    pos = h4_df.index.searchsorted(h1_df.index, side='right') - 1
+    prev = pos - 1
+    h1_close = close.to_numpy(dtype=float)
+    h4_emas = emas(h4_df, (20, 50, 200))
+    for j, span in enumerate((20, 50, 200)):
+        h4_ema = h4_emas[:, j]
+        prev_ema = np.where(prev >= 0, h4_ema[np.clip(prev, 0, None)], np.nan)
+        alpha = 2.0 / (span + 1.0)
+        asof = np.where(prev >= 0, prev_ema + alpha * (h1_close - prev_ema), h1_close)
+        features[f'h4_ema{span}'] = np.where(pos >= 0, asof, np.nan)
+    features['h4_close'] = np.where(pos >= 0, h1_close, np.nan)
+
+    # --- 1時間足 ---
+    features['h1_close'] = close
+    h1_emas = emas(h1_df, (20, 200))
+    features['h1_ema20'] = h1_emas[:, 0]
+    features['h1_ema200'] = h1_emas[:, 1]
+    rsi_series = rsi(h1_df, 14)
+    features['h1_rsi'] = rsi_series
+
+    bar_range = high - low
+    features['recent_range'] = bar_range.rolling(3, min_periods=1).mean()
+    features['avg_range'] = bar_range.rolling(20, min_periods=1).mean()
+    features['h1_low_50'] = low.rolling(50, min_periods=1).min()
+    features['h1_high_50'] = high.rolling(50, min_periods=1).max()
+
+    body_size = (close - open_).abs()
+    lower_shadow = np.minimum(close, open_) - low
+    features['is_pinbar'] = (lower_shadow > body_size * 2.0) & (lower_shadow > 0)
+
+    # 直近15本の最安値バー（同値の場合は最初のバー）の位置を求める
+    window = 15
+    low_values = low.to_numpy(dtype=float)
+    padded = np.concatenate([np.full(window - 1, np.inf), np.where(np.isnan(low_values), np.inf, low_values)])
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    low_pos = np.arange(len(low_values)) - (window - 1) + windows.argmin(axis=1)
+    has_low = np.isfinite(windows.min(axis=1))
+    low_pos = np.where(has_low, low_pos, 0)
+    rsi_values = rsi_series.to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        features['is_bullish_divergence'] = (
+            has_low
+            & (h1_close <= low_values[low_pos])
+            & (rsi_values > rsi_values[low_pos] + 3.0)
+        )
+
+    return features[list(SHORT_TREND_FEATURES)]
+
+def _scored_reversals(p):
+    """スコアに反映する (弱気, 強気) の反転パターンの種類を返す。"""
+    if p['score_reversal_patterns']:
+        return BEARISH_REVERSALS, BULLISH_REVERSALS
+    return BEARISH_REVERSALS[:1], BULLISH_REVERSALS[:1]
+
+def _first_detected(patterns, kinds):
+    """kinds のうち patterns で検知されている最初のパターンの種類を返す（なければ None）。"""
+    if not patterns:
+        return None
+    return next((kind for kind in kinds if patterns.get(kind)), None)
+
+def _pattern_column(patterns, key, index, default):
+    """パターン情報から指定キーの値を1時間足インデックスに揃えた配列として取り出す。"""
+    if patterns is None or key not in patterns:
+        return np.full(len(index), default)
+    value = patterns[key]
+    if isinstance(value, pd.Series):
+        return value.reindex(index).fillna(default).to_numpy()
+    value = np.asarray(value)
+    if value.ndim == 0:
+        return np.full(len(index), value.item() if value.item() is not None else default)
+    return np.where(pd.isna(value), default, value)
+
+# analyze_short_trend_series の判定ラベル（evaluate_short_trend_arrays が返すコードの順）
+_TREND_LABELS = ['パーフェクトオーダー (強気下降)', 'パーフェクトオーダー (強気上昇)', 'トレンド転換点/混在']
+_MOMENTUM_LABELS = ['下落の勢い強い', '上昇の勢い強い', '穏やか']
+_VOLATILITY_LABELS = ['ブレイクアウト/加速中', '安定']
+_SENTIMENT_LABELS = [
+    '重要ライン割れ (暴落確定)', '重要ラインでの攻防 (Top)',
+    'Wボトム ネックライン上抜け (反発確定)', 'Wボトム形成中 (反発期待)',
+    '底打ちパターン ネックライン上抜け (反発確定)', '底打ちパターン形成中 (反発期待)',
+    '強力な反発シグナル (Pinbar + Support)', 'RSIダイバージェンス (底打ち示唆)',
+    '200EMAサポート (押し目)', '新安値更新', '新高値更新', 'レンジ内']
+_SENTIMENT_RISK = np.array([-5, 0, 5, 2, 5, 2, 4, 3, 2, -2, 2, 0])
+_PREDICTIONS = [
+    ('⚠️ 大暴落加速 (Great Crash Acceleration)', '極めて高い',
+     "長期下降トレンド、重要ライン割れ、ボラティリティ拡大が全て揃いました。トレンドの底が見えません。"),
+    ('🚀 急騰加速 (Surge Acceleration)', '高い',
+     "レジスタンス突破、または強力なサポートからの急反発（V字回復）が発生しています。"),
+    ('続落注意', '中',
+     "下落バイアスが強いですが、反発の予兆がないかセンチメント（ピンバー等）を注視してください。"),
+    ('底堅い/反発', '低',
+     "買い圧力が優勢です。押し目買いやレンジ下限での反発の好機となる可能性があります。"),
+]
+
+def evaluate_short_trend_arrays(features, patterns=None, params=None):
+    """`evaluate_short_trend` の判定を特徴量の配列に対して列演算で行う。
+
+    params の各値には配列も指定でき、特徴量の配列とブロードキャストされます。
+    例えば形状 (k, 1) のパラメータを渡すと、k 通りの判定基準の結果を
+    形状 (k, n) の配列として1回で計算できます（`metal_analyzer.optimize` が使用）。
+
+    Args:
+        features (Mapping): `SHORT_TREND_FEATURES` の各キーに長さ n の配列を持つ特徴量。
+        patterns (Mapping, optional): `to_patterns_dict` と同じキーに長さ n の配列を持つ
+            チャートパターン情報。検知フラグは bool、ネックラインは NaN を含まない float。
+            存在しないキーは未検知として扱います。ダブルトップ/ボトム以外の反転パターンは
+            params の 'score_reversal_patterns' が True の場合だけ判定に使われます。
+        params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+
+    Returns:
+        dict: 以下の配列を持つ辞書。
+            - trend_code, momentum_code, volatility_code, sentiment_code, prediction_code:
+              各判定のコード（_TREND_LABELS などのラベルの位置、prediction_code は
+              0: 大暴落加速, 1: 急騰加速, 2: 続落注意, 3: 底堅い/反発）
+            - trend_score, momentum_score, pattern_risk, volatility_score, accel_factor, score
+    """
+    p = resolve_params(SHORT_TREND_PARAMS, params)
+    if patterns is None:
+        patterns = {}
+
+    def col(name):
+        return np.asarray(features[name], dtype=float)
+
+    def pattern(key, default, dtype):
+        if key not in patterns:
+            return np.full(len(h1_close), default, dtype=dtype)
+        return np.asarray(patterns[key], dtype=dtype)
+
+    def reversal(kind):
+        # ダブルトップ/ボトム以外は 'score_reversal_patterns' を指定した場合だけ検知として扱う
+        enabled = np.asarray(p['score_reversal_patterns'], dtype=bool)
+        if kind in ('double_top', 'double_bottom'):
+            enabled = np.ones_like(enabled)
+        return pattern(kind, False, bool) & enabled
+
+    h4_close, h4_ema20, h4_ema50, h4_ema200 = col('h4_close'), col('h4_ema20'), col('h4_ema50'), col('h4_ema200')
+    h1_close, h1_ema20, h1_ema200, h1_rsi = col('h1_close'), col('h1_ema20'), col('h1_ema200'), col('h1_rsi')
+    is_pinbar = np.asarray(features['is_pinbar'], dtype=bool)
+    is_bullish_divergence = np.asarray(features['is_bullish_divergence'], dtype=bool)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Dashboard 1: EMAパーフェクトオーダー (0: 下降, 1: 上昇, 2: 混在)
+        is_down = (h4_close < h4_ema20) & (h4_ema20 < h4_ema50) & (h4_ema50 < h4_ema200)
+        is_up = (h4_close > h4_ema20) & (h4_ema20 > h4_ema50) & (h4_ema50 > h4_ema200)
+        trend_code = np.select([is_down, is_up], [0, 1], default=2)
+        trend_score = np.select([is_down, is_up], [-3, 3], default=0)
+
+        # Dashboard 2: EMA乖離率 (0: 下落, 1: 上昇, 2: 穏やか)
+        dist_ema20 = (h1_close - h1_ema20) / h1_ema20
+        momentum_conditions = [dist_ema20 < -p['ema_deviation'], dist_ema20 > p['ema_deviation']]
+        momentum_code = np.select(momentum_conditions, [0, 1], default=2)
+        momentum_score = np.select(momentum_conditions, [-1, 1], default=0)
+
+        # Dashboard 3: 値幅の加速 (0: 加速中, 1: 安定)
+        is_accel = col('recent_range') > col('avg_range') * p['range_acceleration']
+        accel_factor = np.where(is_accel, 1.5, 1.0)
+
+        # Dashboard 4: センチメント (優先度順に評価)
+        # 弱気の反転パターンは優先度順に最初に検知されたもののネックラインを使う
+        top_flags = [reversal(k) for k in BEARISH_REVERSALS]
+        top_necks = [pattern(neckline_key(k), 0.0, float) for k in BEARISH_REVERSALS]
+        detected_top = np.logical_or.reduce(top_flags)
+        neckline_top = np.select(top_flags, top_necks, default=0.0)
+
+        detected_bottom = pattern('double_bottom', False, bool)
+        neckline_bottom = pattern('neckline_bottom', 0.0, float)
+        other_kinds = [k for k in BULLISH_REVERSALS if k != 'double_bottom']
+        other_flags = [reversal(k) for k in other_kinds]
+        other_necks = [pattern(neckline_key(k), 0.0, float) for k in other_kinds]
+        detected_other_bottom = np.logical_or.reduce(other_flags)
+        neckline_other_bottom = np.select(other_flags, other_necks, default=0.0)
+
+        is_200ema_support = np.abs((h1_close - h1_ema200) / h1_ema200) < p['ema200_band']
+        no_pattern = ~detected_top & ~detected_bottom & ~detected_other_bottom
+        sentiment_conditions = [
+            detected_top & (h1_close < neckline_top),
+            detected_top,
+            detected_bottom & (h1_close > neckline_bottom),
+            detected_bottom,
+            detected_other_bottom & (h1_close > neckline_other_bottom),
+            detected_other_bottom,
+            no_pattern & is_pinbar & ((h1_rsi < 45) | is_200ema_support),
+            no_pattern & is_bullish_divergence,
+            no_pattern & is_200ema_support,
+            no_pattern & (h1_close <= col('h1_low_50')),
+            no_pattern & (h1_close >= col('h1_high_50')),
+        ]
+        sentiment_code = np.select(sentiment_conditions, list(range(len(sentiment_conditions))),
+                                   default=len(sentiment_conditions))
+        pattern_risk = _SENTIMENT_RISK[sentiment_code]
+
+    # 最終スコアと判定 (0: 大暴落加速, 1: 急騰加速, 2: 続落注意, 3: 底堅い/反発)
+    base_score = trend_score + momentum_score + pattern_risk
+    score = base_score * accel_factor
+    prediction_code = np.select([score <= p['crash_threshold'], score >= p['surge_threshold'], score < 0],
+                                [0, 1, 2], default=3)
+
+    return {
+        'trend_code': trend_code,
+        'momentum_code': momentum_code,
+        'volatility_code': np.where(is_accel, 0, 1),
+        'sentiment_code': sentiment_code,
+        'prediction_code': prediction_code,
+        'trend_score': trend_score,
+        'momentum_score': momentum_score,
+        'pattern_risk': pattern_risk,
+        'volatility_score': score - base_score,
+        'accel_factor': accel_factor,
+        'score': score,
+    }
+
+@instrumented('models.analyze_short_trend_series')
+def analyze_short_trend_series(daily_df, h4_df, h1_df, patterns=None, cache=None, params=None):
+    """1時間足の全バーについて短期トレンド分析を一括で実行する。
+
+    `analyze_short_trend` を各バー時点で呼び出した場合と同じ判定を、
+    Pythonのループを使わずに列演算だけで計算します。各行は、そのバーまでの
+    データだけを使った結果です（未来のデータは参照しません）。
 
     Args:
-        timeframes (dict): 時間足名をキー、DataFrameを値とする辞書。
+        daily_df (pd.DataFrame or OHLCVStore): 日足データ。
+        h4_df (pd.DataFrame or OHLCVStore): 4時間足データ（通常は h1_df を4時間で再集計したもの）。
+        h1_df (pd.DataFrame or OHLCVStore): 1時間足データ。
+        patterns (dict or pd.DataFrame, optional): チャートパターン情報。
+            'double_top', 'double_bottom', 'neckline_top', 'neckline_bottom' などの各キー
+            （`to_patterns_dict` と同じキー）に、1時間足と同じ長さの配列・Series、
+            または全バー共通のスカラーを指定します。
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+        params (dict, optional): 判定基準。SHORT_TREND_PARAMS の一部のキーを上書きします。
+
+    Returns:
+        pd.DataFrame: 1時間足と同じインデックスを持つ分析結果。
+            - dashboard_1_trend ~ dashboard_4_sentiment: 各区分の判定結果
+            - trend_score, momentum_score, pattern_risk, volatility_score:
+              各ダッシュボードのスコアへの寄与（合計が score）
+            - accel_factor: ボラティリティによるスコア倍率
+            - score: 最終スコア
+            - final_prediction, risk_level, comment: 最終判定
+    """
+    columns = ['dashboard_1_trend', 'dashboard_2_momentum', 'dashboard_3_volatility',
+               'dashboard_4_sentiment', 'trend_score', 'momentum_score', 'pattern_risk',
+               'volatility_score', 'accel_factor', 'score',
+               'final_prediction', 'risk_level', 'comment']
+
+    daily_df, h4_df, h1_df = as_frame(daily_df), as_frame(h4_df), as_frame(h1_df)
+    if daily_df.empty or h4_df.empty or h1_df.empty:
+        results = pd.DataFrame([_empty_results()] * len(h1_df), index=h1_df.index)
+        results['comment'] = "十分なデータがありません。"
+        return results[columns]
+
+    f = build_short_trend_features(h4_df, h1_df, cache=cache)
+    index = f.index
+
+    pattern_columns = {}
+    for kind in BEARISH_REVERSALS + BULLISH_REVERSALS:
+        pattern_columns[kind] = _pattern_column(patterns, kind, index, False).astype(bool)
+        pattern_columns[neckline_key(kind)] = _pattern_column(patterns, neckline_key(kind), index, 0).astype(float)
+
+    codes = evaluate_short_trend_arrays(f, pattern_columns, params)
+    return _results_frame(codes, index)
+
+
+def _results_frame(codes, index):
+    """`evaluate_short_trend_arrays` の結果を、判定ラベルを持つデータフレームにする。"""
+    def categorical(codes, labels):
+        return pd.Categorical.from_codes(codes, categories=labels)
+
+    prediction_code = codes['prediction_code']
+    return pd.DataFrame({
+        'dashboard_1_trend': categorical(codes['trend_code'], _TREND_LABELS),
+        'dashboard_2_momentum': categorical(codes['momentum_code'], _MOMENTUM_LABELS),
+        'dashboard_3_volatility': categorical(codes['volatility_code'], _VOLATILITY_LABELS),
+        'dashboard_4_sentiment': categorical(codes['sentiment_code'], _SENTIMENT_LABELS),
+        'trend_score': codes['trend_score'],
+        'momentum_score': codes['momentum_score'],
+        'pattern_risk': codes['pattern_risk'],
+        'volatility_score': codes['volatility_score'],
+        'accel_factor': codes['accel_factor'],
+        'score': codes['score'],
+        'final_prediction': categorical(prediction_code, [p[0] for p in _PREDICTIONS]),
+        'risk_level': categorical(prediction_code, [p[1] for p in _PREDICTIONS]),
+        'comment': categorical(prediction_code, [p[2] for p in _PREDICTIONS]),
+    }, index=index)
+
+# analyze_timeframe_details / trend_matrix が対象とする時間足（表示順）
+TIMEFRAME_ORDER = ('Monthly', 'Weekly', 'Daily', '4H', '1H', '15M')
+
+# 各時間足の EMA の期間と、トレンド判定のラベル（trend 列のカテゴリ）
+_TIMEFRAME_EMA_SPANS = (20, 50, 200)
+TIMEFRAME_TREND_LABELS = (
+    "🔼 上昇 (価格 > EMA20 > 50 > 200)",
+    "🔽 下落 (価格 < EMA20 < 50 < 200)",
+    "↗️ 上昇 (EMA200上)",
+    "↘️ 下落 (EMA200下)",
+    "→ 混在",
+    "データ不足",
+)
+
+
+@instrumented('models.trend_matrix')
+def trend_matrix(timeframes, cache=None):
+    """各時間足のトレンド判定とチャートパターンの検知結果を1つの表にまとめる。
+
+    各時間足の EMA 20/50/200 は `calculate_emas` で1回にまとめて求め、
+    トレンド判定は全ての時間足について列演算で行います。
+
+    Args:
+        timeframes (dict): 時間足名をキー、DataFrame (または OHLCVStore) を値とする辞書。
                            例: {'Monthly': df, 'Weekly': df ...}
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
 
     Returns:
-        str: 整形された分析レポート文字列。
+        pd.DataFrame: TIMEFRAME_ORDER のうちデータのある時間足をインデックス ('timeframe') とする表。
+            - bars (int): バー数
+            - close, ema20, ema50, ema200 (float): 最新の終値と EMA
+            - trend (category): トレンド判定（TIMEFRAME_TREND_LABELS のいずれか。50本未満は「データ不足」）
+            - PATTERN_DETECTORS の各パターン (bool): 検知されたか（51本以上の時間足のみ検知）
     """
-    details = []
-    # 表示順序を固定
-    order = ['Monthly', 'Weekly', 'Daily', '4H', '1H', '15M']
-    
-    for tf_name in order:
+    emas = cache.emas if cache is not None else calculate_emas
+
+    names, bars, last_values, pattern_rows = [], [], [], []
+    for tf_name in TIMEFRAME_ORDER:
         if tf_name not in timeframes:
             continue
-            
-        df = timeframes[tf_name]
+        df = as_frame(timeframes[tf_name])
         if df is None or df.empty:
             continue
-            
-        # --- トレンド判定 (EMA) ---
-        # 必要な期間の長さがあるか確認
-        if len(df) < 50:
-            trend = "データ不足"
-        else:
-            ema20 = calculate_ema(df, 20).iloc[-1]
-            ema50 = calculate_ema(df, 50).iloc[-1]
-            ema200 = calculate_ema(df, 200).iloc[-1]
-            close = df['Close'].iloc[-1]
-            
-            if close > ema20 > ema50 > ema200:
-                trend = "🔼 上昇 (価格 > EMA20 > 50 > 200)"
-            elif close < ema20 < ema50 < ema200:
-                trend = "🔽 下落 (価格 < EMA20 < 50 < 200)"
-            elif close > ema200:
-                trend = "↗️ 上昇 (EMA200上)"
-            elif close < ema200:
-                trend = "↘️ 下落 (EMA200下)"
-            else:
-                trend = "→ 混在"
-
-        # --- パターン検知 ---
-        pattern_str = ""
+
+        last_emas = emas(df, _TIMEFRAME_EMA_SPANS)[-1]
+        names.append(tf_name)
+        bars.append(len(df))
+        last_values.append((float(df['Close'].iloc[-1]),) + tuple(last_emas))
+
         # 1h足以外でも検知できるように、モデルの関数を直接呼ぶ
         if len(df) > 50:
-            is_dt, _ = detect_double_top(df)
-            is_db, _ = detect_double_bottom(df)
-            
-            if is_dt: pattern_str += "**⚠️ Wトップ** "
-            if is_db: pattern_str += "**💎 Wボトム** "
+            results = detect_patterns(df, cache=cache)
+            pattern_rows.append([results[kind].detected if kind in results else False
+                                 for kind in PATTERN_DETECTORS])
+        else:
+            pattern_rows.append([False] * len(PATTERN_DETECTORS))
 
-        # 行の作成
-        row = f"**{tf_name}**: `{trend}` {pattern_str}"
-        details.append(row)
-        
-    return "\n".join(details)
+    bars = np.array(bars, dtype=np.int64)
+    values = np.array(last_values, dtype=float).reshape(len(names), 1 + len(_TIMEFRAME_EMA_SPANS))
+    close, ema20, ema50, ema200 = values.T
+
+    with np.errstate(invalid='ignore'):
+        trend_code = np.select(
+            [bars < 50,
+             (close > ema20) & (ema20 > ema50) & (ema50 > ema200),
+             (close < ema20) & (ema20 < ema50) & (ema50 < ema200),
+             close > ema200,
+             close < ema200],
+            [5, 0, 1, 2, 3], default=4)
+
+    columns = {
+        'bars': bars,
+        'close': close,
+        'ema20': ema20,
+        'ema50': ema50,
+        'ema200': ema200,
+        'trend': pd.Categorical.from_codes(trend_code, categories=TIMEFRAME_TREND_LABELS),
+    }
+    flags = np.array(pattern_rows, dtype=bool).reshape(len(names), len(PATTERN_DETECTORS))
+    for j, kind in enumerate(PATTERN_DETECTORS):
+        columns[kind] = flags[:, j]
+    return pd.DataFrame(columns, index=pd.Index(names, name='timeframe'))
+
+
+@instrumented('models.analyze_timeframe_details')
+def analyze_timeframe_details(timeframes, cache=None):
+    """各時間足の詳細分析レポートを生成する。
+
+    `trend_matrix` の結果を `format_trend_matrix` で Markdown に整形します。
+
+    Args:
+        timeframes (dict): 時間足名をキー、DataFrame (または OHLCVStore) を値とする辞書。
+                           例: {'Monthly': df, 'Weekly': df ...}
+        cache (IndicatorCache, optional): インジケーター計算結果のキャッシュ。
+
+    Returns:
+        str: 整形された分析レポート文字列。
+    """
+    return format_trend_matrix(trend_matrix(timeframes, cache=cache))
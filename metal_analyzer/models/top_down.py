@@ -6,7 +6,10 @@
 
 from ..indicators.sma import calculate_sma
 from ..indicators.rsi import calculate_rsi
+from ..core.store import as_frame
+from ..core.instrumentation import instrumented
 
+@instrumented('models.analyze_top_down')
 def analyze_top_down(daily_data, hourly_data):
     """日足と1時間足を組み合わせたトップダウン分析を実行する。
 
@@ -14,8 +17,8 @@ def analyze_top_down(daily_data, hourly_data):
     タイミング（短期トレンドとボラティリティ）を判定します。
 
     Args:
-        daily_data (pd.DataFrame): 日足の価格データ。
-        hourly_data (pd.DataFrame): 1時間足の価格データ。
+        daily_data (pd.DataFrame or OHLCVStore): 日足の価格データ。
+        hourly_data (pd.DataFrame or OHLCVStore): 1時間足の価格データ。
 
     Returns:
         tuple: (signal, prediction, daily_trend, hourly_trend, hourly_rsi)
@@ -25,6 +28,7 @@ def analyze_top_down(daily_data, hourly_data):
             - hourly_trend (str): 1時間足のトレンド状態。
             - hourly_rsi (float): 1時間足の最終RSI値。
     """
+    daily_data, hourly_data = as_frame(daily_data), as_frame(hourly_data)
     if daily_data.empty or hourly_data.empty:
         return "様子見 (Wait)", "データがありません。", "不明", "不明", 0
 
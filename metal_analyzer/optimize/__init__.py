@@ -0,0 +1,13 @@
+"""分析モデルの判定基準（パラメータ）を過去データで最適化するパッケージ。
+
+判定基準に依存しない特徴量を全期間について1回だけ計算した特徴量行列と、
+その行列に対してパラメータの組み合わせをまとめて評価するグリッドサーチが含まれます。
+"""
+
+from .features import (
+    short_trend_matrix, middle_trend_matrix, long_trend_matrix, MIDDLE_TREND_COLUMNS, LONG_TREND_COLUMNS
+)
+from .search import parameter_grid, grid_search, MODELS, SHORT_TREND_POSITIONS
+
+__all__ = ['short_trend_matrix', 'middle_trend_matrix', 'long_trend_matrix', 'MIDDLE_TREND_COLUMNS',
+           'LONG_TREND_COLUMNS', 'parameter_grid', 'grid_search', 'MODELS', 'SHORT_TREND_POSITIONS']
@@ -0,0 +1,162 @@
+"""判定基準の最適化に使う特徴量の表（特徴量行列）を作成するモジュール。
+
+各モデルの判定基準に依存しないインジケーターの値を、検証する全ての時点について
+1回だけ計算して表にまとめます。グリッドサーチはこの表に対して判定だけを繰り返します。
+どの表も、各行はその時点までのデータだけを使った値です（未来のデータは参照しません）。
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..backtest.walk_forward import WalkForwardBacktest, _prepare_ohlcv
+from ..indicators import calculate_ema, calculate_emas, calculate_rsi, calculate_bollinger_bands
+
+# 中期・長期トレンドの特徴量の列
+MIDDLE_TREND_COLUMNS = ('w_close', 'w_ema13', 'w_ema26', 'w_ema52', 'd_rsi', 'd_macd', 'd_prev_macd',
+                        'bandwidth', 'avg_bandwidth')
+LONG_TREND_COLUMNS = ('g_close', 'g_ema12', 'g_ema24', 'dxy_close', 'dxy_ema12', 's_close', 'p_close',
+                      'tips_close', 'tips_ema12')
+
+
+def _next_pct(closes):
+    """各時点から次の時点への終値変動率 (%) を返す（最後の時点は NaN）。"""
+    closes = np.asarray(closes, dtype=float)
+    pct = np.full(len(closes), np.nan)
+    if len(closes) > 1:
+        pct[:-1] = (closes[1:] - closes[:-1]) / closes[:-1] * 100
+    return pct
+
+
+def _as_of(index, series):
+    """index の各時点以前で最後の series の値を返す（存在しない場合は NaN）。"""
+    if series is None or len(series) == 0:
+        return np.full(len(index), np.nan)
+    pos = series.index.searchsorted(index, side='right') - 1
+    values = series.to_numpy(dtype=float)[np.maximum(pos, 0)]
+    return np.where(pos >= 0, values, np.nan)
+
+
+def _date_mask(index, start, end):
+    """検証期間に含まれる行のマスクを返す。"""
+    mask = np.ones(len(index), dtype=bool)
+    if start is not None: mask &= index >= pd.Timestamp(start)
+    if end is not None: mask &= index <= pd.Timestamp(end)
+    return mask
+
+
+def short_trend_matrix(daily_df, h1_df, h4_df=None, start=None, end=None, **kwargs):
+    """短期トレンド分析の特徴量行列を作成する。
+
+    `WalkForwardBacktest.feature_matrix` の簡易呼び出しです。
+
+    Args:
+        daily_df (pd.DataFrame or OHLCVStore): 日足データ（全期間）。
+        h1_df (pd.DataFrame or OHLCVStore): 1時間足データ（全期間）。
+        h4_df (pd.DataFrame or OHLCVStore, optional): 4時間足データ。省略時は1時間足から生成。
+        start (str or pd.Timestamp, optional): 検証開始日。
+        end (str or pd.Timestamp, optional): 検証終了日。
+        **kwargs: WalkForwardBacktest に渡す引数 (pattern_threshold, pattern_lookback, min_bars)。
+
+    Returns:
+        pd.DataFrame: 検証日をインデックスとし、特徴量・パターン情報・next_day_pct を列に持つ表。
+    """
+    return WalkForwardBacktest(daily_df, h1_df, h4_df=h4_df, **kwargs).feature_matrix(start=start, end=end)
+
+
+def middle_trend_matrix(weekly_df, daily_df, start=None, end=None):
+    """中期トレンド分析の特徴量行列を作成する。
+
+    各日足の時点 t について、`analyze_middle_trend(weekly_df.loc[:t], daily_df.loc[:t])` が
+    判定に使う値を計算します（週足は t 以前の日付のバーを使用します）。
+
+    Args:
+        weekly_df (pd.DataFrame or OHLCVStore): 週足データ（全期間）。
+        daily_df (pd.DataFrame or OHLCVStore): 日足データ（全期間）。
+        start (str or pd.Timestamp, optional): 検証開始日。
+        end (str or pd.Timestamp, optional): 検証終了日。
+
+    Returns:
+        pd.DataFrame: 日付をインデックスとし、MIDDLE_TREND_COLUMNS と next_day_pct を列に持つ表。
+            MACD の前日値がない最初の日と、翌日のない最終日は含まれません。
+    """
+    weekly_df, daily_df = _prepare_ohlcv(weekly_df), _prepare_ohlcv(daily_df)
+    index = daily_df.index
+
+    d_emas = calculate_emas(daily_df, (12, 26))
+    d_macd = d_emas[:, 0] - d_emas[:, 1]
+    d_prev_macd = np.concatenate([[np.nan], d_macd[:-1]])
+    mb, ub, lb = calculate_bollinger_bands(daily_df, 20, 2)
+    bandwidth = (ub - lb) / mb
+    w_emas = pd.DataFrame(calculate_emas(weekly_df, (13, 26, 52)), index=weekly_df.index)
+
+    matrix = pd.DataFrame({
+        'w_close': _as_of(index, weekly_df['Close']),
+        'w_ema13': _as_of(index, w_emas[0]),
+        'w_ema26': _as_of(index, w_emas[1]),
+        'w_ema52': _as_of(index, w_emas[2]),
+        'd_rsi': calculate_rsi(daily_df, 14).to_numpy(dtype=float),
+        'd_macd': d_macd,
+        'd_prev_macd': d_prev_macd,
+        'bandwidth': bandwidth.to_numpy(dtype=float),
+        'avg_bandwidth': bandwidth.rolling(window=20).mean().to_numpy(dtype=float),
+        'next_day_pct': _next_pct(daily_df['Close']),
+    }, index=index)
+
+    mask = _date_mask(index, start, end) & ~np.isnan(matrix['w_close'].to_numpy())
+    mask[:1] = False
+    mask[-1:] = False
+    return matrix[mask]
+
+
+def long_trend_matrix(monthly_gold_df, monthly_silver_df=None, monthly_platinum_df=None,
+                      monthly_dxy_df=None, monthly_tips_df=None, start=None, end=None):
+    """長期トレンド分析の特徴量行列を作成する。
+
+    金の各月足の時点 m について、各銘柄の m 以前の月足を `analyze_long_trend` に渡した場合に
+    判定に使われる値を計算します。その時点でデータのない銘柄の列は NaN になります。
+
+    Args:
+        monthly_gold_df (pd.DataFrame or OHLCVStore): 金の月足データ。
+        monthly_silver_df (pd.DataFrame or OHLCVStore, optional): 銀の月足データ。
+        monthly_platinum_df (pd.DataFrame or OHLCVStore, optional): プラチナの月足データ。
+        monthly_dxy_df (pd.DataFrame or OHLCVStore, optional): ドルインデックスの月足データ。
+        monthly_tips_df (pd.DataFrame or OHLCVStore, optional): TIPS ETF の月足データ。
+        start (str or pd.Timestamp, optional): 検証開始日。
+        end (str or pd.Timestamp, optional): 検証終了日。
+
+    Returns:
+        pd.DataFrame: 月をインデックスとし、LONG_TREND_COLUMNS と next_month_pct を列に持つ表。
+            翌月のない最終月は含まれません。
+    """
+    def prepare(df):
+        return None if df is None else _prepare_ohlcv(df)
+
+    gold = _prepare_ohlcv(monthly_gold_df)
+    silver, platinum, dxy, tips = (prepare(monthly_silver_df), prepare(monthly_platinum_df),
+                                   prepare(monthly_dxy_df), prepare(monthly_tips_df))
+    index = gold.index
+
+    def close(df):
+        return None if df is None or df.empty else df['Close']
+
+    def ema12(df):
+        return None if df is None or df.empty else calculate_ema(df, 12)
+
+    g_emas = calculate_emas(gold, (12, 24))
+
+    matrix = pd.DataFrame({
+        'g_close': gold['Close'].to_numpy(dtype=float),
+        'g_ema12': g_emas[:, 0],
+        'g_ema24': g_emas[:, 1],
+        'dxy_close': _as_of(index, close(dxy)),
+        'dxy_ema12': _as_of(index, ema12(dxy)),
+        's_close': _as_of(index, close(silver)),
+        'p_close': _as_of(index, close(platinum)),
+        'tips_close': _as_of(index, close(tips)),
+        'tips_ema12': _as_of(index, ema12(tips)),
+        'next_month_pct': _next_pct(gold['Close']),
+    }, index=index)
+
+    mask = _date_mask(index, start, end)
+    mask[-1:] = False
+    return matrix[mask]
@@ -0,0 +1,241 @@
+"""判定基準（パラメータ）の組み合わせをグリッドサーチで評価するモジュール。
+
+`features` モジュールで作成した特徴量行列に対して、パラメータの各組み合わせの判定を
+形状 (組み合わせ数, 行数) の配列として列演算でまとめて計算し、判定から決まるポジションと
+翌期間の変動率から損益と的中率を集計します。組み合わせは chunk_size ごとに分割され、
+workers が 2 以上の場合はプロセスプールで並列に評価されます。
+
+各モデルの判定は以下のポジション（保有比率）に対応させて評価します。
+
+- short: 大暴落加速 -1.0, 急騰加速 +1.0, 続落注意 -0.5, 底堅い/反発 +0.5（中立 0）
+- middle: 戦略的買い・継続保有 1.0, 慎重なトレンドフォロー・リバウンド狙い 0.5,
+  押し目待ち・売り/静観 0（中立 0）
+- long: 推奨保有比率の中央値 22.5% / 12.5% / 5%（中立 5%）
+
+Examples:
+    >>> matrix = short_trend_matrix(daily_df, h1_df)
+    >>> grid = parameter_grid(crash_threshold=[-8, -6, -4], surge_threshold=[3, 5, 7])
+    >>> results = grid_search('short', matrix, grid)
+    >>> results.sort_values('pnl', ascending=False).head()
+"""
+
+import itertools
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ..backtest.calibration import grade_prediction_codes
+from ..core.instrumentation import instrumented, stage
+from ..models.params import resolve_params
+from ..models.short_trend_predictor import SHORT_TREND_PARAMS, evaluate_short_trend_arrays
+from ..models.middle_trend_predictor import MIDDLE_TREND_PARAMS
+from ..models.long_trend_predictor import LONG_TREND_PARAMS
+
+# 短期トレンドの判定コード (prediction_code) ごとのポジション
+SHORT_TREND_POSITIONS = (-1.0, 1.0, -0.5, 0.5)
+
+# 1チャンクで計算する配列の要素数の目安（組み合わせ数 × 行数）
+_CHUNK_ELEMENTS = 2_000_000
+
+# モデルの評価方法
+#   defaults: パラメータのデフォルト値, evaluate: 判定関数, return_column: 翌期間の変動率の列,
+#   neutral: 中立のポジション
+_Model = namedtuple('_Model', ['defaults', 'evaluate', 'return_column', 'neutral'])
+
+
+def _evaluate_short(columns, params, returns):
+    """短期トレンドのポジションと、判定の的中率 (accuracy) を返す。"""
+    result = evaluate_short_trend_arrays(columns, columns, params)
+    codes = result['prediction_code']
+    positions = np.asarray(SHORT_TREND_POSITIONS)[codes]
+    accuracy = grade_prediction_codes(codes, returns).mean(axis=-1)
+    return positions, {'accuracy': accuracy}
+
+
+def _evaluate_middle(columns, params, returns):
+    """中期トレンドの戦略 (dashboard_4_strategy) に対応するポジションを返す。
+
+    `analyze_middle_trend` と同じ判定です。bb_squeeze は Dashboard 3 の表示のみに
+    使われ、戦略には影響しません。
+    """
+    w_close, w_ema13, w_ema26, w_ema52 = (columns['w_close'], columns['w_ema13'],
+                                          columns['w_ema26'], columns['w_ema52'])
+    with np.errstate(invalid='ignore'):
+        is_weekly_uptrend = (w_ema13 > w_ema26) & (w_ema26 > w_ema52) & (w_close > w_ema52)
+        is_daily_oversold = columns['d_rsi'] < 35
+        is_momentum_down = columns['d_macd'] < columns['d_prev_macd']
+        is_high_volatility = columns['bandwidth'] > columns['avg_bandwidth'] * params['bb_expansion']
+
+    # 押し目待ち・売り/静観は 0
+    positions = np.select(
+        [is_weekly_uptrend & is_momentum_down & is_daily_oversold,   # 戦略的買い
+         is_weekly_uptrend & is_momentum_down,                       # 押し目待ち
+         is_weekly_uptrend & is_high_volatility,                     # 慎重なトレンドフォロー
+         is_weekly_uptrend,                                          # 継続保有
+         is_daily_oversold],                                         # リバウンド狙い
+        [1.0, 0.0, 0.5, 1.0, 0.5], default=0.0)
+    return positions, {}
+
+
+def _evaluate_long(columns, params, returns):
+    """長期トレンドの推奨保有比率 (dashboard_4_portfolio) に対応するポジションを返す。
+
+    `analyze_long_trend` と同じ判定です。「割安」の判定は Dashboard 2 の文言に従うため、
+    金銀レシオが gsr_low 未満（銀の割安感解消）の場合も加点されます。
+    """
+    g_close = columns['g_close']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gold_up = (g_close > columns['g_ema12']) & (columns['g_ema12'] > columns['g_ema24'])
+        dollar_down = columns['dxy_close'] < columns['dxy_ema12']
+        gsr = g_close / columns['s_close']
+        gpr = g_close / columns['p_close']
+        undervalued = (gsr > params['gsr_high']) | (gsr < params['gsr_low']) | (gpr > 1.0)
+        real_rates_down = columns['tips_close'] > columns['tips_ema12']
+
+    score = 2 * gold_up + dollar_down + undervalued + 2 * real_rates_down
+    positions = np.select([score >= 5, score >= 3], [0.225, 0.125], default=0.05)
+    return positions, {}
+
+
+MODELS = {
+    'short': _Model(SHORT_TREND_PARAMS, _evaluate_short, 'next_day_pct', 0.0),
+    'middle': _Model(MIDDLE_TREND_PARAMS, _evaluate_middle, 'next_day_pct', 0.0),
+    'long': _Model(LONG_TREND_PARAMS, _evaluate_long, 'next_month_pct', 0.05),
+}
+
+
+def parameter_grid(**values):
+    """パラメータの候補の全ての組み合わせを返す。
+
+    Args:
+        **values: パラメータ名をキー、候補のリストを値とする指定。
+
+    Returns:
+        list of dict: 組み合わせごとのパラメータ辞書。
+
+    Examples:
+        >>> parameter_grid(gsr_high=[75, 80], gsr_low=[55, 60])
+        [{'gsr_high': 75, 'gsr_low': 55}, {'gsr_high': 75, 'gsr_low': 60}, ...]
+    """
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(values[n] for n in names))]
+
+
+def _summarize(positions, returns, neutral):
+    """ポジションと変動率から組み合わせごとの成績を集計する。
+
+    Args:
+        positions (np.ndarray): 形状 (k, n) のポジション。
+        returns (np.ndarray): 長さ n の翌期間の変動率 (%)。
+        neutral (float): 中立のポジション。
+
+    Returns:
+        dict: 長さ k の配列を持つ辞書 (pnl, mean_pnl, exposure, trades, hit_rate)。
+    """
+    n = returns.shape[-1]
+    pnl = (positions * returns).sum(axis=-1)
+    direction = np.sign(positions - neutral)
+    active = direction != 0
+    trades = active.sum(axis=-1)
+    hits = (direction * returns > 0).sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hit_rate = np.where(trades > 0, hits / trades, np.nan)
+    return {
+        'pnl': pnl,
+        'mean_pnl': pnl / n if n else np.full(len(pnl), np.nan),
+        'exposure': np.abs(positions).mean(axis=-1) if n else np.full(len(pnl), np.nan),
+        'trades': trades,
+        'hit_rate': hit_rate,
+    }
+
+
+def _evaluate_chunk(model, columns, returns, params):
+    """パラメータの組み合わせの1チャンクを評価する（ワーカープロセスでも実行される）。
+
+    Args:
+        model (str): モデル名 ('short', 'middle', 'long')。
+        columns (dict): 特徴量行列の列名と配列。
+        returns (np.ndarray): 長さ n の翌期間の変動率 (%)。
+        params (dict): パラメータ名と形状 (k, 1) の配列。
+
+    Returns:
+        dict: 長さ k の成績の配列を持つ辞書。
+    """
+    spec = MODELS[model]
+    params = resolve_params(spec.defaults, params)
+    positions, extra = spec.evaluate(columns, params, returns)
+    k = max((np.shape(v)[0] for v in params.values() if np.ndim(v)), default=1)
+    positions = np.broadcast_to(positions, (k, len(returns)))
+    metrics = _summarize(positions, returns, spec.neutral)
+    for name, values in extra.items():
+        metrics[name] = np.broadcast_to(values, (k,))
+    return metrics
+
+
+@instrumented('optimize.grid_search')
+def grid_search(model, matrix, grid, workers=1, chunk_size=None):
+    """パラメータの各組み合わせについて、特徴量行列に対する成績を計算する。
+
+    Args:
+        model (str): 評価するモデル ('short', 'middle', 'long')。
+        matrix (pd.DataFrame): `short_trend_matrix` / `middle_trend_matrix` / `long_trend_matrix`
+            が返す特徴量行列。
+        grid (list of dict or dict): パラメータの組み合わせのリスト（`parameter_grid` の戻り値）、
+            またはパラメータ名と候補のリストの辞書。全ての組み合わせは同じキーを持つ必要があります。
+        workers (int or None): ワーカープロセス数。None の場合は CPU 数。
+            1 以下の場合はプロセスを起動せずに順番に評価します。
+        chunk_size (int, optional): 1回の列演算で評価する組み合わせ数。
+            省略時は 組み合わせ数 × 行数 が約200万要素になる数。
+
+    Returns:
+        pd.DataFrame: 組み合わせごとの成績（grid の順）。列はパラメータと以下の指標。
+            - pnl: ポジション × 翌期間の変動率 (%) の合計
+            - mean_pnl: 1期間あたりの pnl
+            - exposure: ポジションの絶対値の平均
+            - trades: 中立以外のポジションを取った期間の数
+            - hit_rate: 中立以外のポジションの方向が翌期間の値動きと一致した割合
+            - accuracy: (short のみ) `grade_prediction` の基準での的中率
+
+    Raises:
+        ValueError: 未対応のモデル、モデルにないパラメータ、またはキーの異なる組み合わせが指定された場合。
+    """
+    if model not in MODELS:
+        raise ValueError(f"未対応のモデルです: {model}（指定可能: {', '.join(MODELS)}）")
+    spec = MODELS[model]
+    if isinstance(grid, dict):
+        grid = parameter_grid(**grid)
+    grid = list(grid)
+    names = list(grid[0]) if grid else []
+    if any(set(combo) != set(names) for combo in grid):
+        raise ValueError("全てのパラメータの組み合わせは同じキーを持つ必要があります。")
+    resolve_params(spec.defaults, dict.fromkeys(names))
+
+    with stage('prepare'):
+        # 翌期間の変動率がない行は評価しない
+        valid = ~np.isnan(matrix[spec.return_column].to_numpy(dtype=float))
+        columns = {name: matrix[name].to_numpy()[valid] for name in matrix.columns}
+        returns = columns[spec.return_column].astype(float)
+        values = {name: np.array([combo[name] for combo in grid], dtype=float) for name in names}
+
+    if chunk_size is None:
+        chunk_size = max(1, _CHUNK_ELEMENTS // max(len(returns), 1))
+    chunks = [{name: v[i:i + chunk_size, None] for name, v in values.items()}
+              for i in range(0, len(grid), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(chunks))
+    with stage('evaluate'):
+        if workers <= 1:
+            results = [_evaluate_chunk(model, columns, returns, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_evaluate_chunk, [model] * len(chunks),
+                                            [columns] * len(chunks), [returns] * len(chunks), chunks))
+
+    table = pd.DataFrame(grid, columns=names)
+    for metric in (results[0] if results else {}):
+        table[metric] = np.concatenate([r[metric] for r in results])
+    return table
@@ -1,9 +1,28 @@
 """チャートパターン検知ロジックを提供するパッケージ。
 
-ダブルトップ（Mトップ）などの特定の形状を自動的に検出するアルゴリズムが含まれます。
+ダブルトップ（Mトップ）・三尊・三角保ち合いなどの特定の形状を自動的に検出するアルゴリズムと、
+それらが共有する山・谷のインデックス (SwingIndex)、全期間のパターンを一括で列挙するスキャナー、
+バーごとに逐次判定する検知器が含まれます。
 """
 
+from .swings import SwingIndex
 from .double_top import detect_double_top
 from .double_bottom import detect_double_bottom
+from .head_and_shoulders import detect_head_and_shoulders, detect_inverse_head_and_shoulders
+from .triple import detect_triple_top, detect_triple_bottom
+from .triangle import detect_ascending_triangle, detect_descending_triangle
+from .flag import detect_bull_flag, detect_bear_flag
+from .engine import PATTERN_DETECTORS, build_swing_index, detect_patterns
+from .scan import scan_double_tops, scan_double_bottoms
+from .result import PatternResult, format_pattern_message, to_patterns_dict
+from .incremental import DoubleTopDetector, DoubleBottomDetector
 
-__all__ = ['detect_double_top', 'detect_double_bottom']
+__all__ = ['SwingIndex', 'detect_double_top', 'detect_double_bottom',
+           'detect_head_and_shoulders', 'detect_inverse_head_and_shoulders',
+           'detect_triple_top', 'detect_triple_bottom',
+           'detect_ascending_triangle', 'detect_descending_triangle',
+           'detect_bull_flag', 'detect_bear_flag',
+           'PATTERN_DETECTORS', 'build_swing_index', 'detect_patterns',
+           'scan_double_tops', 'scan_double_bottoms',
+           'PatternResult', 'format_pattern_message', 'to_patterns_dict',
+           'DoubleTopDetector', 'DoubleBottomDetector']
@@ -4,8 +4,9 @@
 自動的に検知する機能を提供します。
 """
 
-import numpy as np
-from scipy.signal import find_peaks
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_DIFF_TOO_LARGE,
+                     STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
 
 def detect_double_bottom(hourly_data, threshold=0.03, lookback=100):
     """ダブルボトム（Wボトム）パターンを検知し、ネックライン上抜けで買いシグナルを判定する。
@@ -14,52 +15,55 @@ def detect_double_bottom(hourly_data, threshold=0.03, lookback=100):
     現在価格がその間の山（ネックライン）を上回っているかを確認します。
 
     Args:
-        hourly_data (pd.DataFrame): 1時間足などの価格データ。'Close' 列が必要。
+        hourly_data (pd.DataFrame or OHLCVStore or SwingIndex): 1時間足などの価格データ。'Close' 列が必要。
+            作成済みの SwingIndex を渡した場合は lookback は無視されます。
         threshold (float): 2つの谷の価格差の許容割合。デフォルト 0.03 (3%)。
         lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
 
     Returns:
-        tuple: (is_detected, signal_details)
+        PatternResult: 検知結果。従来どおり (is_detected, signal_details) として展開できます。
             is_detected (bool): パターンが成立し、買い条件を満たしているか。
-            signal_details (str): 検知結果の詳細メッセージ（日本語）。
+            signal_details (str): 検知結果の詳細メッセージ（日本語）。参照時に生成されます。
     """
-    if hourly_data is None or hourly_data.empty:
-         return False, "分析対象のデータがありません"
+    swings = as_swing_index(hourly_data, lookback)
+    if swings.empty:
+        return PatternResult('double_bottom', False, STATUS_NO_DATA)
 
-    # 分析対象データの取得（直近 lookback 期間）
-    df = hourly_data.iloc[-lookback:].copy()
-    
-    # 谷を検出するために価格を反転させる（find_peaksは山を探すため）
-    prices = df['Close'].values
-    inverted_prices = -prices
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
+
+    # ピーク（谷）
+    peaks = swings.lows
 
-    # ピーク（谷）の検出
-    peaks, properties = find_peaks(inverted_prices, distance=10, prominence=5) 
-    
     if len(peaks) < 2:
-        return False, "谷が不足しています。"
-        
+        return PatternResult('double_bottom', False, STATUS_INSUFFICIENT,
+                             current_price=current_price, trend=trend)
+
     last_peak_idx = peaks[-1]
     second_last_peak_idx = peaks[-2]
-    
-    # 谷の価格（元の価格に戻すにはマイナスを掛ける）
-    valley1_price = prices[second_last_peak_idx]
-    valley2_price = prices[last_peak_idx]
-    
+
+    # 谷の価格
+    valley1_price = float(prices[second_last_peak_idx])
+    valley2_price = float(prices[last_peak_idx])
+    peak_info = {
+        'peaks': swings.absolute((second_last_peak_idx, last_peak_idx)),
+        'peak_prices': (valley1_price, valley2_price),
+        'current_price': current_price,
+        'trend': trend,
+    }
+
     diff_ratio = abs(valley1_price - valley2_price) / valley1_price
-    
+
     if diff_ratio > threshold:
-        return False, f"谷の価格差が大きすぎます: {diff_ratio:.2%}。"
-        
+        return PatternResult('double_bottom', False, STATUS_DIFF_TOO_LARGE, diff_ratio=diff_ratio, **peak_info)
+
     # 間の山（ネックライン）を探す
     # 2つの谷の間にある最高値
-    peak_rel_idx = np.argmax(prices[second_last_peak_idx:last_peak_idx])
-    peak_idx = second_last_peak_idx + peak_rel_idx
-    neckline_price = prices[peak_idx]
-    
-    current_price = hourly_data['Close'].iloc[-1]
-    
-    if current_price > neckline_price:
-         return True, f"ダブルボトムを検知しました！ 谷: {valley1_price:.2f}, {valley2_price:.2f}. ネックライン {neckline_price:.2f} を上抜けたため、買いシグナルです。"
-    
-    return False, f"Wボトム形成中ですが、ネックラインを上抜けていません。ネックライン: {neckline_price:.2f}, 現在値: {current_price:.2f}"
+    peak_idx = swings.highest_between(second_last_peak_idx, last_peak_idx)
+    neckline_price = float(prices[peak_idx])
+
+    # ネックラインを上抜けていれば買いシグナル
+    detected = current_price > neckline_price
+    return PatternResult('double_bottom', detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline_price, diff_ratio=diff_ratio, **peak_info)
@@ -4,8 +4,9 @@
 自動的に検知する機能を提供します。
 """
 
-import numpy as np
-from scipy.signal import find_peaks
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_DIFF_TOO_LARGE,
+                     STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
 
 def detect_double_top(hourly_data, threshold=0.03, lookback=100):
     """ダブルトップ（Mトップ）パターンを検知し、ネックライン割れで売りシグナルを判定する。
@@ -14,57 +15,52 @@ def detect_double_top(hourly_data, threshold=0.03, lookback=100):
     現在価格がその間の谷（ネックライン）を下回っているかを確認します。
 
     Args:
-        hourly_data (pd.DataFrame): 1時間足などの価格データ。'Close' 列が必要。
+        hourly_data (pd.DataFrame or OHLCVStore or SwingIndex): 1時間足などの価格データ。'Close' 列が必要。
+            作成済みの SwingIndex を渡した場合は lookback は無視されます。
         threshold (float): 2つの頂点の価格差の許容割合。デフォルト 0.03 (3%)。
         lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
 
     Returns:
-        tuple: (is_detected, signal_details)
+        PatternResult: 検知結果。従来どおり (is_detected, signal_details) として展開できます。
             is_detected (bool): パターンが成立し、売り条件を満たしているか。
-            signal_details (str): 検知結果の詳細メッセージ（日本語）。
+            signal_details (str): 検知結果の詳細メッセージ（日本語）。参照時に生成されます。
     """
-    if hourly_data is None or hourly_data.empty:
-         return False, "分析対象のデータがありません"
+    swings = as_swing_index(hourly_data, lookback)
+    if swings.empty:
+        return PatternResult('double_top', False, STATUS_NO_DATA)
 
-    # 分析対象データの取得（直近 lookback 期間）
-    df = hourly_data.iloc[-lookback:].copy()
-    
-    prices = df['Close'].values
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
 
-    # トレンドの判定（lookback期間の開始時と現在を比較）
-    start_price = prices[0]
-    current_price = hourly_data['Close'].iloc[-1]
-    change_rate = (current_price - start_price) / start_price
+    # ピーク（極大値）
+    peaks = swings.highs
 
-    if change_rate >= 0.01:
-        trend_desc = "現在は上昇トレンドにあります。"
-    elif change_rate <= -0.01:
-        trend_desc = "現在は下落トレンドにあります。"
-    else:
-        trend_desc = "現在は横ばい（レンジ）トレンドにあります。"
-    
-    # ピーク（極大値）の検出
-    peaks, properties = find_peaks(prices, distance=10, prominence=5) 
-    
     if len(peaks) < 2:
-        return False, f"ピークが不足しています。{trend_desc}"
-        
+        return PatternResult('double_top', False, STATUS_INSUFFICIENT,
+                             current_price=current_price, trend=trend)
+
     last_peak_idx = peaks[-1]
     second_last_peak_idx = peaks[-2]
-    
-    peak1_price = prices[second_last_peak_idx]
-    peak2_price = prices[last_peak_idx]
-    
+
+    peak1_price = float(prices[second_last_peak_idx])
+    peak2_price = float(prices[last_peak_idx])
+    peak_info = {
+        'peaks': swings.absolute((second_last_peak_idx, last_peak_idx)),
+        'peak_prices': (peak1_price, peak2_price),
+        'current_price': current_price,
+        'trend': trend,
+    }
+
     diff_ratio = abs(peak1_price - peak2_price) / peak1_price
-    
+
     if diff_ratio > threshold:
-        return False, f"ピークの価格差が大きすぎます: {diff_ratio:.2%}。{trend_desc}"
-        
-    trough_rel_idx = np.argmin(prices[second_last_peak_idx:last_peak_idx])
-    trough_idx = second_last_peak_idx + trough_rel_idx
-    neckline_price = prices[trough_idx]
-    
-    if current_price < neckline_price:
-         return True, f"ダブルトップを検知しました！ ピーク: {peak1_price:.2f}, {peak2_price:.2f}. ネックライン {neckline_price:.2f} を下回ったため、売りシグナルです。"
-    
-    return False, f"パターン形成中ですが、ネックラインを割り込んでいません。ネックライン: {neckline_price:.2f}, 現在値: {current_price:.2f}"
+        return PatternResult('double_top', False, STATUS_DIFF_TOO_LARGE, diff_ratio=diff_ratio, **peak_info)
+
+    trough_idx = swings.lowest_between(second_last_peak_idx, last_peak_idx)
+    neckline_price = float(prices[trough_idx])
+
+    # ネックラインを下回っていれば売りシグナル
+    detected = current_price < neckline_price
+    return PatternResult('double_top', detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline_price, diff_ratio=diff_ratio, **peak_info)
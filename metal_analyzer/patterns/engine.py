@@ -0,0 +1,90 @@
+"""複数のチャートパターンを共有の SwingIndex でまとめて検知するモジュール。
+
+このモジュールは、パターンの種類と検知関数の対応表 PATTERN_DETECTORS と、
+価格データから SwingIndex を1回だけ作成して全ての検知関数に渡す detect_patterns を提供します。
+新しいパターンは、SwingIndex を受け取る検知関数を PATTERN_DETECTORS に追加するだけで
+`MetalAnalyzer` の短期トレンド分析やバックテストから利用されます。
+"""
+
+from .double_top import detect_double_top
+from .double_bottom import detect_double_bottom
+from .head_and_shoulders import detect_head_and_shoulders, detect_inverse_head_and_shoulders
+from .triple import detect_triple_top, detect_triple_bottom
+from .triangle import detect_ascending_triangle, detect_descending_triangle
+from .flag import detect_bull_flag, detect_bear_flag
+from .swings import SwingIndex
+from ..core.instrumentation import stage
+
+# パターンの種類と検知関数（SwingIndex を第1引数に受け取る）
+PATTERN_DETECTORS = {
+    'double_top': detect_double_top,
+    'double_bottom': detect_double_bottom,
+    'head_and_shoulders': detect_head_and_shoulders,
+    'inverse_head_and_shoulders': detect_inverse_head_and_shoulders,
+    'triple_top': detect_triple_top,
+    'triple_bottom': detect_triple_bottom,
+    'ascending_triangle': detect_ascending_triangle,
+    'descending_triangle': detect_descending_triangle,
+    'bull_flag': detect_bull_flag,
+    'bear_flag': detect_bear_flag,
+}
+
+# 価格差の許容割合 (threshold) を受け取るパターン
+_THRESHOLD_PATTERNS = ('double_top', 'double_bottom', 'head_and_shoulders', 'inverse_head_and_shoulders',
+                       'triple_top', 'triple_bottom', 'ascending_triangle', 'descending_triangle')
+
+
+def build_swing_index(data, lookback=100, distance=10, prominence=5, cache=None):
+    """価格データから SwingIndex を作成する。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore): 'Close' 列を含む価格データ。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+        distance (int): ピーク間の最小バー数。デフォルト 10。
+        prominence (float): ピークの最小突出度。デフォルト 5。
+        cache (IndicatorCache, optional): 計算結果のキャッシュ。data が MetalAnalyzer の
+            保持するデータの場合、同じデータに対する再計算を防ぎます。
+
+    Returns:
+        SwingIndex: 作成したインデックス。
+    """
+    if cache is not None and data is not None:
+        return cache.get(data, 'swings', (lookback, distance, prominence), SwingIndex.from_data)
+    with stage('swings'):
+        return SwingIndex.from_data(data, lookback, distance, prominence)
+
+
+def detect_patterns(data, threshold=0.03, lookback=100, kinds=None, distance=10, prominence=5, cache=None):
+    """価格データから複数のチャートパターンをまとめて検知する。
+
+    山・谷の検出 (find_peaks) は SwingIndex の作成時に1回だけ行い、
+    各パターンの検知関数はその結果を共有します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex。
+        threshold (float): 同じ高さとみなす山・谷の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+        kinds (iterable, optional): 検知するパターンの種類。省略時は PATTERN_DETECTORS の全て。
+        distance (int): ピーク間の最小バー数。デフォルト 10。
+        prominence (float): ピークの最小突出度。デフォルト 5。
+        cache (IndicatorCache, optional): SwingIndex のキャッシュ。
+
+    Returns:
+        dict: パターンの種類をキー、PatternResult を値とする辞書（kinds の順）。
+            `to_patterns_dict(*results.values())` で短期トレンド分析の patterns 辞書に変換できます。
+    """
+    if isinstance(data, SwingIndex):
+        swings = data
+    else:
+        swings = build_swing_index(data, lookback, distance, prominence, cache=cache)
+
+    results = {}
+    with stage('detectors'):
+        for kind in (kinds if kinds is not None else PATTERN_DETECTORS):
+            detector = PATTERN_DETECTORS[kind]
+            if kind in _THRESHOLD_PATTERNS:
+                results[kind] = detector(swings, threshold)
+            else:
+                results[kind] = detector(swings)
+    return results
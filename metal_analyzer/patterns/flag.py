@@ -0,0 +1,106 @@
+"""上昇フラッグ/下降フラッグを検知するモジュール。"""
+
+import numpy as np
+
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_SHAPE_MISMATCH,
+                     STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
+
+
+def _detect(data, pole_ratio, lookback, max_retrace, min_flag_bars, max_flag_bars, bear):
+    """上昇フラッグ（bear=True の場合は下降フラッグ）を判定する。"""
+    kind = 'bear_flag' if bear else 'bull_flag'
+    swings = as_swing_index(data, lookback)
+    if swings.empty:
+        return PatternResult(kind, False, STATUS_NO_DATA)
+
+    # 上昇フラッグは 谷 -> 山 のポール、下降フラッグは 山 -> 谷 のポール
+    sign = -1 if bear else 1
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
+    ends = swings.lows if bear else swings.highs
+    starts = swings.highs if bear else swings.lows
+    if len(ends) == 0:
+        return PatternResult(kind, False, STATUS_INSUFFICIENT, current_price=current_price, trend=trend)
+    pole_end = ends[-1]
+    starts = starts[starts < pole_end]
+    if len(starts) == 0:
+        return PatternResult(kind, False, STATUS_INSUFFICIENT, current_price=current_price, trend=trend)
+    pole_start = starts[-1]
+
+    start_price = float(prices[pole_start])
+    end_price = float(prices[pole_end])
+    peak_info = {
+        'peaks': swings.absolute((pole_start, pole_end)),
+        'peak_prices': (start_price, end_price),
+        'current_price': current_price,
+        'trend': trend,
+    }
+
+    # ポール（急な値動き）の大きさ
+    pole = (end_price - start_price) * sign
+    if pole / start_price < pole_ratio:
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, **peak_info)
+
+    # ポールの後、現在のバーの直前までの保ち合い（フラッグ）
+    flag = prices[pole_end + 1:len(prices) - 1] * sign
+    if not (min_flag_bars <= len(flag) <= max_flag_bars):
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, **peak_info)
+
+    # ポールの先端を超えず、戻りがポールの max_retrace 以内であること
+    if np.max(flag) > end_price * sign or (end_price * sign - np.min(flag)) / pole > max_retrace:
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, **peak_info)
+
+    # フラッグの上限（下降フラッグは下限） = ネックライン
+    neckline = float(np.max(flag) * sign)
+    detected = (current_price - neckline) * sign > 0
+    return PatternResult(kind, detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline, **peak_info)
+
+
+def detect_bull_flag(data, pole_ratio=0.02, lookback=100, max_retrace=0.5, min_flag_bars=3,
+                     max_flag_bars=20):
+    """上昇フラッグを検知し、フラッグの上抜けで買いシグナルを判定する。
+
+    直近の山とその前の谷の間の上昇（ポール）が pole_ratio 以上で、その後の保ち合いが
+    ポールの先端を超えず、戻りがポールの max_retrace 以内であることを確認し、
+    現在価格が保ち合いの高値を上回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        pole_ratio (float): ポールとみなす最小の上昇率。デフォルト 0.02 (2%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+        max_retrace (float): ポールに対する保ち合いの最大の戻り。デフォルト 0.5。
+        min_flag_bars (int): 保ち合いの最小バー数。デフォルト 3。
+        max_flag_bars (int): 保ち合いの最大バー数。デフォルト 20。
+
+    Returns:
+        PatternResult: 検知結果。peaks はポールの始点（谷）と先端（山）の位置、
+            neckline は保ち合いの高値です。
+    """
+    return _detect(data, pole_ratio, lookback, max_retrace, min_flag_bars, max_flag_bars, bear=False)
+
+
+def detect_bear_flag(data, pole_ratio=0.02, lookback=100, max_retrace=0.5, min_flag_bars=3,
+                     max_flag_bars=20):
+    """下降フラッグを検知し、フラッグの下抜けで売りシグナルを判定する。
+
+    直近の谷とその前の山の間の下落（ポール）が pole_ratio 以上で、その後の保ち合いが
+    ポールの先端を下回らず、戻りがポールの max_retrace 以内であることを確認し、
+    現在価格が保ち合いの安値を下回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        pole_ratio (float): ポールとみなす最小の下落率。デフォルト 0.02 (2%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+        max_retrace (float): ポールに対する保ち合いの最大の戻り。デフォルト 0.5。
+        min_flag_bars (int): 保ち合いの最小バー数。デフォルト 3。
+        max_flag_bars (int): 保ち合いの最大バー数。デフォルト 20。
+
+    Returns:
+        PatternResult: 検知結果。neckline は保ち合いの安値です。
+    """
+    return _detect(data, pole_ratio, lookback, max_retrace, min_flag_bars, max_flag_bars, bear=True)
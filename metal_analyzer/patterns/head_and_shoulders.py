@@ -0,0 +1,88 @@
+"""ヘッドアンドショルダー（三尊）と逆ヘッドアンドショルダー（逆三尊）を検知するモジュール。"""
+
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_DIFF_TOO_LARGE,
+                     STATUS_SHAPE_MISMATCH, STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
+
+
+def _detect(data, threshold, lookback, inverse):
+    """三尊（inverse=True の場合は逆三尊）を判定する。"""
+    kind = 'inverse_head_and_shoulders' if inverse else 'head_and_shoulders'
+    swings = as_swing_index(data, lookback)
+    if swings.empty:
+        return PatternResult(kind, False, STATUS_NO_DATA)
+
+    # 三尊は山、逆三尊は谷を使う。sign を掛けると逆三尊も三尊と同じ向きで比較できる
+    sign = -1 if inverse else 1
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
+    peaks = swings.last_lows(3) if inverse else swings.last_highs(3)
+    if len(peaks) < 3:
+        return PatternResult(kind, False, STATUS_INSUFFICIENT, current_price=current_price, trend=trend)
+
+    left, head, right = (float(prices[p]) for p in peaks)
+    peak_info = {
+        'peaks': swings.absolute(peaks),
+        'peak_prices': (left, head, right),
+        'current_price': current_price,
+        'trend': trend,
+    }
+
+    # 頭が両肩より突出しているか
+    if (head - left) * sign <= 0 or (head - right) * sign <= 0:
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, **peak_info)
+
+    # 両肩の高さが揃っているか
+    diff_ratio = abs(left - right) / left
+    if diff_ratio > threshold:
+        return PatternResult(kind, False, STATUS_DIFF_TOO_LARGE, diff_ratio=diff_ratio, **peak_info)
+
+    # 肩と頭の間の2つの谷（逆三尊は山）を結んだ線 = ネックライン
+    between = swings.highest_between if inverse else swings.lowest_between
+    t1 = between(peaks[0], peaks[1])
+    t2 = between(peaks[1], peaks[2])
+    slope = (prices[t2] - prices[t1]) / (t2 - t1)
+    neckline = float(prices[t2] + slope * (len(prices) - 1 - t2))
+
+    # 三尊はネックライン割れ、逆三尊はネックライン上抜けでシグナル
+    detected = (current_price - neckline) * sign < 0
+    return PatternResult(kind, detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline, diff_ratio=diff_ratio, **peak_info)
+
+
+def detect_head_and_shoulders(data, threshold=0.03, lookback=100):
+    """ヘッドアンドショルダー（三尊）を検知し、ネックライン割れで売りシグナルを判定する。
+
+    直近3つの山のうち中央（頭）が最も高く、両肩の高さの差が threshold 以内であることを確認し、
+    2つの谷を結んだネックラインを現在価格が下回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 両肩の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。peaks は (左肩, 頭, 右肩) の位置、
+            neckline はネックラインを現在のバーまで延長した価格です。
+    """
+    return _detect(data, threshold, lookback, inverse=False)
+
+
+def detect_inverse_head_and_shoulders(data, threshold=0.03, lookback=100):
+    """逆ヘッドアンドショルダー（逆三尊）を検知し、ネックライン上抜けで買いシグナルを判定する。
+
+    直近3つの谷のうち中央（頭）が最も安く、両肩の安値の差が threshold 以内であることを確認し、
+    2つの山を結んだネックラインを現在価格が上回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 両肩の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。peaks は (左肩, 頭, 右肩) の位置です。
+    """
+    return _detect(data, threshold, lookback, inverse=True)
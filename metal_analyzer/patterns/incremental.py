@@ -0,0 +1,171 @@
+"""逐次更新型（インクリメンタル）のチャートパターン検知を提供するモジュール。
+
+このモジュールは、バーを逐次取り込みながらダブルトップ/ダブルボトムを判定する
+DoubleTopDetector / DoubleBottomDetector を提供します。
+
+検知器は直近 lookback 本の終値をリングバッファに保持し、判定時にそのウィンドウに対して
+`detect_double_top` / `detect_double_bottom` と同じ find_peaks (prominence / distance) を
+実行するため、判定結果は一括の検知関数と常に一致します。
+バーの取り込みは O(1) ですが、1回の判定は O(lookback) です（償却 O(1) ではありません）。
+find_peaks の prominence はウィンドウの端と distance による間引きに依存し、
+バーごとの差分更新では一致を保証できないため、判定時にウィンドウ全体を評価します。
+確定バーの取り込みだけでは判定せず、結果を参照したときに1回だけ判定します。
+"""
+
+import numpy as np
+
+from ..core.store import column_values
+from .swings import SwingIndex
+from .double_top import detect_double_top
+from .double_bottom import detect_double_bottom
+
+
+class _DoublePatternDetector:
+    """ダブルトップ/ダブルボトムの逐次検知の共通処理。
+
+    Attributes:
+        threshold (float): 2つの山（谷）の価格差の許容割合。
+        lookback (int): 判定対象とする直近のバー数。
+        distance (int): 山（谷）の間の最小バー数。
+        prominence (float): 山（谷）の最小突出度。
+    """
+
+    kind = None
+
+    def __init__(self, threshold=0.03, lookback=100, distance=10, prominence=5):
+        """検知器を初期化する。
+
+        Args:
+            threshold (float): 2つの山（谷）の価格差の許容割合。デフォルト 0.03 (3%)。
+            lookback (int): 判定対象とする直近のバー数。デフォルト 100。
+            distance (int): 山（谷）の間の最小バー数。デフォルト 10。
+            prominence (float): 山（谷）の最小突出度。デフォルト 5。
+        """
+        self.threshold = threshold
+        self.lookback = lookback
+        self.distance = distance
+        self.prominence = prominence
+        # 直近 lookback 本を常に連続した領域として参照できるよう、同じ値を2か所に書き込む
+        self._buffer = np.empty(2 * lookback, dtype=np.float64)
+        self._pos = 0
+        self._count = 0
+        self._result = None
+
+    @classmethod
+    def from_series(cls, data, **kwargs):
+        """既存の価格データを取り込んだ検知器を作成する。
+
+        Args:
+            data (pd.DataFrame or OHLCVStore): 'Close' 列を含む価格データ。
+            **kwargs: コンストラクタの引数。
+
+        Returns:
+            検知器のインスタンス。
+        """
+        detector = cls(**kwargs)
+        detector.extend(column_values(data, 'Close'))
+        return detector
+
+    @property
+    def count(self):
+        """取り込んだバーの本数。"""
+        return self._count
+
+    @property
+    def result(self):
+        """最後に取り込んだバー時点の判定結果（バーがない場合は None）。
+
+        判定は参照時に1回だけ行い、次のバーを取り込むまで再利用します。
+        """
+        if self._result is None and self._count:
+            self._result = self._evaluate(self._window(), self._count)
+        return self._result
+
+    def _window(self):
+        """直近 lookback 本の終値（コピーなしのビュー）。"""
+        size = min(self._count, self.lookback)
+        end = self.lookback + self._pos
+        return self._buffer[end - size:end]
+
+    def append(self, close):
+        """確定したバーの終値を判定せずに取り込む。
+
+        Args:
+            close (float): 終値。
+        """
+        close = float(close)
+        self._buffer[self._pos] = close
+        self._buffer[self._pos + self.lookback] = close
+        self._pos = (self._pos + 1) % self.lookback
+        self._count += 1
+        self._result = None
+
+    def extend(self, closes):
+        """複数の確定したバーの終値をまとめて取り込む。
+
+        Args:
+            closes (iterable): 終値の系列。
+
+        Returns:
+            PatternResult or None: 最後のバー時点の判定結果。
+        """
+        for close in closes:
+            self.append(close)
+        return self.result
+
+    def update(self, close):
+        """確定したバーの終値を取り込み、判定結果を更新する。
+
+        Args:
+            close (float): 終値。
+
+        Returns:
+            PatternResult: このバー時点の判定結果。
+        """
+        self.append(close)
+        return self.result
+
+    def peek(self, close):
+        """形成中のバーの終値を現在値として判定する（状態は変更しない）。
+
+        Args:
+            close (float): 形成中のバーの終値。
+
+        Returns:
+            PatternResult: 形成中のバーを最新とした判定結果。
+        """
+        prices = self._window()[1:] if self._count >= self.lookback else self._window()
+        return self._evaluate(np.append(prices, float(close)), self._count + 1)
+
+    def _evaluate(self, prices, n):
+        """直近 lookback 本の終値に一括の検知関数と同じ判定を行う。"""
+        swings = SwingIndex(prices, offset=n - len(prices),
+                            distance=self.distance, prominence=self.prominence)
+        return self._detect(swings, self.threshold)
+
+
+class DoubleTopDetector(_DoublePatternDetector):
+    """ダブルトップ（Mトップ）を逐次検知するクラス。
+
+    直近の2つの山の価格差が threshold 以内で、現在値がその間の谷（ネックライン）を
+    下回った場合に検知します。判定結果は同じ lookback の `detect_double_top` と一致します。
+
+    Examples:
+        >>> detector = DoubleTopDetector.from_series(h1_df)
+        >>> result = detector.update(new_close)
+        >>> result.detected, result.neckline
+    """
+
+    kind = 'double_top'
+    _detect = staticmethod(detect_double_top)
+
+
+class DoubleBottomDetector(_DoublePatternDetector):
+    """ダブルボトム（Wボトム）を逐次検知するクラス。
+
+    直近の2つの谷の価格差が threshold 以内で、現在値がその間の山（ネックライン）を
+    上回った場合に検知します。判定結果は同じ lookback の `detect_double_bottom` と一致します。
+    """
+
+    kind = 'double_bottom'
+    _detect = staticmethod(detect_double_bottom)
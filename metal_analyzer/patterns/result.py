@@ -0,0 +1,196 @@
+"""チャートパターン検知結果を表すクラスを提供するモジュール。
+
+このモジュールは、検知結果の数値情報を保持する軽量な PatternResult と、
+表示用メッセージを生成する format_pattern_message を提供します。
+メッセージは `message` を参照したときに初めて生成されるため、
+大量の判定を行う場合でも文字列の整形は発生しません。
+"""
+
+# 状態コード
+STATUS_NO_DATA = 'no_data'
+STATUS_INSUFFICIENT = 'insufficient_peaks'
+STATUS_DIFF_TOO_LARGE = 'diff_too_large'
+STATUS_FORMING = 'forming'
+STATUS_DETECTED = 'detected'
+STATUS_SHAPE_MISMATCH = 'shape_mismatch'
+
+# 短期トレンド分析の patterns 辞書でネックラインを格納するキー
+# （ここにないパターンは "neckline_{パターンの種類}"）
+NECKLINE_KEYS = {
+    'double_top': 'neckline_top',
+    'double_bottom': 'neckline_bottom',
+}
+
+# パターンの表示名
+PATTERN_NAMES = {
+    'double_top': 'ダブルトップ',
+    'double_bottom': 'ダブルボトム',
+    'head_and_shoulders': 'ヘッドアンドショルダー（三尊）',
+    'inverse_head_and_shoulders': '逆ヘッドアンドショルダー（逆三尊）',
+    'triple_top': 'トリプルトップ',
+    'triple_bottom': 'トリプルボトム',
+    'ascending_triangle': '上昇三角保ち合い',
+    'descending_triangle': '下降三角保ち合い',
+    'bull_flag': '上昇フラッグ',
+    'bear_flag': '下降フラッグ',
+}
+
+# ネックライン（ブレイクの基準線）を下抜けると成立する弱気パターン
+BEARISH_PATTERNS = ('double_top', 'head_and_shoulders', 'triple_top', 'descending_triangle', 'bear_flag')
+# ネックライン（ブレイクの基準線）を上抜けると成立する強気パターン
+BULLISH_PATTERNS = ('double_bottom', 'inverse_head_and_shoulders', 'triple_bottom', 'ascending_triangle',
+                    'bull_flag')
+# 短期トレンド分析のスコアに反映する反転パターン（優先度順）
+BEARISH_REVERSALS = ('double_top', 'head_and_shoulders', 'triple_top')
+BULLISH_REVERSALS = ('double_bottom', 'inverse_head_and_shoulders', 'triple_bottom')
+
+
+def neckline_key(kind):
+    """patterns 辞書でパターンのネックラインを格納するキーを返す。"""
+    return NECKLINE_KEYS.get(kind, f"neckline_{kind}")
+
+_TREND_DESCRIPTIONS = {
+    'up': "現在は上昇トレンドにあります。",
+    'down': "現在は下落トレンドにあります。",
+    'range': "現在は横ばい（レンジ）トレンドにあります。",
+}
+
+
+def format_pattern_message(result):
+    """検知結果から日本語の詳細メッセージを生成する。
+
+    Args:
+        result (PatternResult): 検知結果。
+
+    Returns:
+        str: 詳細メッセージ。
+    """
+    status = result.status
+    if status == STATUS_NO_DATA:
+        return "分析対象のデータがありません"
+
+    if result.kind == 'double_top':
+        trend_desc = _TREND_DESCRIPTIONS.get(result.trend, "")
+        if status == STATUS_INSUFFICIENT:
+            return f"ピークが不足しています。{trend_desc}"
+        if status == STATUS_DIFF_TOO_LARGE:
+            return f"ピークの価格差が大きすぎます: {result.diff_ratio:.2%}。{trend_desc}"
+        if status == STATUS_DETECTED:
+            p1, p2 = result.peak_prices
+            return (f"ダブルトップを検知しました！ ピーク: {p1:.2f}, {p2:.2f}. "
+                    f"ネックライン {result.neckline:.2f} を下回ったため、売りシグナルです。")
+        return (f"パターン形成中ですが、ネックラインを割り込んでいません。"
+                f"ネックライン: {result.neckline:.2f}, 現在値: {result.current_price:.2f}")
+
+    if result.kind == 'double_bottom':
+        if status == STATUS_INSUFFICIENT:
+            return "谷が不足しています。"
+        if status == STATUS_DIFF_TOO_LARGE:
+            return f"谷の価格差が大きすぎます: {result.diff_ratio:.2%}。"
+        if status == STATUS_DETECTED:
+            v1, v2 = result.peak_prices
+            return (f"ダブルボトムを検知しました！ 谷: {v1:.2f}, {v2:.2f}. "
+                    f"ネックライン {result.neckline:.2f} を上抜けたため、買いシグナルです。")
+        return (f"Wボトム形成中ですが、ネックラインを上抜けていません。"
+                f"ネックライン: {result.neckline:.2f}, 現在値: {result.current_price:.2f}")
+
+    name = PATTERN_NAMES.get(result.kind, result.kind)
+    if status == STATUS_INSUFFICIENT:
+        return f"{name}: 山・谷が不足しています。"
+    if status == STATUS_DIFF_TOO_LARGE:
+        return f"{name}: 価格差が大きすぎます: {result.diff_ratio:.2%}。"
+    if status == STATUS_SHAPE_MISMATCH:
+        return f"{name}: パターンの形状が成立していません。"
+    if status == STATUS_DETECTED:
+        if result.kind in BULLISH_PATTERNS:
+            return f"{name}を検知しました！ ネックライン {result.neckline:.2f} を上抜けたため、買いシグナルです。"
+        return f"{name}を検知しました！ ネックライン {result.neckline:.2f} を下回ったため、売りシグナルです。"
+    if status == STATUS_FORMING:
+        return (f"{name}形成中ですが、ネックラインをブレイクしていません。"
+                f"ネックライン: {result.neckline:.2f}, 現在値: {result.current_price:.2f}")
+    return f"{result.kind}: {status}"
+
+
+class PatternResult:
+    """チャートパターンの検知結果。
+
+    従来の戻り値 `(is_detected, signal_details)` と同じようにタプルとして
+    展開・添字参照できます（`detected, details = detect_double_top(df)`）。
+    ただし details を参照するとメッセージが生成されるため、大量に判定する場合は
+    `detected` や `neckline` などの属性を直接参照してください。
+
+    Attributes:
+        kind (str): パターンの種類（'double_top', 'head_and_shoulders' など。PATTERN_NAMES を参照）。
+        detected (bool): パターンが成立し、シグナル条件を満たしているか。
+        status (str): 判定結果の状態コード（'no_data', 'insufficient_peaks',
+            'diff_too_large', 'shape_mismatch', 'forming', 'detected'）。
+        peaks (tuple): 判定に使用したピーク（谷）の位置（入力データ先頭からの位置）。
+        peak_prices (tuple): 各ピーク（谷）の価格。
+        neckline (float or None): ネックライン（ブレイクの基準線）の現在位置での価格。
+        current_price (float or None): 現在値（最終バーの終値）。
+        trend (str or None): 判定期間のトレンド（'up', 'down', 'range'）。
+        diff_ratio (float or None): 同じ高さとみなすピーク（谷）の価格差の割合。
+    """
+
+    __slots__ = ('kind', 'detected', 'status', 'peaks', 'peak_prices', 'neckline',
+                 'current_price', 'trend', 'diff_ratio', '_message')
+
+    def __init__(self, kind, detected, status, peaks=(), peak_prices=(), neckline=None,
+                 current_price=None, trend=None, diff_ratio=None):
+        self.kind = kind
+        self.detected = detected
+        self.status = status
+        self.peaks = peaks
+        self.peak_prices = peak_prices
+        self.neckline = neckline
+        self.current_price = current_price
+        self.trend = trend
+        self.diff_ratio = diff_ratio
+        self._message = None
+
+    @property
+    def message(self):
+        """日本語の詳細メッセージ（初回参照時に生成）。"""
+        if self._message is None:
+            self._message = format_pattern_message(self)
+        return self._message
+
+    def __iter__(self):
+        yield self.detected
+        yield self.message
+
+    def __getitem__(self, i):
+        return (self.detected, self.message)[i]
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, (PatternResult, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return (f"PatternResult(kind={self.kind!r}, detected={self.detected}, status={self.status!r}, "
+                f"neckline={self.neckline!r}, current_price={self.current_price!r})")
+
+
+def to_patterns_dict(*results):
+    """検知結果を `analyze_short_trend` の patterns 辞書に変換する。
+
+    Args:
+        *results (PatternResult): 検知結果。
+
+    Returns:
+        dict: 例 {'double_top': True, 'double_bottom': False, 'neckline_top': 2500.0}
+            ネックラインは検知されたパターンのみ格納します（キーは `neckline_key` を参照）。
+    """
+    patterns = {}
+    for result in results:
+        patterns[result.kind] = result.detected
+        if result.detected and result.neckline is not None:
+            patterns[neckline_key(result.kind)] = result.neckline
+    return patterns
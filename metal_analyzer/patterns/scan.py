@@ -0,0 +1,128 @@
+"""全期間のダブルトップ/ダブルボトムを一括で検出するモジュール。
+
+このモジュールは、価格系列全体に対して find_peaks を1回だけ実行し、
+成立したダブルトップ/ダブルボトムの全インスタンスを DataFrame で返す関数を提供します。
+バーごとに `detect_double_top` を呼び出す場合 (O(n・lookback)) と異なり、
+計算量は系列の長さにほぼ比例します。
+
+ピークは全期間で判定するため、プロミネンス（突出度）は直近 lookback 本だけで
+判定する `detect_double_top` とは異なる場合があります。研究・検証用の一覧として使用してください。
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.signal import find_peaks
+
+from ..core.store import column_values
+
+SCAN_COLUMNS = ['peak1_idx', 'peak2_idx', 'peak1_time', 'peak2_time', 'peak1_price', 'peak2_price',
+                'diff_ratio', 'neckline_idx', 'neckline', 'breakout_idx', 'breakout_time',
+                'breakout_price', 'confirmed']
+
+
+def _scan(data, threshold, lookback, distance, prominence, bottom):
+    """ダブルトップ（bottom=True の場合はダブルボトム）を全期間で検出する。"""
+    prices = np.asarray(column_values(data, 'Close'), dtype=np.float64)
+    n = len(prices)
+    if n == 0:
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+
+    # 谷は価格を反転させて山として検出する
+    signed = -prices if bottom else prices
+    peaks, _ = find_peaks(signed, distance=distance, prominence=prominence)
+    if len(peaks) < 2:
+        return pd.DataFrame(columns=SCAN_COLUMNS)
+
+    # 隣り合うピークの組ごとの価格差
+    p1 = peaks[:-1]
+    p2 = peaks[1:]
+    diff_ratio = np.abs(prices[p1] - prices[p2]) / prices[p1]
+
+    candidates = np.flatnonzero(diff_ratio <= threshold)
+    # 次のピークが現れるまで（lookback 指定時は1つ目のピークから lookback 本以内）にブレイクを探す
+    next_peak = np.append(peaks[2:], n)
+    limit = next_peak[candidates]
+    if lookback is not None:
+        limit = np.minimum(limit, p1[candidates] + lookback)
+
+    neck_idx = np.empty(len(candidates), dtype=np.int64)
+    breakout_idx = np.full(len(candidates), -1, dtype=np.int64)
+    for k, c in enumerate(candidates):
+        start, stop = p1[c], p2[c]
+        # 2つのピークの間の谷（ボトムの場合は山）= ネックライン
+        neck_idx[k] = start + int(np.argmin(signed[start:stop]))
+        window = signed[stop + 1:limit[k]]
+        # 反転後の価格がネックラインを下回る（= ネックライン割れ/上抜け）最初のバー
+        hits = np.flatnonzero(window < signed[neck_idx[k]])
+        if len(hits) > 0:
+            breakout_idx[k] = stop + 1 + hits[0]
+
+    index = data.index
+    confirmed = breakout_idx >= 0
+    safe_breakout = np.where(confirmed, breakout_idx, 0)
+    result = pd.DataFrame({
+        'peak1_idx': p1[candidates],
+        'peak2_idx': p2[candidates],
+        'peak1_time': index[p1[candidates]],
+        'peak2_time': index[p2[candidates]],
+        'peak1_price': prices[p1[candidates]],
+        'peak2_price': prices[p2[candidates]],
+        'diff_ratio': diff_ratio[candidates],
+        'neckline_idx': neck_idx,
+        'neckline': prices[neck_idx],
+        'breakout_idx': breakout_idx,
+        'breakout_time': pd.Series(index[safe_breakout]).where(confirmed).to_numpy(),
+        'breakout_price': np.where(confirmed, prices[safe_breakout], np.nan),
+        'confirmed': confirmed,
+    })
+    return result
+
+
+def scan_double_tops(df, threshold=0.03, lookback=100, distance=10, prominence=5):
+    """全期間のダブルトップ（Mトップ）を一括で検出する。
+
+    隣り合う2つのピークの価格差が threshold 以内の組を全て列挙し、
+    その後に終値がネックライン（2つのピークの間の最安値）を下回った最初のバーを
+    ブレイクとして記録します。
+
+    Args:
+        df (pd.DataFrame or OHLCVStore): 'Close' 列を含む価格データ。
+        threshold (float): 2つの頂点の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int or None): 1つ目のピークからブレイクまでの最大バー数。
+            None の場合は次のピークが現れるまで探します。デフォルト 100。
+        distance (int): ピーク間の最小バー数。デフォルト 10。
+        prominence (float): ピークの最小プロミネンス。デフォルト 5。
+
+    Returns:
+        pd.DataFrame: パターンごとの行を持つデータフレーム。
+            - peak1_idx, peak2_idx, peak1_time, peak2_time: 2つのピークの位置と時刻
+            - peak1_price, peak2_price: 2つのピークの終値
+            - diff_ratio: ピークの価格差の割合
+            - neckline_idx, neckline: ネックラインの位置と価格
+            - breakout_idx, breakout_time, breakout_price: ネックライン割れのバー
+              （ブレイクしていない場合は -1 / NaT / NaN）
+            - confirmed: ネックラインを割り込んだか
+    """
+    return _scan(df, threshold, lookback, distance, prominence, bottom=False)
+
+
+def scan_double_bottoms(df, threshold=0.03, lookback=100, distance=10, prominence=5):
+    """全期間のダブルボトム（Wボトム）を一括で検出する。
+
+    隣り合う2つの谷の価格差が threshold 以内の組を全て列挙し、
+    その後に終値がネックライン（2つの谷の間の最高値）を上回った最初のバーを
+    ブレイクとして記録します。
+
+    Args:
+        df (pd.DataFrame or OHLCVStore): 'Close' 列を含む価格データ。
+        threshold (float): 2つの谷の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int or None): 1つ目の谷からブレイクまでの最大バー数。
+            None の場合は次の谷が現れるまで探します。デフォルト 100。
+        distance (int): 谷の間の最小バー数。デフォルト 10。
+        prominence (float): 谷の最小プロミネンス。デフォルト 5。
+
+    Returns:
+        pd.DataFrame: `scan_double_tops` と同じ列を持つデータフレーム
+            （peak は谷、ブレイクはネックラインの上抜けを表します）。
+    """
+    return _scan(df, threshold, lookback, distance, prominence, bottom=True)
@@ -0,0 +1,130 @@
+"""チャートパターン検知で共有する山・谷（スイング）のインデックスを提供するモジュール。
+
+このモジュールは、直近の価格に対して find_peaks を山と谷で1回ずつ実行し、
+その結果を保持する SwingIndex を提供します。ダブルトップ・三尊・三角保ち合いなどの
+各検知関数は同じ SwingIndex を参照するため、検知するパターンを増やしても
+ピーク検出の計算は増えません。
+"""
+
+import numpy as np
+from scipy.signal import find_peaks
+
+from ..core.store import column_values
+
+
+class SwingIndex:
+    """直近 lookback 本の終値から検出した山・谷の位置と突出度を保持するクラス。
+
+    位置はウィンドウ（直近 lookback 本）の先頭からの位置です。
+    入力データ先頭からの位置は `offset` を加えて求めます。
+
+    Attributes:
+        prices (np.ndarray): ウィンドウ内の終値。
+        offset (int): 入力データ先頭からウィンドウ先頭までのバー数。
+        highs (np.ndarray): 山の位置（昇順）。
+        lows (np.ndarray): 谷の位置（昇順）。
+        high_prominences (np.ndarray): 各山の突出度。
+        low_prominences (np.ndarray): 各谷の突出度。
+        distance (int): ピーク間の最小バー数。
+        prominence (float): ピークの最小突出度。
+    """
+
+    def __init__(self, prices, offset=0, distance=10, prominence=5):
+        """SwingIndex を作成する。
+
+        Args:
+            prices (array-like): 終値の配列。
+            offset (int): 入力データ先頭から prices 先頭までのバー数。
+            distance (int): ピーク間の最小バー数。デフォルト 10。
+            prominence (float): ピークの最小突出度。デフォルト 5。
+        """
+        self.prices = np.asarray(prices)
+        self.offset = offset
+        self.distance = distance
+        self.prominence = prominence
+
+        if len(self.prices) == 0:
+            empty = np.empty(0, dtype=np.intp)
+            self.highs, self.lows = empty, empty
+            self.high_prominences = self.low_prominences = np.empty(0)
+            return
+
+        self.highs, high_props = find_peaks(self.prices, distance=distance, prominence=prominence)
+        # 谷を検出するために価格を反転させる（find_peaksは山を探すため）
+        self.lows, low_props = find_peaks(-self.prices, distance=distance, prominence=prominence)
+        self.high_prominences = high_props['prominences']
+        self.low_prominences = low_props['prominences']
+
+    @classmethod
+    def from_data(cls, data, lookback=100, distance=10, prominence=5):
+        """価格データの直近 lookback 本から SwingIndex を作成する。
+
+        Args:
+            data (pd.DataFrame or OHLCVStore): 'Close' 列を含む価格データ。
+            lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+            distance (int): ピーク間の最小バー数。デフォルト 10。
+            prominence (float): ピークの最小突出度。デフォルト 5。
+
+        Returns:
+            SwingIndex: 作成したインデックス。データがない場合は空のインデックス。
+        """
+        if data is None or data.empty:
+            return cls(np.empty(0), distance=distance, prominence=prominence)
+        closes = column_values(data, 'Close')
+        prices = closes[-lookback:]
+        return cls(prices, offset=len(closes) - len(prices), distance=distance, prominence=prominence)
+
+    @property
+    def empty(self):
+        """価格データがないか。"""
+        return len(self.prices) == 0
+
+    @property
+    def current_price(self):
+        """現在値（最終バーの終値）。"""
+        return float(self.prices[-1])
+
+    @property
+    def trend(self):
+        """ウィンドウの開始時と現在を比較したトレンド（'up', 'down', 'range'）。"""
+        change_rate = (self.prices[-1] - self.prices[0]) / self.prices[0]
+        if change_rate >= 0.01:
+            return 'up'
+        if change_rate <= -0.01:
+            return 'down'
+        return 'range'
+
+    def last_highs(self, n=2):
+        """直近 n 個の山の位置を返す（古い順）。"""
+        return self.highs[-n:]
+
+    def last_lows(self, n=2):
+        """直近 n 個の谷の位置を返す（古い順）。"""
+        return self.lows[-n:]
+
+    def lowest_between(self, start, end):
+        """位置 start から end の直前までで最も安いバーの位置を返す。"""
+        return start + int(np.argmin(self.prices[start:end]))
+
+    def highest_between(self, start, end):
+        """位置 start から end の直前までで最も高いバーの位置を返す。"""
+        return start + int(np.argmax(self.prices[start:end]))
+
+    def absolute(self, positions):
+        """ウィンドウ内の位置を入力データ先頭からの位置に変換する。"""
+        return tuple(self.offset + int(p) for p in positions)
+
+
+def as_swing_index(data, lookback=100):
+    """価格データまたは SwingIndex を SwingIndex として返す。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 価格データ、または作成済みのインデックス。
+        lookback (int): 価格データから作成する場合に対象とする過去のデータ数。
+
+    Returns:
+        SwingIndex: data が SwingIndex の場合はそのまま返します。
+    """
+    if isinstance(data, SwingIndex):
+        return data
+    return SwingIndex.from_data(data, lookback)
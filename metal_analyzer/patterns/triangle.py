@@ -0,0 +1,91 @@
+"""上昇三角保ち合い/下降三角保ち合いを検知するモジュール。"""
+
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_DIFF_TOO_LARGE,
+                     STATUS_SHAPE_MISMATCH, STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
+
+
+def _detect(data, threshold, lookback, descending):
+    """上昇三角保ち合い（descending=True の場合は下降三角保ち合い）を判定する。"""
+    kind = 'descending_triangle' if descending else 'ascending_triangle'
+    swings = as_swing_index(data, lookback)
+    if swings.empty:
+        return PatternResult(kind, False, STATUS_NO_DATA)
+
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
+    highs = swings.last_highs(2)
+    lows = swings.last_lows(2)
+    if len(highs) < 2 or len(lows) < 2:
+        return PatternResult(kind, False, STATUS_INSUFFICIENT, current_price=current_price, trend=trend)
+
+    # 上昇三角は高値が水平・安値が切り上がり、下降三角は安値が水平・高値が切り下がる
+    flat, sloped = (lows, highs) if descending else (highs, lows)
+    positions = sorted(list(highs) + list(lows))
+    peak_info = {
+        'peaks': swings.absolute(positions),
+        'peak_prices': tuple(float(prices[p]) for p in positions),
+        'current_price': current_price,
+        'trend': trend,
+    }
+
+    flat1, flat2 = float(prices[flat[0]]), float(prices[flat[1]])
+    slope1, slope2 = float(prices[sloped[0]]), float(prices[sloped[1]])
+
+    # 山と谷が交互に現れている（保ち合いの中にある）か
+    if not (lows[1] > highs[0] and highs[1] > lows[0]):
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, **peak_info)
+
+    # 水平な側の価格差
+    diff_ratio = abs(flat1 - flat2) / flat1
+    if diff_ratio > threshold:
+        return PatternResult(kind, False, STATUS_DIFF_TOO_LARGE, diff_ratio=diff_ratio, **peak_info)
+
+    # 傾いた側が水平な側へ収束しているか（水平な側の価格差より大きく動いている）
+    sign = -1 if descending else 1
+    if (slope2 - slope1) * sign / slope1 <= diff_ratio:
+        return PatternResult(kind, False, STATUS_SHAPE_MISMATCH, diff_ratio=diff_ratio, **peak_info)
+
+    # 水平な側（上昇三角は抵抗線、下降三角は支持線） = ネックライン
+    neckline = min(flat1, flat2) if descending else max(flat1, flat2)
+    detected = (current_price - neckline) * sign > 0
+    return PatternResult(kind, detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline, diff_ratio=diff_ratio, **peak_info)
+
+
+def detect_ascending_triangle(data, threshold=0.03, lookback=100):
+    """上昇三角保ち合いを検知し、抵抗線の上抜けで買いシグナルを判定する。
+
+    直近2つの山の高さの差が threshold 以内（水平な抵抗線）で、直近2つの谷が
+    それ以上の割合で切り上がっていることを確認し、現在価格が抵抗線を上回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 水平とみなす2つの山の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。peaks は使用した2つの山と2つの谷の位置（古い順）、
+            neckline は抵抗線の価格です。
+    """
+    return _detect(data, threshold, lookback, descending=False)
+
+
+def detect_descending_triangle(data, threshold=0.03, lookback=100):
+    """下降三角保ち合いを検知し、支持線の下抜けで売りシグナルを判定する。
+
+    直近2つの谷の安値の差が threshold 以内（水平な支持線）で、直近2つの山が
+    それ以上の割合で切り下がっていることを確認し、現在価格が支持線を下回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 水平とみなす2つの谷の価格差の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。neckline は支持線の価格です。
+    """
+    return _detect(data, threshold, lookback, descending=True)
@@ -0,0 +1,80 @@
+"""トリプルトップ/トリプルボトムを検知するモジュール。"""
+
+from .result import (PatternResult, STATUS_NO_DATA, STATUS_INSUFFICIENT, STATUS_DIFF_TOO_LARGE,
+                     STATUS_FORMING, STATUS_DETECTED)
+from .swings import as_swing_index
+
+
+def _detect(data, threshold, lookback, bottom):
+    """トリプルトップ（bottom=True の場合はトリプルボトム）を判定する。"""
+    kind = 'triple_bottom' if bottom else 'triple_top'
+    swings = as_swing_index(data, lookback)
+    if swings.empty:
+        return PatternResult(kind, False, STATUS_NO_DATA)
+
+    prices = swings.prices
+    current_price = swings.current_price
+    trend = swings.trend
+    peaks = swings.last_lows(3) if bottom else swings.last_highs(3)
+    if len(peaks) < 3:
+        return PatternResult(kind, False, STATUS_INSUFFICIENT, current_price=current_price, trend=trend)
+
+    peak_prices = tuple(float(prices[p]) for p in peaks)
+    peak_info = {
+        'peaks': swings.absolute(peaks),
+        'peak_prices': peak_prices,
+        'current_price': current_price,
+        'trend': trend,
+    }
+
+    # 3つの山（谷）の高さが揃っているか
+    diff_ratio = (max(peak_prices) - min(peak_prices)) / peak_prices[0]
+    if diff_ratio > threshold:
+        return PatternResult(kind, False, STATUS_DIFF_TOO_LARGE, diff_ratio=diff_ratio, **peak_info)
+
+    # 1つ目と3つ目の間の最安値（トリプルボトムは最高値） = ネックライン
+    if bottom:
+        neck_idx = swings.highest_between(peaks[0], peaks[2])
+    else:
+        neck_idx = swings.lowest_between(peaks[0], peaks[2])
+    neckline = float(prices[neck_idx])
+
+    detected = current_price > neckline if bottom else current_price < neckline
+    return PatternResult(kind, detected, STATUS_DETECTED if detected else STATUS_FORMING,
+                         neckline=neckline, diff_ratio=diff_ratio, **peak_info)
+
+
+def detect_triple_top(data, threshold=0.03, lookback=100):
+    """トリプルトップを検知し、ネックライン割れで売りシグナルを判定する。
+
+    直近3つの山の高さの差が threshold 以内であることを確認し、
+    その間の最安値（ネックライン）を現在価格が下回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 3つの山の価格差（最高値 - 最安値）の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。
+    """
+    return _detect(data, threshold, lookback, bottom=False)
+
+
+def detect_triple_bottom(data, threshold=0.03, lookback=100):
+    """トリプルボトムを検知し、ネックライン上抜けで買いシグナルを判定する。
+
+    直近3つの谷の安値の差が threshold 以内であることを確認し、
+    その間の最高値（ネックライン）を現在価格が上回っているかを判定します。
+
+    Args:
+        data (pd.DataFrame or OHLCVStore or SwingIndex): 'Close' 列を含む価格データ、
+            または作成済みの SwingIndex（この場合 lookback は無視されます）。
+        threshold (float): 3つの谷の価格差（最高値 - 最安値）の許容割合。デフォルト 0.03 (3%)。
+        lookback (int): 分析対象とする過去のデータ数。デフォルト 100。
+
+    Returns:
+        PatternResult: 検知結果。
+    """
+    return _detect(data, threshold, lookback, bottom=True)
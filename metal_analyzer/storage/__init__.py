@@ -0,0 +1,9 @@
+"""価格データの永続化機能を提供するパッケージ。
+
+(ティッカー, 時間足) ごとの OHLCV をディスクに追記保存し、
+メモリマップで期間を切り出して読み出すバーアーカイブが含まれます。
+"""
+
+from .archive import BarArchive
+
+__all__ = ['BarArchive']
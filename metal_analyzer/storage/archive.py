@@ -0,0 +1,232 @@
+"""OHLCV データをディスクに保存するバーアーカイブを提供するモジュール。
+
+このモジュールは、(ティッカー, 時間足) ごとの OHLCV を列ごとのバイナリファイルに
+追記保存し、メモリマップで読み出す BarArchive クラスを提供します。
+読み出しはファイル全体をメモリに読み込まず、必要な期間のページだけを参照します。
+
+ディレクトリ構成:
+    <root>/<ticker>/<interval>/meta.json
+    <root>/<ticker>/<interval>/timestamp.bin, open.bin, high.bin, low.bin, close.bin, volume.bin
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from ..core.store import OHLCVStore, OHLCV_COLUMNS, PRICE_COLUMNS
+
+_FORMAT_VERSION = 1
+
+
+def _safe_name(name):
+    """ティッカー名や時間足名をディレクトリ名として使える文字列に変換する。"""
+    return re.sub(r'[^\w.=^-]', '_', str(name))
+
+
+class BarArchive:
+    """メモリマップで読み出せる追記型の OHLCV アーカイブ。
+
+    `write` は保存済みの最終バーより新しいバーだけを追記します（最終バーと同じ時刻の
+    バーは形成途中だった可能性があるため上書きします）。`read` は指定期間を
+    OHLCVStore として返し、その配列はファイルのメモリマップを直接参照します。
+
+    Attributes:
+        root (str): アーカイブのルートディレクトリ。
+        dtype (np.dtype): 新規に作成する系列の価格列のデータ型。
+    """
+
+    def __init__(self, root, dtype=np.float64):
+        """BarArchive を初期化する。
+
+        Args:
+            root (str): アーカイブのルートディレクトリ（存在しない場合は作成します）。
+            dtype (np.dtype): 新規に作成する系列の価格列のデータ型。
+                既存の系列は作成時のデータ型のまま読み書きします。
+        """
+        self.root = root
+        self.dtype = np.dtype(dtype)
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, ticker, interval):
+        return os.path.join(self.root, _safe_name(ticker), _safe_name(interval))
+
+    def _read_meta(self, ticker, interval):
+        """メタ情報を読み込む（系列が存在しない場合は None）。"""
+        path = os.path.join(self._dir(ticker, interval), 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_meta(self, ticker, interval, meta):
+        """メタ情報を書き込む（一時ファイル経由で置き換えるため途中状態は残りません）。"""
+        path = os.path.join(self._dir(ticker, interval), 'meta.json')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _column_dtype(meta, name):
+        return np.dtype(meta['dtype']) if name in PRICE_COLUMNS else np.dtype(np.float64)
+
+    def _column_path(self, ticker, interval, name):
+        return os.path.join(self._dir(ticker, interval), f"{name.lower()}.bin")
+
+    def _memmap(self, ticker, interval, name, dtype, length):
+        """列ファイルを読み取り専用でメモリマップする。"""
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(ticker, interval, name), dtype=dtype,
+                         mode='r', shape=(length,))
+
+    def exists(self, ticker, interval):
+        """系列が保存されているか。"""
+        return self._read_meta(ticker, interval) is not None
+
+    def keys(self):
+        """保存されている (ticker, interval) の一覧を返す。"""
+        keys = []
+        for ticker_dir in sorted(os.listdir(self.root)):
+            ticker_path = os.path.join(self.root, ticker_dir)
+            if not os.path.isdir(ticker_path):
+                continue
+            for interval_dir in sorted(os.listdir(ticker_path)):
+                meta_path = os.path.join(ticker_path, interval_dir, 'meta.json')
+                if os.path.exists(meta_path):
+                    with open(meta_path, encoding='utf-8') as f:
+                        meta = json.load(f)
+                    keys.append((meta['ticker'], meta['interval']))
+        return keys
+
+    def __len__(self):
+        return len(self.keys())
+
+    def length(self, ticker, interval):
+        """保存されているバーの本数を返す（系列が存在しない場合は 0）。"""
+        meta = self._read_meta(ticker, interval)
+        return 0 if meta is None else meta['length']
+
+    def last_timestamp(self, ticker, interval):
+        """保存されている最終バーの時刻を返す。
+
+        Returns:
+            pd.Timestamp or None: 最終バーの時刻。系列が存在しない場合は None。
+        """
+        meta = self._read_meta(ticker, interval)
+        if meta is None or meta['length'] == 0:
+            return None
+        return pd.Timestamp(meta['last_timestamp'])
+
+    def write(self, ticker, interval, data):
+        """バーを保存する（保存済みの最終バーより新しいバーのみ追記）。
+
+        Args:
+            ticker (str): ティッカーシンボル（例: "GC=F"）。
+            interval (str): 時間足（例: "1h", "15m"）。
+            data (pd.DataFrame or OHLCVStore): 保存する OHLCV データ。
+
+        Returns:
+            int: 追記したバーの本数（最終バーの上書きは含みません）。
+        """
+        meta = self._read_meta(ticker, interval)
+        dtype = self.dtype if meta is None else np.dtype(meta['dtype'])
+        if not isinstance(data, OHLCVStore):
+            data = OHLCVStore.from_frame(data, dtype=dtype)
+        if data.empty:
+            return 0
+
+        os.makedirs(self._dir(ticker, interval), exist_ok=True)
+        if meta is None:
+            meta = {
+                'format_version': _FORMAT_VERSION,
+                'ticker': ticker,
+                'interval': interval,
+                'dtype': dtype.name,
+                'length': 0,
+                'last_timestamp': None,
+            }
+
+        length = meta['length']
+        ts = data.timestamps
+        start = 0
+        if length > 0:
+            last_ns = pd.Timestamp(meta['last_timestamp']).value
+            start = int(np.searchsorted(ts, last_ns, side='left'))
+            if start < len(ts) and ts[start] == last_ns:
+                # 形成途中だった可能性がある最終バーを最新の値で上書きする
+                self._overwrite_last(ticker, interval, meta, data, start)
+                start += 1
+
+        new = data[start:]
+        columns = [('timestamp', np.dtype(np.int64), new.timestamps)]
+        columns += [(name, self._column_dtype(meta, name), new[name]) for name in OHLCV_COLUMNS]
+        for name, col_dtype, values in columns:
+            with open(self._column_path(ticker, interval, name), 'ab') as f:
+                # 前回の書き込みが中断された場合に備え、メタ情報の本数までに切り詰める
+                f.truncate(length * col_dtype.itemsize)
+                f.write(np.ascontiguousarray(values, dtype=col_dtype).tobytes())
+
+        if len(new) > 0:
+            meta['length'] = length + len(new)
+            meta['last_timestamp'] = str(pd.Timestamp(int(new.timestamps[-1])))
+        self._write_meta(ticker, interval, meta)
+        return len(new)
+
+    def _overwrite_last(self, ticker, interval, meta, data, pos):
+        """保存済みの最終バーを data の pos 番目のバーで上書きする。"""
+        last = meta['length'] - 1
+        for name in OHLCV_COLUMNS:
+            col_dtype = self._column_dtype(meta, name)
+            column = np.memmap(self._column_path(ticker, interval, name), dtype=col_dtype,
+                               mode='r+', shape=(meta['length'],))
+            column[last] = data[name][pos]
+            column.flush()
+            del column
+
+    def read(self, ticker, interval, start=None, end=None):
+        """期間 [start, end] のバーを読み出す。
+
+        配列はファイルのメモリマップを参照するため、ファイル全体は読み込まれません。
+        `end` に分析基準時点を指定すると、その時点以前のバーだけを返します。
+
+        Args:
+            ticker (str): ティッカーシンボル。
+            interval (str): 時間足。
+            start (optional): 開始時刻。省略時は先頭から。
+            end (optional): 終了時刻（この時刻のバーを含む）。省略時は末尾まで。
+
+        Returns:
+            OHLCVStore: 読み出したバー。
+
+        Raises:
+            KeyError: 系列が保存されていない場合。
+        """
+        meta = self._read_meta(ticker, interval)
+        if meta is None:
+            raise KeyError(f"アーカイブに {ticker} ({interval}) のデータがありません。")
+
+        length = meta['length']
+        dtype = np.dtype(meta['dtype'])
+        timestamps = self._memmap(ticker, interval, 'timestamp', np.dtype(np.int64), length)
+        cols = {name: self._memmap(ticker, interval, name, self._column_dtype(meta, name), length)
+                for name in OHLCV_COLUMNS}
+        store = OHLCVStore._from_arrays(timestamps, cols, dtype)
+        return store.view(start, end)
+
+    def read_frame(self, ticker, interval, start=None, end=None):
+        """期間 [start, end] のバーを DataFrame として読み出す。
+
+        Args:
+            ticker (str): ティッカーシンボル。
+            interval (str): 時間足。
+            start (optional): 開始時刻。
+            end (optional): 終了時刻。
+
+        Returns:
+            pd.DataFrame: 読み出したバー（価格列は float64）。
+        """
+        return self.read(ticker, interval, start, end).to_frame(dtype=np.float64)
@@ -0,0 +1,37 @@
+"""テストで共有する合成 OHLCV データ。"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# プロジェクトルートをパスに追加してモジュールをインポート可能にする
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def synthetic_ohlcv(n=3000, freq='1h', seed=0, start='2024-01-01'):
+    """幾何ランダムウォークで平日のみの OHLCV データを生成する。"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq=freq)
+    close = 2000.0 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.001, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    volume = rng.integers(100, 1000, n).astype(float)
+    df = pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+    return df[index.dayofweek < 5]
+
+
+def resample_daily(h1):
+    """1時間足から日足を生成する。"""
+    return h1.resample('1D').agg(_AGG).dropna()
+
+
+@pytest.fixture
+def h1():
+    """1時間足の合成データ。"""
+    return synthetic_ohlcv(seed=7)
@@ -0,0 +1,20 @@
+"""BarArchive と ArchiveSource の期間指定の読み出しを確認するテスト。"""
+import pandas as pd
+
+from metal_analyzer.data import ArchiveSource
+from metal_analyzer.storage import BarArchive
+
+
+def test_archive_source_reads_only_requested_period(tmp_path, h1):
+    archive = BarArchive(str(tmp_path))
+    archive.write('GC=F', '1h', h1)
+    source = ArchiveSource(archive)
+
+    full = archive.read_frame('GC=F', '1h')
+    since = full.index[-1] - pd.DateOffset(months=1)
+    df = source.fetch('GC=F', '1h', period='1mo')
+    pd.testing.assert_frame_equal(df, full[full.index >= since], check_freq=False)
+
+    start, end = h1.index[100], h1.index[200]
+    df = source.fetch('GC=F', '1h', start=start, end=end)
+    pd.testing.assert_frame_equal(df, full[(full.index >= start) & (full.index < end)], check_freq=False)
@@ -0,0 +1,39 @@
+"""ウォークフォワード検証と、日ごとにデータを切り出した分析の一致を確認するテスト。"""
+import pandas as pd
+
+from metal_analyzer import MetalAnalyzer
+from metal_analyzer.backtest import WalkForwardBacktest, analyze_as_of
+from metal_analyzer.models.short_trend_predictor import _empty_results
+from conftest import resample_daily
+
+KEYS = list(_empty_results())
+
+
+def test_run_matches_resliced_analyze_short_trend(h1):
+    daily = resample_daily(h1)
+    results = WalkForwardBacktest(daily, h1).run()
+    assert len(results) > 30
+
+    for date, row in results.iloc[::3].iterrows():
+        as_of = date + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+        analyzer = MetalAnalyzer()
+        analyzer.set_multi_timeframe_data(daily.loc[:as_of], h1.loc[:as_of])
+        report = analyzer.analyze_short_trend(verbose=False)
+        assert {k: report[k] for k in KEYS} == {k: row[k] for k in KEYS}, date
+
+
+def test_analyze_as_of_matches_resliced_analyze_short_trend(h1):
+    daily = resample_daily(h1)
+    dates = list(daily.index[-40::4]) + [h1.index[-30]]
+    as_of_times = [h1.index[-30], h1.index[-500]]
+
+    for end_of_day, requested in ((True, dates), (False, as_of_times)):
+        results = analyze_as_of(requested, {'Daily': daily, '1h': h1}, end_of_day=end_of_day)
+        assert len(results) == len(set(requested))
+        for date, row in results.iterrows():
+            cutoff = date.normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) if end_of_day else date
+            assert row['as_of'] == h1.loc[:cutoff].index[-1]
+            analyzer = MetalAnalyzer()
+            analyzer.set_multi_timeframe_data(daily.loc[:cutoff], h1.loc[:cutoff])
+            report = analyzer.analyze_short_trend(verbose=False)
+            assert {k: report[k] for k in KEYS} == {k: row[k] for k in KEYS}, date
@@ -0,0 +1,77 @@
+"""基準時間足からの上位時間足の導出 (TimeframeGraph) と pandas の resample の一致を確認するテスト。"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from metal_analyzer.core.derive import TimeframeGraph, FUTURES_SESSION_START
+from conftest import synthetic_ohlcv, _AGG
+
+
+def _resample(df, rule, **kwargs):
+    return df.resample(rule, **kwargs).agg(_AGG).dropna()
+
+
+def _assert_same(frame, expected):
+    # resample のインデックスの精度 (ns / us) は pandas のバージョンで異なるため、型は比較しない
+    pd.testing.assert_frame_equal(frame, expected[list(frame.columns)], check_freq=False, check_names=False,
+                                  check_index_type=False)
+
+
+def test_graph_matches_resample(h1):
+    graph = TimeframeGraph('1h')
+    graph.set_base(h1)
+    _assert_same(graph.get('4h'), _resample(h1, '4h'))
+    _assert_same(graph.get('Daily'), _resample(h1, '1D'))
+    _assert_same(graph.get('Weekly'), _resample(h1, 'W-MON', label='left', closed='left'))
+    _assert_same(graph.get('Monthly'), _resample(h1, 'MS'))
+
+    m15 = synthetic_ohlcv(n=8000, freq='15min', seed=2)
+    graph = TimeframeGraph('15m')
+    graph.set_base(m15)
+    for timeframe, rule in (('1h', '1h'), ('4h', '4h'), ('Daily', '1D')):
+        _assert_same(graph.get(timeframe), _resample(m15, rule))
+
+
+def test_graph_session_start(h1):
+    graph = TimeframeGraph('1h', session_start=FUTURES_SESSION_START)
+    graph.set_base(h1)
+
+    # 前日 18:00 から当日 18:00 までが当日の日足、4時間足は 18:00 起点（2時, 6時, ...）で区切る
+    expected = h1.groupby((h1.index + pd.Timedelta(hours=6)).normalize()).agg(_AGG)
+    _assert_same(graph.get('Daily'), expected)
+    _assert_same(graph.get('4h'), _resample(h1, '4h', offset='2h'))
+
+
+@pytest.mark.parametrize('session_start', [None, FUTURES_SESSION_START])
+def test_incremental_set_base_matches_full_rebuild(h1, session_start):
+    timeframes = ('4h', 'Daily', 'Weekly', 'Monthly')
+    n = len(h1)
+    graph = TimeframeGraph('1h', session_start=session_start)
+    for cut in (n // 2, n // 2 + 7, n - 300, n - 1):
+        graph.set_base(h1.iloc[:cut])
+        for timeframe in timeframes:
+            graph.get(timeframe)
+        # 最終バーの更新と末尾への追加を、変更位置を指定して反映する
+        graph.set_base(h1, changed_from=cut - 1)
+        full = TimeframeGraph('1h', session_start=session_start)
+        full.set_base(h1)
+        for timeframe in timeframes:
+            _assert_same(graph.get(timeframe), full.get(timeframe))
+
+    # 参照されていない時間足がある間に2回変更しても、最も前の変更位置から集計し直す
+    graph.set_base(h1.iloc[:n - 500])
+    graph.get('Weekly')
+    graph.set_base(h1.iloc[:n - 200], changed_from=n - 600)
+    graph.get('Daily')
+    graph.set_base(h1, changed_from=n - 201)
+    for timeframe in timeframes:
+        _assert_same(graph.get(timeframe), full.get(timeframe))
+
+
+def test_graph_keeps_float32_prices(h1):
+    graph = TimeframeGraph('1h')
+    graph.set_base(h1.astype({name: np.float32 for name in ('Open', 'High', 'Low', 'Close')}))
+    weekly = graph.get('Weekly')
+    assert (weekly[['Open', 'High', 'Low', 'Close']].dtypes == np.float32).all()
+    with pytest.raises(ValueError):
+        graph.get('15m')
@@ -0,0 +1,72 @@
+"""float32 の dtype ポリシー（データ型の保持と float64 との誤差）を確認するテスト。"""
+import numpy as np
+import pytest
+
+from metal_analyzer import MetalAnalyzer, OHLCVStore
+from metal_analyzer.indicators import (calculate_sma, calculate_ema, calculate_emas, calculate_rsi,
+                                       calculate_bollinger_bands, rsi_array, bollinger_array, resolve_dtype)
+from conftest import resample_daily
+
+# indicators.dtypes に記載している float32 の誤差の目安
+EMA_RTOL = 5e-7
+RSI_ATOL = 0.005
+
+
+def test_resolve_dtype():
+    assert resolve_dtype() == np.float64
+    assert resolve_dtype('float32') == np.float32
+    for dtype in (np.float16, np.int64, 'price'):
+        with pytest.raises(ValueError):
+            resolve_dtype(dtype)
+
+
+def test_float32_indicators_match_float64(h1):
+    h1_32 = h1.astype({name: np.float32 for name in ('Open', 'High', 'Low', 'Close')})
+
+    for func in (calculate_sma, calculate_ema):
+        result = func(h1_32, 20, np.float32)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, func(h1, 20), rtol=EMA_RTOL)
+
+    emas = calculate_emas(h1_32, (12, 50, 200), np.float32)
+    assert emas.dtype == np.float32
+    np.testing.assert_allclose(emas, calculate_emas(h1, (12, 50, 200)), rtol=EMA_RTOL)
+
+    rsi = calculate_rsi(h1_32, 14, np.float32)
+    assert rsi.dtype == np.float32
+    np.testing.assert_allclose(rsi, calculate_rsi(h1, 14), atol=RSI_ATOL)
+    close = h1['Close'].to_numpy()
+    np.testing.assert_allclose(rsi_array(close, smoothing='wilder', dtype=np.float32),
+                               rsi_array(close, smoothing='wilder'), atol=RSI_ATOL)
+
+    for result, expected in zip(calculate_bollinger_bands(h1_32, 20, 2, np.float32),
+                                calculate_bollinger_bands(h1, 20, 2)):
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=EMA_RTOL)
+    width, percent_b = bollinger_array(close, dtype=np.float32)[3:]
+    expected_width, expected_percent_b = bollinger_array(close)[3:]
+    np.testing.assert_allclose(width, expected_width, rtol=1e-4)
+    np.testing.assert_allclose(percent_b, expected_percent_b, atol=1e-4)
+
+
+def test_float32_analyzer_keeps_float32_data(h1):
+    daily = resample_daily(h1)
+    reports = {}
+    for dtype in (np.float64, np.float32):
+        analyzer = MetalAnalyzer(dtype=dtype)
+        analyzer.set_multi_timeframe_data(daily, h1)
+        reports[dtype] = analyzer.analyze_short_trend(verbose=False)
+        for name, df in analyzer.timeframe_data.items():
+            assert (df[['Open', 'High', 'Low', 'Close']].dtypes == dtype).all(), name
+        assert analyzer.indicator_cache.emas(analyzer.timeframe_data['1h'], (20, 200)).dtype == dtype
+
+    # 判定の境界に近くない合成データでは、float64 と同じ判定になる
+    for key in ('dashboard_1_trend', 'dashboard_2_momentum', 'dashboard_4_sentiment', 'final_prediction'):
+        assert reports[np.float32][key] == reports[np.float64][key], key
+    np.testing.assert_allclose(reports[np.float32]['score'], reports[np.float64]['score'], rtol=1e-3)
+
+    # 価格列が float32 のストアは配列をコピーせずに保持する
+    store = OHLCVStore.from_frame(h1, dtype=np.float32)
+    analyzer = MetalAnalyzer(dtype='float32')
+    analyzer.add_timeframe_data('1h', store)
+    assert np.shares_memory(analyzer.timeframe_data['1h']['Close'].to_numpy(), store.close)
@@ -0,0 +1,38 @@
+"""逐次型のダブルトップ/ダブルボトム検知と一括検知の一致を確認するテスト。"""
+import pytest
+
+from metal_analyzer.patterns import (DoubleTopDetector, DoubleBottomDetector, detect_double_top,
+                                     detect_double_bottom)
+
+DETECTORS = [
+    (DoubleTopDetector, detect_double_top),
+    (DoubleBottomDetector, detect_double_bottom),
+]
+
+
+def _same(live, batch):
+    return (live.kind, live.detected, live.status, live.peaks, live.peak_prices, live.neckline,
+            live.current_price) == (batch.kind, batch.detected, batch.status, batch.peaks,
+                                    batch.peak_prices, batch.neckline, batch.current_price)
+
+
+@pytest.mark.parametrize('lookback', [100, 40])
+@pytest.mark.parametrize('detector_cls, detect', DETECTORS)
+def test_streaming_detector_matches_batch(h1, detector_cls, detect, lookback):
+    df = h1.iloc[:800]
+    closes = df['Close'].to_numpy()
+    detector = detector_cls(lookback=lookback)
+    for i, close in enumerate(closes):
+        batch = detect(df.iloc[:i + 1], lookback=lookback)
+        if i:
+            assert _same(detector.peek(close), batch), i
+        assert _same(detector.update(close), batch), i
+
+
+@pytest.mark.parametrize('detector_cls, detect', DETECTORS)
+def test_from_series_matches_batch(h1, detector_cls, detect):
+    df = h1.iloc[:500]
+    detector = detector_cls.from_series(df.iloc[:-1])
+    detector.peek(df['Close'].iloc[-1] * 1.05)
+    assert detector.count == len(df) - 1
+    assert _same(detector.update(df['Close'].iloc[-1]), detect(df))
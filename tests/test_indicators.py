@@ -0,0 +1,61 @@
+"""NumPy 版のインジケーター計算と pandas の計算結果の一致を確認するテスト。"""
+import numpy as np
+import pandas as pd
+
+from metal_analyzer.indicators import calculate_ema, calculate_emas, rolling_mean_std
+from metal_analyzer.indicators.sma import _ema_matrix
+
+SPANS = (5, 20, 200)
+
+
+def _pandas_emas(values, spans):
+    series = pd.Series(values)
+    return np.column_stack([series.ewm(span=span, adjust=False).mean().to_numpy() for span in spans])
+
+
+def test_ema_matrix_matches_pandas_ewm(h1):
+    closes = h1['Close'].to_numpy()
+    np.testing.assert_allclose(_ema_matrix(closes, SPANS), _pandas_emas(closes, SPANS), rtol=1e-12)
+    np.testing.assert_allclose(calculate_emas(h1, SPANS), _pandas_emas(closes, SPANS), rtol=1e-12)
+    np.testing.assert_allclose(calculate_ema(h1, 20), _pandas_emas(closes, (20,))[:, 0], rtol=1e-12)
+
+
+def test_ema_matrix_nan_handling(h1):
+    closes = h1['Close'].to_numpy().copy()
+
+    # 先頭の NaN は結果も NaN で、以降は最初の有効値から始まる EMA と一致する
+    leading = closes.copy()
+    leading[:10] = np.nan
+    result = _ema_matrix(leading, SPANS)
+    assert np.isnan(result[:10]).all()
+    np.testing.assert_allclose(result[10:], _pandas_emas(closes[10:], SPANS), rtol=1e-12)
+
+    # 途中の NaN は pandas で計算した値と一致する
+    interior = closes.copy()
+    interior[[50, 51, 300]] = np.nan
+    np.testing.assert_allclose(_ema_matrix(interior, SPANS), _pandas_emas(interior, SPANS), rtol=1e-12)
+
+    assert np.isnan(_ema_matrix(np.full(5, np.nan), SPANS)).all()
+
+
+def test_rolling_mean_std_matches_pandas_rolling(h1):
+    closes = h1['Close']
+    for window, ddof in ((20, 1), (20, 0), (200, 1)):
+        mean, std = rolling_mean_std(closes.to_numpy(), window, ddof=ddof)
+        rolling = closes.rolling(window)
+        np.testing.assert_allclose(mean, rolling.mean().to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(std, rolling.std(ddof=ddof).to_numpy(), rtol=1e-9)
+
+
+def test_rolling_mean_std_nan_and_flat_windows(h1):
+    closes = h1['Close'].to_numpy().copy()
+    closes[[100, 500]] = np.nan
+    closes[1000:1030] = closes[999]
+    series = pd.Series(closes)
+
+    # 期間内に NaN を含む位置は NaN、同じ値が続く区間は標準偏差が 0 になる
+    mean, std = rolling_mean_std(closes, 20)
+    np.testing.assert_allclose(mean, series.rolling(20).mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(std, series.rolling(20).std().to_numpy(), rtol=1e-9, atol=1e-9)
+    assert np.isnan(mean[100:120]).all() and not np.isnan(mean[120:500]).any()
+    assert (std[1019:1030] == 0).all() and (mean[1019:1030] == closes[999]).all()
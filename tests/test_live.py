@@ -0,0 +1,65 @@
+"""ライブデータ (ingest_bar) の取り込みのテスト。"""
+
+import numpy as np
+
+from metal_analyzer import MetalAnalyzer
+from conftest import resample_daily
+
+
+def test_ingest_bar_matches_batch_short_trend(h1):
+    """1時間足と日足だけの状態から1本取り込んでも、一括分析と同じ結果になる。"""
+    live = MetalAnalyzer()
+    live.add_timeframe_data('1h', h1.iloc[:-1])
+    live.add_timeframe_data('Daily', resample_daily(h1.iloc[:-1]))
+    before = live.analyze_short_trend(verbose=False)
+
+    batch_before = MetalAnalyzer()
+    batch_before.set_multi_timeframe_data(resample_daily(h1.iloc[:-1]), h1.iloc[:-1])
+    assert dict(before) == dict(batch_before.analyze_short_trend(verbose=False))
+
+    # 4時間足は分析時に登録されるため、取り込み前に破棄して既存データのない状態にする
+    live.timeframe_data = {'1h': h1.iloc[:-1], 'Daily': resample_daily(h1.iloc[:-1])}
+    live.ingest_bar('1h', h1.iloc[-1])
+
+    batch = MetalAnalyzer()
+    batch.set_multi_timeframe_data(resample_daily(h1), h1)
+    assert dict(live.analyze_short_trend(verbose=False)) == dict(batch.analyze_short_trend(verbose=False))
+
+    # 上位時間足はライブデータの数本だけでなく、既存データを集計したものになる
+    frames = live.timeframe_data
+    assert len(frames['4h']) == len(batch.timeframe_data['4h'])
+    np.testing.assert_allclose(frames['4h'].to_numpy(), batch.timeframe_data['4h'].to_numpy())
+    assert len(frames['Weekly']) > 2 and len(frames['Monthly']) > 1
+
+
+def test_repeated_ingest_keeps_live_state_and_extends_cache(h1):
+    """分析を挟みながら取り込んでも、ライブデータの状態とインジケーターのキャッシュを引き継ぐ。"""
+    n0 = len(h1) - 30
+    original = h1.iloc[:n0].copy()
+    live = MetalAnalyzer()
+    live.add_timeframe_data('1h', original)
+    live.add_timeframe_data('Daily', resample_daily(original))
+    live.ingest_bar('1h', h1.iloc[n0])
+    # 4時間足は分析時に1時間足から補完されるが、ライブデータの状態は破棄されない
+    state = live._live
+    live.analyze_short_trend(verbose=False)
+
+    for i in range(n0 + 1, len(h1)):
+        live.ingest_bar('1h', h1.iloc[i])
+        report = live.analyze_short_trend(verbose=False)
+        assert live._live is state
+
+    batch = MetalAnalyzer()
+    batch.set_multi_timeframe_data(resample_daily(h1), h1)
+    assert dict(report) == dict(batch.analyze_short_trend(verbose=False))
+
+    # キャッシュから引き継いだ EMA・RSI は全体を計算し直した値と一致する
+    frame = live.timeframe_data['1h']
+    cache = live.indicator_cache
+    misses = cache.misses
+    ema, rsi = cache.ema(frame, 200), cache.rsi(frame, 14)
+    assert cache.misses == misses
+    np.testing.assert_allclose(ema, cache.ema(frame.copy(), 200), rtol=1e-12)
+    np.testing.assert_allclose(rsi, cache.rsi(frame.copy(), 14), rtol=1e-9)
+    # 追加したデータフレームは書き換えない
+    assert original.equals(h1.iloc[:n0])
@@ -0,0 +1,36 @@
+"""逐次更新型のインジケーターとバッチ関数の一致を確認するテスト。"""
+import numpy as np
+
+from metal_analyzer.indicators import calculate_sma, calculate_ema, calculate_rsi, calculate_bollinger_bands
+from metal_analyzer.indicators.online import OnlineSMA, OnlineEMA, OnlineRSI, OnlineBollinger
+
+# モジュールの説明にある誤差（相対誤差 1e-12 程度）に余裕を持たせた許容誤差
+RTOL = 1e-11
+
+
+def _run(indicator, closes):
+    return np.array([indicator.update(x) for x in closes], dtype=float)
+
+
+def test_online_indicators_match_batch(h1):
+    closes = h1['Close']
+
+    # NaN の位置（ウォームアップ期間）も含めて一致する
+    np.testing.assert_allclose(_run(OnlineSMA(20), closes), calculate_sma(h1, 20), rtol=RTOL)
+    np.testing.assert_allclose(_run(OnlineEMA(20), closes), calculate_ema(h1, 20), rtol=RTOL)
+    np.testing.assert_allclose(_run(OnlineRSI(14), closes), calculate_rsi(h1, 14), rtol=RTOL)
+
+    bands = _run(OnlineBollinger(20, 2), closes)
+    for j, expected in enumerate(calculate_bollinger_bands(h1, 20, 2)):
+        np.testing.assert_allclose(bands[:, j], expected, rtol=RTOL)
+    assert np.isnan(bands[:19]).all() and not np.isnan(bands[19:]).any()
+
+
+def test_online_peek_does_not_change_state(h1):
+    closes = h1['Close'].to_numpy()
+    ema, rsi = OnlineEMA(20), OnlineRSI(14)
+    for x in closes[:-1]:
+        ema.update(x)
+        rsi.update(x)
+    peeked = ema.peek(closes[-1]), rsi.peek(closes[-1])
+    assert peeked == (ema.update(closes[-1]), rsi.update(closes[-1]))
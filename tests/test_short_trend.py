@@ -0,0 +1,62 @@
+"""短期トレンド分析のチャートパターンの判定を確認するテスト。"""
+import numpy as np
+import pytest
+
+from metal_analyzer.models import (build_short_trend_features, evaluate_short_trend,
+                                   evaluate_short_trend_arrays)
+from metal_analyzer.models.short_trend_predictor import _SENTIMENT_LABELS
+from metal_analyzer.patterns.result import BEARISH_REVERSALS, BULLISH_REVERSALS, neckline_key
+
+
+@pytest.fixture
+def features(h1):
+    h4 = h1.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                'Volume': 'sum'}).dropna()
+    return build_short_trend_features(h4, h1).iloc[-1]
+
+
+@pytest.mark.parametrize('kind, neckline, sentiment', [
+    ('head_and_shoulders', np.inf, '重要ライン割れ (暴落確定)'),
+    ('triple_bottom', 0.0, '底打ちパターン ネックライン上抜け (反発確定)'),
+])
+def test_reversal_patterns_are_scored_only_when_enabled(features, kind, neckline, sentiment):
+    patterns = {'double_top': False, 'double_bottom': False, kind: True, f'neckline_{kind}': neckline}
+    baseline = evaluate_short_trend(features, {'double_top': False, 'double_bottom': False})
+
+    default = evaluate_short_trend(features, patterns)
+    assert default['dashboard_4_sentiment'] == baseline['dashboard_4_sentiment']
+    assert default['score'] == baseline['score']
+
+    enabled = evaluate_short_trend(features, patterns, params={'score_reversal_patterns': True})
+    assert enabled['dashboard_4_sentiment'] == sentiment
+
+    arrays = {name: np.array([value]) for name, value in features.items()}
+    pattern_arrays = {name: np.array([value]) for name, value in patterns.items()}
+    for params, expected in ((None, default), ({'score_reversal_patterns': True}, enabled)):
+        codes = evaluate_short_trend_arrays(arrays, pattern_arrays, params)
+        assert _SENTIMENT_LABELS[codes['sentiment_code'][0]] == expected['dashboard_4_sentiment']
+        assert codes['score'][0] == expected['score']
+
+
+def test_arrays_match_scalar_evaluation_bar_by_bar(h1):
+    h4 = h1.resample('4h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                'Volume': 'sum'}).dropna()
+    features = build_short_trend_features(h4, h1).iloc[200:]
+    n = len(features)
+
+    # パターンの検知とネックラインはバーごとに変える（ネックラインの上下どちらのケースも含める）
+    rng = np.random.default_rng(3)
+    close = features['h1_close'].to_numpy()
+    patterns = {}
+    for kind in BEARISH_REVERSALS + BULLISH_REVERSALS:
+        patterns[kind] = rng.random(n) < 0.2
+        patterns[neckline_key(kind)] = close * (1 + rng.normal(0, 0.005, n))
+
+    arrays = {name: features[name].to_numpy() for name in features.columns}
+    for params in (None, {'score_reversal_patterns': True}):
+        codes = evaluate_short_trend_arrays(arrays, patterns, params)
+        for i in range(n):
+            row = {key: value[i] for key, value in patterns.items()}
+            expected = evaluate_short_trend(features.iloc[i], row, params)
+            assert _SENTIMENT_LABELS[codes['sentiment_code'][i]] == expected['dashboard_4_sentiment'], i
+            np.testing.assert_allclose(codes['score'][i], expected['score'], rtol=1e-12)
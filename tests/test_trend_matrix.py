@@ -0,0 +1,63 @@
+"""時間足ごとのトレンド判定表 (trend_matrix) を確認するテスト。"""
+import numpy as np
+
+from metal_analyzer.core.cache import IndicatorCache
+from metal_analyzer.models import trend_matrix
+from metal_analyzer.models.short_trend_predictor import TIMEFRAME_TREND_LABELS
+from metal_analyzer.patterns import PATTERN_DETECTORS, detect_patterns
+from conftest import resample_daily
+
+
+def _resample(h1, rule):
+    return h1.resample(rule).agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                  'Volume': 'sum'}).dropna()
+
+
+def _expected_trend(df):
+    """pandas の ewm で時間足ごとに求めたトレンド判定。"""
+    if len(df) < 50:
+        return "データ不足"
+    close = df['Close'].iloc[-1]
+    ema20, ema50, ema200 = (df['Close'].ewm(span=span, adjust=False).mean().iloc[-1] for span in (20, 50, 200))
+    if close > ema20 > ema50 > ema200:
+        return TIMEFRAME_TREND_LABELS[0]
+    if close < ema20 < ema50 < ema200:
+        return TIMEFRAME_TREND_LABELS[1]
+    if close > ema200:
+        return TIMEFRAME_TREND_LABELS[2]
+    if close < ema200:
+        return TIMEFRAME_TREND_LABELS[3]
+    return TIMEFRAME_TREND_LABELS[4]
+
+
+def test_trend_matrix_matches_per_timeframe_evaluation(h1):
+    daily = resample_daily(h1)
+    timeframes = {'1H': h1, '4H': _resample(h1, '4h'), 'Daily': daily, 'Weekly': _resample(h1, 'W')}
+
+    for cache in (None, IndicatorCache()):
+        table = trend_matrix(timeframes, cache=cache)
+        assert list(table.index) == ['Weekly', 'Daily', '4H', '1H']
+        for name, row in table.iterrows():
+            df = timeframes[name]
+            assert row['bars'] == len(df)
+            assert row['close'] == df['Close'].iloc[-1]
+            for span in (20, 50, 200):
+                expected = df['Close'].ewm(span=span, adjust=False).mean().iloc[-1]
+                np.testing.assert_allclose(row[f'ema{span}'], expected, rtol=1e-12)
+            assert row['trend'] == _expected_trend(df), name
+
+            results = detect_patterns(df) if len(df) > 50 else {}
+            for kind in PATTERN_DETECTORS:
+                assert row[kind] == (kind in results and results[kind].detected), (name, kind)
+
+
+def test_trend_matrix_labels_each_trend_state(h1):
+    # 終値だけを書き換えて、上昇・下落のパーフェクトオーダーを作る
+    up = h1.copy()
+    up['Close'] = np.linspace(1000.0, 2000.0, len(up))
+    down = h1.copy()
+    down['Close'] = np.linspace(2000.0, 1000.0, len(down))
+    table = trend_matrix({'1H': up, '4H': down, 'Daily': h1.iloc[:30]})
+    assert table.loc['1H', 'trend'] == TIMEFRAME_TREND_LABELS[0]
+    assert table.loc['4H', 'trend'] == TIMEFRAME_TREND_LABELS[1]
+    assert table.loc['Daily', 'trend'] == "データ不足"